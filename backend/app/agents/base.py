@@ -1,5 +1,7 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from ..core.context_budget import ContextBudgeter
 from ..tools.base import BaseTool
 
 class BaseAgent(ABC):
@@ -17,6 +19,10 @@ class BaseAgent(ABC):
         self.model_config = model_config
         self.tools = tools or []
         self.context = {}
+        self.context_budgeter = ContextBudgeter(
+            model_config,
+            summarizer=self._summarize_turns
+        )
         
     def add_tool(self, tool: BaseTool):
         self.tools.append(tool)
@@ -26,6 +32,56 @@ class BaseAgent(ABC):
         
     def set_context(self, context: Dict[str, Any]):
         self.context.update(context)
+
+    async def build_history_messages(
+        self,
+        history: List[Dict[str, str]],
+        system_prompt: str,
+        message: str
+    ) -> List[BaseMessage]:
+        """Build chat messages for a history trimmed to the model's budget.
+
+        Turns that no longer fit are replaced by a rolling summary.
+        """
+        reserved = (
+            self.context_budgeter.count(system_prompt)
+            + self.context_budgeter.count(message)
+        )
+        summary, recent = await self.context_budgeter.fit(history, reserved)
+
+        messages: List[BaseMessage] = [SystemMessage(content=system_prompt)]
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of earlier conversation:\n{summary}"))
+        messages.extend(
+            AIMessage(content=m["content"]) if m["role"] == "assistant"
+            else HumanMessage(content=m["content"])
+            for m in recent
+        )
+        messages.append(HumanMessage(content=message))
+        return messages
+
+    async def _summarize_turns(
+        self,
+        summary: Optional[str],
+        turns: List[Dict[str, str]]
+    ) -> str:
+        """Fold turns that fell out of the context window into the summary."""
+        llm = getattr(self, "llm", None)
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+        if llm is None:
+            # Without a model the newest text stands in, capped like a summary
+            return self.context_budgeter.truncate(
+                "\n".join(filter(None, [summary, transcript])),
+                self.context_budgeter.summary_budget
+            )
+
+        response = await llm.agenerate([[
+            SystemMessage(content=f"""Update the running summary of a conversation with the new turns.
+            Keep decisions, requirements, file names and open tasks. Be concise,
+            at most {self.context_budgeter.summary_budget} tokens."""),
+            HumanMessage(content=f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}")
+        ]])
+        return response.generations[0][0].text
         
     @abstractmethod
     async def process_message(self, message: str) -> str:
@@ -33,4 +89,4 @@ class BaseAgent(ABC):
         
     @abstractmethod
     async def execute_tool(self, tool_name: str, **kwargs) -> Any:
-        pass
\ No newline at end of file
+        pass
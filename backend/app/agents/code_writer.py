@@ -1,7 +1,8 @@
 from typing import Dict, Any, List
 from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
 from .base import BaseAgent
+from ..core.config import settings
+from ..core.retrieval import FileContextIndex
 
 class CodeWriterAgent(BaseAgent):
     def __init__(self, name: str, model_config: Dict[str, Any], **kwargs):
@@ -18,29 +19,37 @@ class CodeWriterAgent(BaseAgent):
             api_key=model_config.get("api_key")
         )
         self.conversation_history: List[Dict[str, str]] = []
+        self.file_index = FileContextIndex()
         
     async def process_message(self, message: str) -> str:
-        # Add file context if available
+        # Add the file chunks most relevant to the message
         context_prompt = ""
         if self.context.get("files"):
-            context_prompt = "Available file context:\n"
-            for file in self.context["files"]:
-                context_prompt += f"\nFile: {file['name']}\nContent:\n{file['content']}\n"
+            self.file_index.sync_files(self.context["files"])
+            context_prompt = self.file_index.build_context(
+                message,
+                token_budget=self.model_config.get(
+                    "file_context_token_budget",
+                    settings.FILE_CONTEXT_TOKEN_BUDGET
+                ),
+                top_k=self.model_config.get("file_context_top_k", settings.FILE_CONTEXT_TOP_K),
+                model_name=self.context_budgeter.model_name
+            )
         
-        messages = [
-            SystemMessage(content=f"""You are a code writer agent named {self.name}.
+        system_prompt = f"""You are a code writer agent named {self.name}.
             Your task is to write and modify code based on requirements.
-            {context_prompt}"""),
-            *[AIMessage(content=m["content"]) if m["role"] == "assistant" 
-              else HumanMessage(content=m["content"]) 
-              for m in self.conversation_history],
-            HumanMessage(content=message)
-        ]
+            {context_prompt}"""
+        messages = await self.build_history_messages(
+            self.conversation_history,
+            system_prompt,
+            message
+        )
         
         response = await self.llm.agenerate([messages])
         response_text = response.generations[0][0].text
         
-        # Update conversation history
+        # Update conversation history, dropping turns now held in the summary
+        self.context_budgeter.compact(self.conversation_history)
         self.conversation_history.append({"role": "user", "content": message})
         self.conversation_history.append({"role": "assistant", "content": response_text})
         
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from ...db.session import get_db
 from ...models.agent import Agent
 from ...core.agent_manager import AgentManager
+from ...core.streaming import send_events, sse_response
 from ...schemas.agent import AgentCreate, AgentResponse, AgentUpdate
 
 router = APIRouter()
@@ -70,4 +71,30 @@ async def process_message(
         response = await agent_manager.process_message(agent_id, message)
         return {"response": response}
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _agent_events(agent_id: int, message: str) -> AsyncIterator[Dict[str, Any]]:
+    """Wrap an agent's token stream as events."""
+    async for delta in agent_manager.stream_message(agent_id, message):
+        yield {"event": "token", "agent_id": agent_id, "delta": delta}
+    yield {"event": "done", "agent_id": agent_id}
+
+@router.post("/{agent_id}/stream")
+async def stream_message(agent_id: int, message: str):
+    """Stream an agent's response as Server-Sent Events."""
+    return sse_response(_agent_events(agent_id, message))
+
+@router.websocket("/{agent_id}/ws")
+async def agent_websocket(websocket: WebSocket, agent_id: int):
+    """Stream agent responses over a WebSocket.
+
+    Each incoming JSON frame ``{"message": ...}`` produces a stream of
+    ``token`` events followed by ``done``.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            await send_events(websocket, _agent_events(agent_id, data["message"]))
+    except WebSocketDisconnect:
+        pass
@@ -1,10 +1,11 @@
 """Chat management endpoints."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 
 from ...core.group_chat import GroupChatOrchestrator
+from ...core.streaming import send_events, sse_response
 from ...db.session import get_db
 from ...schemas.chat import (
     ChatMessageCreate,
@@ -53,6 +54,52 @@ async def send_group_message(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/group/{chat_id}/stream")
+async def stream_group_message(
+    chat_id: int,
+    message: ChatMessageCreate,
+    db: Session = Depends(get_db)
+):
+    """Send a message to a group chat and stream replies as Server-Sent Events."""
+    orchestrator = GroupChatOrchestrator(db)
+    return sse_response(
+        orchestrator.stream_message(
+            session_id=chat_id,
+            content=message.content,
+            sender_id=message.agent_id,
+            metadata=message.metadata
+        )
+    )
+
+@router.websocket("/group/{chat_id}/ws")
+async def group_chat_websocket(
+    websocket: WebSocket,
+    chat_id: int,
+    db: Session = Depends(get_db)
+):
+    """Stream group chat replies over a WebSocket.
+
+    Each incoming JSON frame ``{"content": ..., "agent_id": ..., "metadata": ...}``
+    produces interleaved ``token`` events from all agents, one ``message``
+    event per stored reply and a final ``done``.
+    """
+    orchestrator = GroupChatOrchestrator(db)
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            await send_events(
+                websocket,
+                orchestrator.stream_message(
+                    session_id=chat_id,
+                    content=data["content"],
+                    sender_id=data.get("agent_id"),
+                    metadata=data.get("metadata")
+                )
+            )
+    except WebSocketDisconnect:
+        pass
+
 @router.get("/group/{chat_id}/history", response_model=List[ChatMessageResponse])
 async def get_group_chat_history(
     chat_id: int,
@@ -1,17 +1,26 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from typing import AsyncIterator, Dict, Any
+from ...core.execution_cache import execution_cache
+from ...core.output_stream import subscribe_output
+from ...core.streaming import send_events, sse_response
+from ...tasks.code_tasks import stream_execute
 from ...tools.code_execution import CodeExecutionTool
 from ...tools.filesystem import FileSystemTool
+from ...tools.validation import CodeValidationTool
 
 router = APIRouter()
 code_execution_tool = CodeExecutionTool()
 filesystem_tool = FileSystemTool()
+code_validation_tool = CodeValidationTool()
 
 @router.post("/execute")
 async def execute_code(data: Dict[str, Any]):
     result = await code_execution_tool.execute(
         code=data.get("content"),
-        language=data.get("language", "python")
+        language=data.get("language", "python"),
+        cache=data.get("cache"),
+        profile=data.get("profile"),
+        requirements=data.get("requirements")
     )
     
     if not result["success"]:
@@ -19,6 +28,113 @@ async def execute_code(data: Dict[str, Any]):
     
     return result
 
+def _execution_events(data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Stream a run's stdout, stderr and done events."""
+    return code_execution_tool.engine.stream_code(
+        code=data.get("content"),
+        language=data.get("language", "python"),
+        env_vars=data.get("env_vars"),
+        profile=data.get("profile"),
+        requirements=data.get("requirements")
+    )
+
+@router.post("/execute/stream")
+async def stream_code(data: Dict[str, Any]):
+    """Execute code, streaming its output as Server-Sent Events."""
+    return sse_response(_execution_events(data))
+
+@router.websocket("/execute/ws")
+async def execute_websocket(websocket: WebSocket):
+    """Execute code over a WebSocket.
+
+    Each incoming JSON frame ``{"content": ..., "language": ...}`` produces
+    ``stdout``/``stderr`` events followed by ``done``.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            await send_events(websocket, _execution_events(data))
+    except WebSocketDisconnect:
+        pass
+
+@router.post("/jobs")
+async def start_execution_job(data: Dict[str, Any]):
+    """Execute code on a Celery worker, publishing output for streaming."""
+    task = stream_execute.delay(
+        data.get("content"),
+        data.get("language", "python"),
+        data.get("env_vars"),
+        data.get("profile"),
+        data.get("requirements")
+    )
+    return {"task_id": task.id}
+
+@router.get("/jobs/{task_id}/stream")
+async def stream_execution_job(task_id: str):
+    """Stream a background job's output as Server-Sent Events."""
+    return sse_response(subscribe_output(task_id))
+
+@router.websocket("/jobs/{task_id}/ws")
+async def execution_job_websocket(websocket: WebSocket, task_id: str):
+    """Stream a background job's output over a WebSocket."""
+    await websocket.accept()
+    try:
+        await send_events(websocket, subscribe_output(task_id))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/execution/stats")
+async def get_execution_stats() -> Dict[str, Any]:
+    """Get execution engine load and result cache counters."""
+    return {
+        **code_execution_tool.engine.get_stats(),
+        "cache": execution_cache.get_stats(),
+        "validation_pool": code_validation_tool.pool.get_stats(),
+        "validation_cache": code_validation_tool.cache.get_stats()
+    }
+
+@router.delete("/execution/cache")
+async def clear_execution_cache():
+    """Clear the in-process execution result cache."""
+    await execution_cache.clear()
+    return {"status": "success", "message": "Execution cache cleared"}
+
+@router.post("/validate")
+async def validate_code(data: Dict[str, Any]):
+    """Run syntax, style and security checks on code."""
+    return await code_validation_tool.execute(
+        code=data.get("content", ""),
+        language=data.get("language", "python"),
+        validation_types=data.get("validation_types"),
+        path=data.get("path")
+    )
+
+@router.post("/validate/batch")
+async def validate_code_batch(data: Dict[str, Any]):
+    """Validate many files in one call."""
+    files = data.get("files")
+    if not isinstance(files, list):
+        raise HTTPException(status_code=400, detail="files must be a list")
+    return await code_validation_tool.execute_batch(
+        files,
+        validation_types=data.get("validation_types")
+    )
+
+@router.post("/dependency-layers")
+async def build_dependency_layer(data: Dict[str, Any]):
+    """Build the dependency layer for a set of requirements ahead of use."""
+    engine = code_execution_tool.engine
+    try:
+        layer = await engine.layers.resolve(
+            data.get("requirements") or [],
+            await engine.interpreter_version("python")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "layer": layer.name if layer else None}
+
 @router.put("/files/{file_id}")
 async def save_code(file_id: str, data: Dict[str, Any]):
     result = await filesystem_tool.execute(
@@ -112,6 +112,16 @@ async def delete_file_context(context_id: int, db: Session = Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.get("/search")
+async def search_file_contexts(
+    query: str,
+    top_k: int = 8,
+    db: Session = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """Find the file chunks most relevant to a query."""
+    manager = FileContextManager(db, "workspace")
+    return await manager.search_contexts(query, top_k)
+
 @router.get("/", response_model=List[FileContextResponse])
 async def list_file_contexts(
     status: str = "active",
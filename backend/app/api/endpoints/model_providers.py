@@ -8,8 +8,13 @@ from ...schemas.model_provider import (
     ModelProviderUpdate,
     ModelProviderResponse
 )
+from ...core.circuit_breaker import circuit_breakers
 from ...core.model_factory import ModelFactory
 from ...core.model_manager import ModelManager
+from ...core.model_router import model_router
+from ...core.rate_limiter import rate_limiter
+from ...core.response_cache import response_cache
+from ...core.semantic_cache import semantic_cache
 from ...core.config import settings
 
 router = APIRouter()
@@ -66,6 +71,22 @@ PREDEFINED_PROVIDERS = {
 async def get_predefined_providers():
     return PREDEFINED_PROVIDERS
 
+# Declared before the /{provider_id} routes, which would otherwise match "cache"
+@router.get("/cache/stats")
+async def get_response_cache_stats() -> Dict:
+    """Get response cache hit/miss counters."""
+    return {
+        **response_cache.get_stats(),
+        "semantic": semantic_cache.get_stats()
+    }
+
+@router.delete("/cache")
+async def clear_response_cache():
+    """Clear the in-process response and semantic caches."""
+    await response_cache.clear()
+    semantic_cache.clear()
+    return {"status": "success", "message": "Response cache cleared"}
+
 @router.post("/", response_model=ModelProviderResponse)
 async def create_model_provider(
     provider_data: ModelProviderCreate,
@@ -198,6 +219,30 @@ async def list_providers() -> Dict[str, bool]:
         "groq": bool(getattr(settings, 'GROQ_API_KEY', None))
     }
 
+@router.get("/rate-limits/status")
+async def get_rate_limit_status() -> Dict:
+    """Get rate limiter queue depth and wait times per provider/model."""
+    return rate_limiter.get_stats()
+
+@router.get("/routing/stats")
+async def get_routing_stats() -> Dict:
+    """Get rolling latency and error rate per routed endpoint."""
+    return model_router.summary()
+
+@router.get("/providers/circuits")
+async def list_provider_circuits() -> Dict:
+    """List circuit breaker state per provider/model."""
+    return circuit_breakers.summary()
+
+@router.post("/providers/circuits/reset")
+async def reset_provider_circuit(provider: str, model_name: str):
+    """Force a provider/model circuit closed."""
+    try:
+        circuit_breakers.reset(provider, model_name)
+        return {"status": "success", "message": f"Circuit for {provider}/{model_name} reset"}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.get("/models/{provider}")
 async def list_provider_models(provider: str) -> List[Dict[str, str]]:
     """List available models for a provider."""
@@ -28,6 +28,19 @@ async def get_tasks_status(task_ids: List[str]):
             detail=f"Failed to get tasks status: {str(e)}"
         )
 
+@router.get("/batches/{batch_id}/progress")
+async def get_batch_progress(batch_id: str):
+    """Get progress of a batch execution."""
+    try:
+        return await TaskMonitor.get_batch_progress(batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to get batch progress: {str(e)}"
+        )
+
 @router.delete("/{task_id}")
 async def revoke_task(task_id: str, terminate: bool = False):
     """Revoke a running task."""
@@ -0,0 +1,98 @@
+"""Visual inspection endpoints."""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from ...tools.visual_inspection import VisualInspectionTool
+
+router = APIRouter()
+visual_inspection_tool = VisualInspectionTool()
+
+def _raise_for_error(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a tool error into a 400; failed checks are still a valid result."""
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.post("/inspect")
+async def inspect_image(data: Dict[str, Any]):
+    """Inspect a base64 encoded image."""
+    result = await visual_inspection_tool.execute(
+        image_data=data.get("image_data", ""),
+        validation_type=data.get("validation_type", "screenshot"),
+        reference_image=data.get("reference_image"),
+        threshold=data.get("threshold", 0.8),
+        diff_map=data.get("diff_map", False)
+    )
+    return _raise_for_error(result)
+
+@router.post("/inspect/upload")
+async def inspect_upload(
+    image: UploadFile = File(...),
+    reference: Optional[UploadFile] = File(None),
+    validation_type: str = Form("screenshot"),
+    threshold: float = Form(0.8),
+    diff_map: bool = Form(False)
+):
+    """Inspect an image uploaded as a binary file.
+
+    Large screenshots skip the base64 round trip, which inflates the
+    payload by a third and costs an extra copy to decode.
+    """
+    result = await visual_inspection_tool.execute(
+        image_data=await image.read(),
+        validation_type=validation_type,
+        reference_image=await reference.read() if reference else None,
+        threshold=threshold,
+        diff_map=diff_map
+    )
+    return _raise_for_error(result)
+
+@router.post("/compare/batch")
+async def compare_batch(data: Dict[str, Any]):
+    """Compare screenshots to their baselines in the reference store.
+
+    Items without a ``reference`` name are matched to the nearest baseline
+    by perceptual hash.
+    """
+    return await visual_inspection_tool.execute_batch(
+        items=data.get("items", []),
+        threshold=data.get("threshold", 0.8),
+        diff_map=data.get("diff_map", False)
+    )
+
+@router.post("/references")
+async def add_reference(data: Dict[str, Any]):
+    """Store a base64 encoded image as a named baseline."""
+    if not data.get("name"):
+        raise HTTPException(status_code=400, detail="Reference name is required")
+    result = await visual_inspection_tool.add_reference(data["name"], data.get("image_data", ""))
+    return _raise_for_error(result)
+
+@router.post("/references/upload")
+async def upload_reference(
+    image: UploadFile = File(...),
+    name: str = Form(...)
+):
+    """Store an uploaded image file as a named baseline."""
+    result = await visual_inspection_tool.add_reference(name, await image.read())
+    return _raise_for_error(result)
+
+@router.get("/references")
+async def list_references() -> Dict[str, Any]:
+    """List the stored baselines."""
+    return {
+        "references": visual_inspection_tool.references.list_references(),
+        "stats": {
+            **visual_inspection_tool.references.get_stats(),
+            "pool": visual_inspection_tool.pool.get_stats()
+        }
+    }
+
+@router.delete("/references/{name}")
+async def delete_reference(name: str):
+    """Delete a stored baseline."""
+    if not visual_inspection_tool.references.remove(name):
+        raise HTTPException(status_code=404, detail=f"Reference image not found: {name}")
+    return {"success": True}
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from ..models.agent import Agent
@@ -33,7 +33,8 @@ class AgentManager:
             # Initialize model
             await self.model_manager.initialize_model(
                 agent.id,
-                agent.model_config
+                agent.model_config,
+                role=agent.role
             )
 
             return agent
@@ -128,4 +129,22 @@ class AgentManager:
             )
             return response
         except Exception as e:
-            raise ValueError(f"Failed to process message: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Failed to process message: {str(e)}")
+
+    async def stream_message(
+        self,
+        agent_id: int,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream a response to a message as token deltas."""
+        agent = self.active_agents.get(agent_id)
+        if not agent:
+            raise ValueError(f"Agent {agent_id} not found or inactive")
+
+        async for delta in self.model_manager.stream_response(
+            agent_id,
+            message,
+            context
+        ):
+            yield delta
@@ -0,0 +1,45 @@
+"""Redis progress records for batched code execution."""
+
+from typing import Any
+
+BATCH_KEY_PREFIX = "batch-progress:"
+BATCH_PROGRESS_TTL = 86400  # seconds
+
+
+def batch_key(batch_id: str) -> str:
+    """Get the Redis key of a batch's progress record."""
+    return BATCH_KEY_PREFIX + batch_id
+
+
+async def init_progress(redis: Any, batch_id: str, total: int) -> None:
+    """Create the progress record for a batch."""
+    key = batch_key(batch_id)
+    await redis.hset(
+        key,
+        mapping={"total": total, "completed": 0, "failed": 0, "skipped": 0, "aborted": 0}
+    )
+    await redis.expire(key, BATCH_PROGRESS_TTL)
+
+
+async def record_progress(
+    redis: Any,
+    batch_id: str,
+    completed: int = 0,
+    failed: int = 0,
+    skipped: int = 0,
+    abort: bool = False
+) -> None:
+    """Add block counts to a batch's progress in one round trip."""
+    key = batch_key(batch_id)
+    async with redis.pipeline(transaction=True) as pipe:
+        for field, count in (("completed", completed), ("failed", failed), ("skipped", skipped)):
+            if count:
+                pipe.hincrby(key, field, count)
+        if abort:
+            pipe.hset(key, "aborted", 1)
+        await pipe.execute()
+
+
+async def is_aborted(redis: Any, batch_id: str) -> bool:
+    """Check whether any chunk of the batch has aborted it."""
+    return await redis.hget(batch_key(batch_id), "aborted") in (b"1", "1")
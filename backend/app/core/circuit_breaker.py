@@ -0,0 +1,172 @@
+"""Circuit breakers for model providers."""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from .config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit is open."""
+
+
+class CircuitBreaker:
+    """Circuit breaker for one provider/model pair.
+
+    The circuit opens when, over the last ``window`` calls, the error rate
+    or the share of slow calls crosses its threshold. While open, calls
+    fail immediately. After ``open_seconds`` a limited number of probe
+    calls are let through (half-open); a successful probe closes the
+    circuit and a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        window: int = settings.CIRCUIT_BREAKER_WINDOW,
+        min_calls: int = settings.CIRCUIT_BREAKER_MIN_CALLS,
+        error_rate_threshold: float = settings.CIRCUIT_BREAKER_ERROR_RATE,
+        slow_call_seconds: float = settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold: float = settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_calls: int = settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+    ):
+        """Initialize circuit breaker."""
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.probes_in_flight = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed, reserving a probe if half-open."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.probes_in_flight = 0
+
+        if self.state == HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self.probes_in_flight += 1
+        return True
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call and its latency."""
+        slow = latency >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if slow:
+                self._open()
+            else:
+                self._close()
+            return
+        self.calls.append((False, slow))
+        self._evaluate()
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        """Record a failed call."""
+        self.last_error = str(error) if error else None
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self.calls.append((True, False))
+        self._evaluate()
+
+    def release(self) -> None:
+        """Give back a probe reservation for a call that was abandoned."""
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def reset(self) -> None:
+        """Force the circuit closed and forget past calls."""
+        self._close()
+        self.rejected = 0
+        self.last_error = None
+
+    def _evaluate(self) -> None:
+        """Open the circuit if the recent calls cross a threshold."""
+        if len(self.calls) < self.min_calls:
+            return
+        error_rate, slow_rate = self._rates()
+        if (
+            error_rate >= self.error_rate_threshold
+            or slow_rate >= self.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def _rates(self) -> Tuple[float, float]:
+        """Get the error rate and slow-call rate over the window."""
+        if not self.calls:
+            return 0.0, 0.0
+        failed = sum(1 for f, _ in self.calls if f)
+        slow = sum(1 for _, s in self.calls if s)
+        return failed / len(self.calls), slow / len(self.calls)
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes_in_flight = 0
+        self.calls.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the breaker state."""
+        error_rate, slow_rate = self._rates()
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "calls": len(self.calls),
+            "error_rate": error_rate,
+            "slow_call_rate": slow_rate,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in,
+            "last_error": self.last_error
+        }
+
+
+class CircuitBreakerRegistry:
+    """Holds one circuit breaker per provider/model pair."""
+
+    def __init__(self):
+        """Initialize circuit breaker registry."""
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, provider: str, model_name: str) -> CircuitBreaker:
+        """Get or create the breaker for a provider and model."""
+        key = f"{provider}:{model_name}"
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker()
+        return self.breakers[key]
+
+    def reset(self, provider: str, model_name: str) -> None:
+        """Force a breaker closed."""
+        key = f"{provider}:{model_name}"
+        if key not in self.breakers:
+            raise ValueError(f"No circuit breaker for {key}")
+        self.breakers[key].reset()
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize every breaker."""
+        return {key: breaker.to_dict() for key, breaker in self.breakers.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry()
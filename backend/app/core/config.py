@@ -1,6 +1,6 @@
 """Application configuration."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, validator
 
@@ -35,7 +35,125 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     ANTHROPIC_API_KEY: Optional[str] = None
     GOOGLE_API_KEY: Optional[str] = None
+    GROQ_API_KEY: Optional[str] = None
+    OPENROUTER_API_KEY: Optional[str] = None
+
+    # Per-provider HTTP pool overrides, e.g.
+    # {"openai": {"max_connections": 200, "keepalive_expiry": 60}}
+    PROVIDER_POOL_LIMITS: Dict[str, Dict[str, float]] = {}
     
+    # Latency-aware routing between equivalent model endpoints
+    ROUTING_WINDOW: int = 100  # calls kept per endpoint
+    ROUTING_MIN_SAMPLES: int = 5
+    ROUTING_MAX_ERROR_RATE: float = 0.5
+    ROUTING_HEDGE_AFTER: float = 2.0  # seconds, until p95 is known
+
+    # Circuit breakers per provider/model
+    CIRCUIT_BREAKER_WINDOW: int = 20  # calls
+    CIRCUIT_BREAKER_MIN_CALLS: int = 5
+    CIRCUIT_BREAKER_ERROR_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 1
+
+    # Redis
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Rate limiting: "memory" (per worker) or "redis" (shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Overrides keyed by "provider" or "provider:model", e.g.
+    # {"anthropic:claude-3-opus": {"rpm": 20, "tpm": 20000, "max_concurrency": 5}}
+    RATE_LIMITS: Dict[str, Dict[str, int]] = {}
+
+    # Response cache
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL: int = 3600  # seconds
+    RESPONSE_CACHE_USE_REDIS: bool = False
+    RESPONSE_CACHE_SKIP_NONZERO_TEMPERATURE: bool = True
+
+    # Semantic response cache
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92  # cosine similarity
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 512  # per index
+    SEMANTIC_CACHE_MAX_INDEXES: int = 256  # least recently used ones are dropped
+    SEMANTIC_CACHE_DIM: int = 1024
+
+    # File context retrieval
+    FILE_CONTEXT_VECTORS: bool = False  # fuse BM25 with local hashing vectors
+    FILE_CONTEXT_TOP_K: int = 8
+    FILE_CONTEXT_TOKEN_BUDGET: int = 2000
+    
+    # Code execution
+    EXECUTION_MAX_CONCURRENCY: int = 32  # concurrent runs per worker
+    EXECUTION_OUTPUT_LIMIT: int = 1024 * 1024  # stored bytes per stream
+    EXECUTION_STREAM_LOG_EVENTS: int = 1000  # replayable events per job
+    # Warm Python pool: snippets run in children forked from pre-imported
+    # workers instead of a fresh interpreter
+    PYTHON_POOL_ENABLED: bool = True
+    PYTHON_POOL_SIZE: int = 8
+    PYTHON_POOL_MAX_RUNS: int = 500  # snippets per worker before it is replaced
+    PYTHON_POOL_PRELOAD: List[str] = [
+        "json", "re", "math", "random", "datetime", "collections",
+        "itertools", "functools", "typing", "dataclasses"
+    ]
+    # TypeScript is transpiled by a long-lived compiler process and run
+    # with node; falls back to ts-node if the server cannot start
+    TYPESCRIPT_COMPILE_SERVER_ENABLED: bool = True
+    TYPESCRIPT_TRANSPILE_CACHE_SIZE: int = 256
+    # Execution result cache. Scripts opt in or out with an
+    # "exec-cache: deterministic" / "exec-cache: off" comment pragma;
+    # EXECUTION_CACHE_DEFAULT applies to scripts without one. Off, since
+    # scripts may read the clock, randomness, files or the network.
+    EXECUTION_CACHE_ENABLED: bool = True
+    EXECUTION_CACHE_DEFAULT: bool = False
+    EXECUTION_CACHE_MAX_ENTRIES: int = 1024
+    EXECUTION_CACHE_TTL: int = 3600  # seconds
+    EXECUTION_CACHE_USE_REDIS: bool = False
+    # Sandbox profiles (rlimits and optional cgroup v2 limits per run).
+    # SANDBOX_PROFILES adds or overrides profiles, e.g.
+    # {"tiny": {"cpu_seconds": 2, "memory_mb": 128}}
+    SANDBOX_DEFAULT_PROFILE: str = "default"
+    SANDBOX_PROFILES: Dict[str, Dict[str, Any]] = {}
+    # Writable, delegated cgroup v2 directory; runs get a child group each
+    SANDBOX_CGROUP_ROOT: Optional[str] = None
+    # Dependency layers: Python runs that declare requirements get a cached
+    # pip --target directory per requirement set, built from local wheels
+    DEPENDENCY_LAYER_DIR: str = "dependency-layers"
+    DEPENDENCY_WHEELHOUSE: Optional[str] = None
+    DEPENDENCY_ALLOW_INDEX: bool = False  # also install from the package index
+    DEPENDENCY_MAX_LAYERS: int = 32
+    DEPENDENCY_INSTALL_TIMEOUT: int = 300  # seconds
+    # Code validation runs in a process pool whose workers keep black and
+    # pylint imported
+    VALIDATION_POOL_SIZE: int = 4
+    VALIDATION_POOL_MAX_TASKS: int = 200  # checks per worker before it is replaced
+    VALIDATION_POOL_PRELOAD: List[str] = ["black", "pylint.lint"]
+    # Validation results are cached by code hash; pylint re-checks only the
+    # changed definitions of a file it has seen before, unless more than
+    # VALIDATION_INCREMENTAL_MAX_FRACTION of the file would be linted anyway
+    VALIDATION_CACHE_MAX_ENTRIES: int = 4096
+    VALIDATION_CACHE_MAX_FILES: int = 256
+    VALIDATION_INCREMENTAL_MAX_FRACTION: float = 0.6
+    # Security analysis: modules exposing extra SecurityRule objects in a
+    # RULES list, and rule ids to turn off, e.g. ["S105"]
+    SECURITY_RULE_MODULES: List[str] = []
+    SECURITY_DISABLED_RULES: List[str] = []
+    # Image comparison: SSIM over VISUAL_SSIM_WINDOW pixel box windows, computed
+    # per tile of VISUAL_TILE_SIZE pixels only where the images differ; the
+    # tiles are also the regions of diff maps
+    VISUAL_SSIM_WINDOW: int = 7
+    VISUAL_TILE_SIZE: int = 64
+    # Visual regression baselines are stored decoded as memory-mapped arrays
+    # and found by dHash plus pHash bit distance when a screenshot does not
+    # name its baseline; batch comparisons run in a process pool
+    VISUAL_REFERENCE_DIR: str = "visual-references"
+    VISUAL_HASH_MAX_DISTANCE: int = 16  # of the 128 bits of both hashes
+    VISUAL_POOL_SIZE: int = 4
+    # Blocks per Celery task in tasks.batch_execute; smaller batches run inline
+    BATCH_CHUNK_SIZE: int = 10
+
     # File Storage
     WORKSPACE_DIR: str = "workspace"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -0,0 +1,206 @@
+"""Token budgeting for agent conversation histories."""
+
+import hashlib
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Context window sizes in tokens, matched by model name prefix
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "claude-3": 200000,
+    "claude-2": 100000,
+    "gemini-pro": 32768,
+    "mixtral-8x7b": 32768,
+    "llama2-70b": 4096
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Per-message overhead of chat formatting (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Share of the history budget left in use after evicting turns, so the
+# summary is rebuilt once per batch of turns rather than on every message
+HISTORY_LOW_WATER = 0.75
+
+Turn = Dict[str, str]
+Summarizer = Callable[[Optional[str], List[Turn]], Awaitable[str]]
+
+_encodings: Dict[str, object] = {}
+
+
+def _get_encoding(model_name: str):
+    """Get a tiktoken encoding for a model, or None if unavailable offline."""
+    if tiktoken is None:
+        return None
+    if model_name not in _encodings:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Encoding files could not be loaded (e.g. no network)
+            encoding = None
+        _encodings[model_name] = encoding
+    return _encodings[model_name]
+
+
+def count_tokens(text: str, model_name: str = "gpt-4") -> int:
+    """Count tokens with the model's tokenizer, estimating if unavailable."""
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model_name: str = "gpt-4") -> str:
+    """Keep the last ``max_tokens`` tokens of a text."""
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return text[-max_tokens * 4:] if max_tokens > 0 else ""
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[-max_tokens:]) if max_tokens > 0 else ""
+
+
+def context_window_for(model_name: str) -> int:
+    """Get the context window size for a model."""
+    for prefix, window in MODEL_CONTEXT_WINDOWS.items():
+        if model_name.startswith(prefix):
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+class ContextBudgeter:
+    """Keeps a conversation history within a model's token budget.
+
+    The newest turns that fit the budget are sent verbatim. Older turns are
+    folded into a rolling summary, which is only recomputed when more turns
+    fall out of the window. Once the budget overflows, turns are evicted
+    down to ``history_low_water`` of it, so the next several messages fit
+    without another summary.
+    """
+
+    def __init__(
+        self,
+        model_config: Dict[str, object],
+        summarizer: Optional[Summarizer] = None
+    ):
+        """Initialize context budgeter."""
+        self.model_name = str(model_config.get("model_name", "gpt-4"))
+        self.context_window = int(
+            model_config.get("context_window", context_window_for(self.model_name))
+        )
+        self.completion_reserve = int(model_config.get("max_tokens", 1024))
+        self.history_budget = model_config.get("history_token_budget")
+        self.summary_budget = int(model_config.get("summary_token_budget", 512))
+        self.low_water = float(model_config.get("history_low_water", HISTORY_LOW_WATER))
+        self.summarizer = summarizer
+        self.summary: Optional[str] = None
+        self.summarized_upto = 0
+        self._summarized_fingerprint: Optional[str] = None
+        self._token_cache: Dict[str, int] = {}
+
+    def count(self, text: str) -> int:
+        """Count tokens in a text."""
+        return count_tokens(text, self.model_name)
+
+    def count_turn(self, turn: Turn) -> int:
+        """Count tokens in a turn, caching by content."""
+        key = hashlib.sha1(f"{turn['role']}\0{turn['content']}".encode("utf-8")).hexdigest()
+        if key not in self._token_cache:
+            if len(self._token_cache) >= 4096:
+                self._token_cache.clear()
+            self._token_cache[key] = self.count(turn["content"]) + MESSAGE_OVERHEAD_TOKENS
+        return self._token_cache[key]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Keep the last ``max_tokens`` tokens of a text."""
+        return truncate_tokens(text, max_tokens, self.model_name)
+
+    def budget_for(self, reserved_tokens: int = 0) -> int:
+        """Get the token budget left for history."""
+        available = self.context_window - self.completion_reserve - reserved_tokens
+        if self.history_budget is not None:
+            available = min(available, int(self.history_budget))
+        return max(0, available)
+
+    async def fit(
+        self,
+        history: List[Turn],
+        reserved_tokens: int = 0
+    ) -> Tuple[Optional[str], List[Turn]]:
+        """Fit a history into the budget.
+
+        ``reserved_tokens`` covers the system prompt and the new message.
+        Returns the rolling summary of older turns (or None) and the recent
+        turns to send verbatim.
+        """
+        self._check_history(history)
+
+        budget = self.budget_for(reserved_tokens)
+        if self.summary is not None or self.summarizer is not None:
+            budget = max(0, budget - self.summary_budget)
+
+        start = self._window_start(history, budget)
+        if start > self.summarized_upto:
+            # Overflowing: evict down to the low-water mark in one go
+            start = max(start, self._window_start(history, int(budget * self.low_water)))
+            evicted = history[self.summarized_upto:start]
+            if self.summarizer is not None:
+                self.summary = await self.summarizer(self.summary, evicted)
+            self.summarized_upto = start
+            self._summarized_fingerprint = self._fingerprint(history, start)
+
+        return self.summary, history[start:]
+
+    def _window_start(self, history: List[Turn], budget: int) -> int:
+        """Walk back from the newest turn until the budget is spent."""
+        start = len(history)
+        used = 0
+        while start > self.summarized_upto:
+            cost = self.count_turn(history[start - 1])
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        return start
+
+    def compact(self, history: List[Turn]) -> None:
+        """Drop already-summarized turns from a history list in place."""
+        if self.summarized_upto:
+            del history[:self.summarized_upto]
+            self.summarized_upto = 0
+            self._summarized_fingerprint = None
+
+    def reset(self) -> None:
+        """Forget the rolling summary."""
+        self.summary = None
+        self.summarized_upto = 0
+        self._summarized_fingerprint = None
+
+    def _check_history(self, history: List[Turn]) -> None:
+        """Reset the summary if the summarized turns were changed or removed."""
+        if self.summarized_upto == 0:
+            return
+        if (
+            len(history) < self.summarized_upto
+            or self._fingerprint(history, self.summarized_upto) != self._summarized_fingerprint
+        ):
+            self.reset()
+
+    @staticmethod
+    def _fingerprint(history: List[Turn], upto: int) -> str:
+        """Identify the last summarized turn."""
+        turn = history[upto - 1]
+        return hashlib.sha1(
+            f"{upto}\0{turn['role']}\0{turn['content']}".encode("utf-8")
+        ).hexdigest()
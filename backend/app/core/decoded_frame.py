@@ -0,0 +1,102 @@
+"""Decode-once image frames shared by the visual checks."""
+
+import base64
+import binascii
+import io
+from typing import Optional, Tuple, Union
+import cv2
+import numpy as np
+from PIL import Image
+
+ImageInput = Union[str, bytes, bytearray, memoryview, "DecodedFrame"]
+
+
+class DecodedFrame:
+    """An encoded image that is decoded at most once per view.
+
+    The gray and BGR color views are NumPy arrays decoded lazily by OpenCV
+    and cached, so every check on a frame shares the same buffers. A check
+    that only needs gray never pays for a color decode; once color exists,
+    gray is converted from it instead of decoding the file again.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        """Initialize frame from encoded image bytes (PNG, JPEG, ...)."""
+        if not data:
+            raise ValueError("Empty image data")
+        self._buffer = np.frombuffer(data, np.uint8)
+        self._gray: Optional[np.ndarray] = None
+        self._color: Optional[np.ndarray] = None
+        self._size: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_base64(cls, data: str) -> "DecodedFrame":
+        """Create a frame from base64 text, with or without a data URL prefix."""
+        if data.startswith("data:"):
+            data = data.partition(",")[2]
+        try:
+            return cls(base64.b64decode(data))
+        except binascii.Error as e:
+            raise ValueError(f"Invalid base64 image data: {str(e)}")
+
+    @classmethod
+    def load(cls, data: ImageInput) -> "DecodedFrame":
+        """Get a frame from base64 text, raw bytes or an existing frame."""
+        if isinstance(data, DecodedFrame):
+            return data
+        if isinstance(data, str):
+            return cls.from_base64(data)
+        return cls(data)
+
+    def _decode(self, flags: int) -> np.ndarray:
+        """Decode the encoded bytes with OpenCV."""
+        image = cv2.imdecode(self._buffer, flags)
+        if image is None:
+            raise ValueError("Failed to decode image")
+        self._size = (image.shape[1], image.shape[0])
+        return image
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Get the 8-bit grayscale view."""
+        if self._gray is None:
+            if self._color is not None:
+                self._gray = cv2.cvtColor(self._color, cv2.COLOR_BGR2GRAY)
+            else:
+                self._gray = self._decode(cv2.IMREAD_GRAYSCALE)
+        return self._gray
+
+    @property
+    def color(self) -> np.ndarray:
+        """Get the 8-bit BGR color view."""
+        if self._color is None:
+            self._color = self._decode(cv2.IMREAD_COLOR)
+        return self._color
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Get (width, height), reading only the image header if nothing is decoded."""
+        if self._size is None:
+            try:
+                with Image.open(io.BytesIO(self._buffer)) as image:
+                    self._size = image.size
+            except Exception:
+                self._size = self.gray.shape[::-1]
+        return self._size
+
+    @property
+    def width(self) -> int:
+        """Get the image width in pixels."""
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        """Get the image height in pixels."""
+        return self.size[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory held by the encoded bytes and decoded views."""
+        return sum(
+            a.nbytes for a in (self._buffer, self._gray, self._color) if a is not None
+        )
@@ -0,0 +1,276 @@
+"""Content-addressed dependency layers for Python code execution."""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import uuid
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from .config import settings
+
+# A distribution name with optional extras and version specifiers, e.g.
+# "requests", "pandas>=2,<3", "uvicorn[standard]==0.24.0". Anything else,
+# in particular pip options, URLs and paths, is rejected.
+REQUIREMENT_PATTERN = re.compile(
+    r"^(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)"
+    r"(?P<extras>\[[A-Za-z0-9._,\s-]+\])?"
+    r"(?P<spec>\s*(?:===|==|!=|~=|<=|>=|<|>)\s*[A-Za-z0-9.*+!_-]+"
+    r"(?:\s*,\s*(?:===|==|!=|~=|<=|>=|<|>)\s*[A-Za-z0-9.*+!_-]+)*)?$"
+)
+
+# How often a run waiting for a layer's lock checks it again
+LOCK_POLL_INTERVAL = 0.05  # seconds
+
+
+def normalize_requirements(requirements: List[str]) -> List[str]:
+    """Validate requirements and bring them to a canonical, sorted form."""
+    normalized = set()
+    for requirement in requirements:
+        match = REQUIREMENT_PATTERN.match(requirement.strip())
+        if not match:
+            raise ValueError(f"Invalid requirement: {requirement!r}")
+        # PEP 503 name normalization
+        name = re.sub(r"[-_.]+", "-", match.group("name")).lower()
+        extras = match.group("extras") or ""
+        if extras:
+            extras = "[" + ",".join(sorted(e.strip().lower() for e in extras[1:-1].split(","))) + "]"
+        spec = re.sub(r"\s+", "", match.group("spec") or "")
+        spec = ",".join(sorted(spec.split(","))) if spec else ""
+        normalized.add(f"{name}{extras}{spec}")
+    return sorted(normalized)
+
+
+class DependencyLayerCache:
+    """Pre-built package directories shared by runs with the same requirements.
+
+    A layer is a ``pip install --target`` directory named by the hash of its
+    normalized requirements, the interpreter version and the platform. Runs
+    put the layer on ``sys.path``, so a run whose layer already exists costs
+    no more than a plain run. Layers are installed from wheels only, from the
+    local wheelhouse and, if DEPENDENCY_ALLOW_INDEX is set, the package
+    index, and the least recently used ones are removed beyond
+    ``max_layers``, except those runs hold with ``acquire``. A run holds a
+    shared lock on the layer's lock file, so this works across workers.
+    """
+
+    def __init__(
+        self,
+        python_command: List[str],
+        root: str = settings.DEPENDENCY_LAYER_DIR,
+        wheelhouse: Optional[str] = settings.DEPENDENCY_WHEELHOUSE,
+        allow_index: bool = settings.DEPENDENCY_ALLOW_INDEX,
+        max_layers: int = settings.DEPENDENCY_MAX_LAYERS
+    ):
+        """Initialize dependency layer cache."""
+        self.python_command = python_command
+        self.root = Path(root).resolve()
+        self.wheelhouse = Path(wheelhouse).resolve() if wheelhouse else None
+        self.allow_index = allow_index
+        self.max_layers = max_layers
+        # In-flight builds per event loop, so concurrent runs share one install
+        self._builds = weakref.WeakKeyDictionary()
+        # Layers in use by runs of this process: lock file descriptor and count
+        self._leases: Dict[Path, Tuple[int, int]] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "builds": 0,
+            "failures": 0
+        }
+
+    def layer_key(self, requirements: List[str], interpreter_version: str) -> str:
+        """Get the content address of a layer."""
+        identity = json.dumps({
+            "requirements": requirements,
+            "interpreter": interpreter_version,
+            "platform": f"{platform.system()}-{platform.machine()}"
+        }, sort_keys=True)
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    async def resolve(self, requirements: List[str], interpreter_version: str) -> Optional[Path]:
+        """Get the layer directory for a set of requirements, building it if needed."""
+        requirements = normalize_requirements(requirements)
+        if not requirements:
+            return None
+        key = self.layer_key(requirements, interpreter_version)
+        path = self.root / key
+        if path.is_dir():
+            self.stats["hits"] += 1
+            self._touch(path)
+            return path
+
+        loop = asyncio.get_running_loop()
+        builds = self._builds.setdefault(loop, {})
+        if key not in builds:
+            builds[key] = asyncio.ensure_future(self._build(requirements, path))
+            builds[key].add_done_callback(lambda _: builds.pop(key, None))
+        # Shield the shared build from a single waiter's cancellation
+        return await asyncio.shield(builds[key])
+
+    async def acquire(self, requirements: List[str], interpreter_version: str) -> Optional[Path]:
+        """Resolve a layer and keep it from being pruned until ``release``."""
+        while True:
+            path = await self.resolve(requirements, interpreter_version)
+            if path is None:
+                return None
+            await self._lease(path)
+            if path.is_dir():
+                return path
+            # Pruned between resolving and locking it; build it again
+            self.release(path)
+
+    def release(self, path: Path) -> None:
+        """Let a layer be pruned again once no run of this process uses it."""
+        fd, count = self._leases[path]
+        if count > 1:
+            self._leases[path] = (fd, count - 1)
+            return
+        del self._leases[path]
+        os.close(fd)  # drops the shared lock
+
+    def _lock_file(self, path: Path) -> Path:
+        """Get the lock file marking a layer in use."""
+        return self.root / f".{path.name}.lock"
+
+    def _try_lock(self, path: Path, operation: int) -> Optional[int]:
+        """Lock a layer's lock file without blocking; None if it is held.
+
+        A prune deletes the lock file along with the layer, so after
+        locking, the file must still be the one at the lock path.
+        """
+        lock_file = self._lock_file(path)
+        while True:
+            fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, operation | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+            try:
+                current = os.stat(lock_file).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(fd).st_ino:
+                return fd
+            # Deleted by a prune after it was opened; lock the new file
+            os.close(fd)
+
+    async def _lease(self, path: Path) -> None:
+        """Take a shared lock on a layer, or count one more user of it."""
+        while path not in self._leases:
+            fd = self._try_lock(path, fcntl.LOCK_SH)
+            if fd is not None:
+                self._leases[path] = (fd, 0)
+            else:
+                # A prune is deleting the layer; poll rather than block the loop
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+        fd, count = self._leases[path]
+        self._leases[path] = (fd, count + 1)
+
+    async def _build(self, requirements: List[str], path: Path) -> Path:
+        """Install requirements into a fresh layer and publish it atomically."""
+        if self.wheelhouse is None and not self.allow_index:
+            raise ValueError("No wheelhouse configured for installing requirements")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".build-{uuid.uuid4().hex}"
+        command = [
+            *self.python_command, "-m", "pip", "install",
+            "--target", str(staging),
+            "--only-binary", ":all:",
+            "--disable-pip-version-check",
+            "--no-input",
+            "--quiet"
+        ]
+        if self.wheelhouse is not None:
+            command += ["--find-links", str(self.wheelhouse)]
+        if not self.allow_index:
+            command.append("--no-index")
+        command += requirements
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(
+                    process.communicate(),
+                    settings.DEPENDENCY_INSTALL_TIMEOUT
+                )
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                process.kill()
+                await process.wait()
+                raise
+            if process.returncode != 0:
+                raise ValueError(stderr.decode("utf-8", errors="replace").strip())
+            (staging / ".requirements.txt").write_text("\n".join(requirements) + "\n")
+
+            try:
+                # Another worker may have published the same layer meanwhile
+                os.rename(staging, path)
+            except OSError:
+                if not path.is_dir():
+                    raise
+        except asyncio.TimeoutError:
+            self.stats["failures"] += 1
+            raise ValueError(
+                f"Failed to install requirements: timed out after "
+                f"{settings.DEPENDENCY_INSTALL_TIMEOUT} seconds"
+            )
+        except Exception as e:
+            self.stats["failures"] += 1
+            raise ValueError(f"Failed to install requirements: {str(e)}")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.stats["builds"] += 1
+        self._prune(keep=path)
+        return path
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark a layer as recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _prune(self, keep: Path) -> None:
+        """Remove the least recently used layers beyond ``max_layers``."""
+        layers = [p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        if len(layers) <= self.max_layers:
+            return
+        layers.sort(key=lambda p: p.stat().st_mtime)
+        for layer in layers[:len(layers) - self.max_layers]:
+            if layer == keep or layer in self._leases:
+                continue
+            # Skip layers a run of any worker holds
+            fd = self._try_lock(layer, fcntl.LOCK_EX)
+            if fd is None:
+                continue
+            try:
+                shutil.rmtree(layer, ignore_errors=True)
+                self._lock_file(layer).unlink(missing_ok=True)
+            finally:
+                os.close(fd)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get layer hit/build counters and the number of layers on disk."""
+        layers = 0
+        if self.root.is_dir():
+            layers = sum(1 for p in self.root.iterdir() if p.is_dir() and not p.name.startswith("."))
+        return {
+            **self.stats,
+            "layers": layers,
+            "in_use": len(self._leases),
+            "max_layers": self.max_layers,
+            "wheelhouse": str(self.wheelhouse) if self.wheelhouse else None,
+            "allow_index": self.allow_index
+        }
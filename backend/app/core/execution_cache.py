@@ -0,0 +1,90 @@
+"""Content-hash cache for code execution results."""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+from .config import settings
+from .response_cache import TwoTierCache
+
+KEY_PREFIX = "execution-cache:"
+
+# "# exec-cache: deterministic" opts a script in, "# exec-cache: off" opts it
+# out; "//" comments work for JavaScript and TypeScript.
+PRAGMA_PATTERN = re.compile(
+    r"^\s*(?:#|//)\s*exec-cache:\s*(deterministic|off)\b",
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def cache_pragma(code: str) -> Optional[str]:
+    """Get the exec-cache pragma of a script, if any."""
+    match = PRAGMA_PATTERN.search(code)
+    return match.group(1).lower() if match else None
+
+
+class ExecutionCache(TwoTierCache):
+    """Two-tier execution result cache: an in-process LRU and optional Redis.
+
+    Results are keyed by language, code, environment overrides, interpreter
+    version, sandbox profile and requirements, so re-running a byte-identical
+    snippet returns the stored result without starting a process.
+    """
+
+    key_prefix = KEY_PREFIX
+
+    def __init__(
+        self,
+        max_entries: int = settings.EXECUTION_CACHE_MAX_ENTRIES,
+        default_ttl: int = settings.EXECUTION_CACHE_TTL,
+        use_redis: bool = settings.EXECUTION_CACHE_USE_REDIS
+    ):
+        """Initialize execution cache."""
+        super().__init__(max_entries, default_ttl, use_redis)
+
+    def encode(self, value: Dict[str, Any]) -> str:
+        """Serialize a result for Redis."""
+        return json.dumps(value)
+
+    def decode(self, raw: str) -> Dict[str, Any]:
+        """Deserialize a result read from Redis."""
+        return json.loads(raw)
+
+    @staticmethod
+    def make_key(
+        language: str,
+        code: str,
+        env_vars: Optional[Dict[str, str]],
+        interpreter_version: str,
+        profile: str = "",
+        requirements: Optional[List[str]] = None
+    ) -> str:
+        """Build a cache key for an execution."""
+        env = json.dumps(env_vars or {}, sort_keys=True, separators=(",", ":"))
+        parts = [
+            language,
+            hashlib.sha256(code.encode("utf-8")).hexdigest(),
+            hashlib.sha256(env.encode("utf-8")).hexdigest(),
+            interpreter_version,
+            profile,
+            "\n".join(sorted(requirements or []))
+        ]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, code: str, cache: Optional[bool] = None) -> bool:
+        """Check whether a script's result may be cached.
+
+        An explicit ``cache`` argument wins, then the script's pragma, then
+        the EXECUTION_CACHE_DEFAULT setting, which is off.
+        """
+        if not settings.EXECUTION_CACHE_ENABLED:
+            return False
+        if cache is not None:
+            return cache
+        pragma = cache_pragma(code)
+        if pragma is not None:
+            return pragma == "deterministic"
+        return settings.EXECUTION_CACHE_DEFAULT
+
+
+execution_cache = ExecutionCache()
@@ -1,18 +1,50 @@
 """Code execution engine for running and validating code."""
 
-import subprocess
-import tempfile
+import asyncio
+import codecs
+import json
 import os
 import shutil
-from typing import Dict, Any
+import signal
+import tempfile
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional
 from pathlib import Path
+from .config import settings
+from .dependency_layers import DependencyLayerCache
+from .execution_cache import execution_cache
+from .output_stream import CappedOutput
+from .python_pool import PythonWorkerPool
+from .sandbox import build_env, cgroups, describe_exit, launcher_command, profile_for, rlimits_for
+from .ts_compiler import TypeScriptCompiler
+
+OUTPUT_CHUNK_SIZE = 4096
+
+OutputCallback = Callable[[str, str], Awaitable[None]]
 
 class ExecutionEngine:
-    """Engine for executing code in a sandboxed environment."""
+    """Engine for executing code in a sandboxed environment.
+
+    Runs are asyncio subprocesses, so a long-running script does not block
+    the event loop. Each run gets its own scratch directory, and at most
+    ``max_concurrency`` runs execute at once; the rest wait their turn.
+    Python runs use the warm worker pool when it is enabled, and TypeScript
+    is transpiled by a persistent compile server and run like JavaScript.
+    Stored stdout and stderr are capped at EXECUTION_OUTPUT_LIMIT bytes each.
+    Every run is limited by a sandbox profile (see ``sandbox.py``) and
+    reports its peak RSS and CPU time under ``resources``. Python runs may
+    declare requirements, which are served from cached dependency layers.
+    """
 
-    def __init__(self):
+    def __init__(self, max_concurrency: int = settings.EXECUTION_MAX_CONCURRENCY):
         """Initialize execution engine."""
         self.temp_dir = Path(tempfile.mkdtemp())
+        self.max_concurrency = max_concurrency
+        # Semaphores bind to the event loop they are first used on, and
+        # Celery workers run each task in a fresh loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.running = 0
+        self._versions: Dict[tuple, str] = {}
         self.supported_languages = {
             "python": {
                 "extension": ".py",
@@ -30,14 +62,42 @@ class ExecutionEngine:
                 "timeout": 30
             }
         }
+        self.python_pool = None
+        if settings.PYTHON_POOL_ENABLED and hasattr(os, "fork"):
+            self.python_pool = PythonWorkerPool(self.supported_languages["python"]["command"])
+        self.ts_compiler = None
+        if settings.TYPESCRIPT_COMPILE_SERVER_ENABLED:
+            self.ts_compiler = TypeScriptCompiler(self.supported_languages["javascript"]["command"])
+        self.layers = DependencyLayerCache(self.supported_languages["python"]["command"])
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrent-run semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
 
     async def execute_code(
         self,
         code: str,
         language: str,
-        env_vars: Dict[str, str] = None
+        env_vars: Dict[str, str] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[bool] = None,
+        profile: Optional[str] = None,
+        requirements: Optional[List[str]] = None
     ) -> Dict[str, Any]:
-        """Execute code in a sandboxed environment."""
+        """Execute code in a sandboxed environment.
+
+        ``profile`` names the sandbox profile, SANDBOX_DEFAULT_PROFILE if
+        omitted. ``requirements`` lists the packages a Python run needs on
+        top of the server's own, e.g. ``["pandas>=2"]``.
+
+        Only scripts marked ``# exec-cache: deterministic`` have their
+        completed results cached by content. ``cache`` forces caching on or
+        off; scripts without the pragma follow EXECUTION_CACHE_DEFAULT,
+        which is off.
+        """
         if language not in self.supported_languages:
             return {
                 "success": False,
@@ -45,56 +105,342 @@ class ExecutionEngine:
                 "output": None
             }
 
-        try:
-            # Create temporary file
-            lang_config = self.supported_languages[language]
-            file_path = self.temp_dir / f"code{lang_config['extension']}"
-            with open(file_path, "w") as f:
-                f.write(code)
-
-            # Prepare environment
-            env = os.environ.copy()
-            if env_vars:
-                env.update(env_vars)
-
-            # Execute code
-            process = subprocess.Popen(
-                [*lang_config["command"], str(file_path)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env=env,
-                text=True
+        if not execution_cache.is_cacheable(code, cache):
+            execution_cache.record_bypass()
+            return await self._execute(
+                code, language, env_vars, timeout, profile=profile, requirements=requirements
             )
 
-            try:
-                stdout, stderr = process.communicate(timeout=lang_config["timeout"])
-                return {
-                    "success": process.returncode == 0,
-                    "error": stderr if stderr else None,
-                    "output": stdout
+        key = execution_cache.make_key(
+            language,
+            code,
+            env_vars,
+            await self.interpreter_version(language),
+            profile or settings.SANDBOX_DEFAULT_PROFILE,
+            requirements
+        )
+        cached = await execution_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        result = await self._execute(
+            code, language, env_vars, timeout, profile=profile, requirements=requirements
+        )
+        # Only runs that completed; timeouts and start failures are transient
+        if "exit_code" in result:
+            await execution_cache.set(key, result)
+        return result
+
+    async def stream_code(
+        self,
+        code: str,
+        language: str,
+        env_vars: Dict[str, str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[str] = None,
+        requirements: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute code, yielding output as it is produced.
+
+        Yields ``stdout`` and ``stderr`` events with a ``data`` chunk, then
+        a ``done`` event with the same result ``execute_code`` returns.
+        Streamed runs bypass the result cache and the warm Python pool.
+        """
+        if language not in self.supported_languages:
+            yield {
+                "event": "done",
+                "result": {
+                    "success": False,
+                    "error": f"Unsupported language: {language}",
+                    "output": None
                 }
-            except subprocess.TimeoutExpired:
-                process.kill()
+            }
+            return
+
+        # Bounded, so a slow client applies backpressure to the process
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+
+        async def on_output(stream: str, data: str) -> None:
+            await queue.put({"event": stream, "data": data})
+
+        async def run() -> None:
+            result = await self._execute(
+                code, language, env_vars, timeout, on_output, profile, requirements
+            )
+            await queue.put({"event": "done", "result": result})
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] == "done":
+                    break
+        finally:
+            # The client went away; cancelling kills the process
+            if not task.done():
+                task.cancel()
+
+    async def interpreter_version(self, language: str) -> str:
+        """Get the version of the runtime that executes a language."""
+        if language == "typescript" and self.ts_compiler is not None and self.ts_compiler.available:
+            node = await self._command_version(self.supported_languages["javascript"]["command"])
+            return f"{node} typescript {self.ts_compiler.version}"
+        return await self._command_version(self.supported_languages[language]["command"])
+
+    async def _command_version(self, command: list) -> str:
+        """Run ``command --version`` once and remember the answer."""
+        key = tuple(command)
+        if key not in self._versions:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    "--version",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT
+                )
+                stdout, _ = await asyncio.wait_for(process.communicate(), 10)
+                self._versions[key] = stdout.decode("utf-8", errors="replace").strip()
+            except (OSError, asyncio.TimeoutError):
+                return "unknown"
+        return self._versions[key]
+
+    async def _execute(
+        self,
+        code: str,
+        language: str,
+        env_vars: Optional[Dict[str, str]],
+        timeout: Optional[float],
+        on_output: Optional[OutputCallback] = None,
+        profile: Optional[str] = None,
+        requirements: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Run code in its own scratch directory, bypassing the cache."""
+        try:
+            limits = profile_for(profile)
+        except ValueError as e:
+            return {"success": False, "error": str(e), "output": None}
+
+        layer = None
+        if requirements:
+            if language != "python":
                 return {
                     "success": False,
-                    "error": f"Execution timed out after {lang_config['timeout']} seconds",
+                    "error": f"Requirements are not supported for {language}",
                     "output": None
                 }
+            # Acquired before taking a run slot, since a first install can take a
+            # while; held until the run ends so the layer is not pruned under it
+            try:
+                layer = await self.layers.acquire(
+                    requirements,
+                    await self.interpreter_version(language)
+                )
+            except ValueError as e:
+                return {"success": False, "error": str(e), "output": None}
+
+        try:
+            lang_config = self.supported_languages[language]
+            timeout = timeout or lang_config["timeout"]
+            async with self._get_semaphore():
+                self.running += 1
+                workdir = Path(tempfile.mkdtemp(prefix="run-", dir=self.temp_dir))
+                cgroup = cgroups.create(limits)
+                try:
+                    result = await self._run_sandboxed(
+                        code, language, env_vars, timeout, on_output, limits, workdir, cgroup, layer
+                    )
+                except Exception as e:
+                    return {
+                        "success": False,
+                        "error": str(e),
+                        "output": None
+                    }
+                finally:
+                    self.running -= 1
+                    cgroup_stats = cgroups.stats(cgroup)
+                    cgroups.remove(cgroup)
+                    shutil.rmtree(workdir, ignore_errors=True)
+        finally:
+            if layer is not None:
+                self.layers.release(layer)
+
+        if "exit_code" in result:
+            # cgroup accounting covers every process of the run
+            resources = {**result.get("resources", {}), **cgroup_stats}
+            result["resources"] = {**resources, "profile": limits["name"]}
+            reason = describe_exit(result["exit_code"])
+            if reason is None and resources.get("oom_killed"):
+                reason = "Memory limit exceeded"
+            if reason:
+                result["error"] = f"{result['error'] or ''}{reason}\n"
+        return result
+
+    async def _run_sandboxed(
+        self,
+        code: str,
+        language: str,
+        env_vars: Optional[Dict[str, str]],
+        timeout: float,
+        on_output: Optional[OutputCallback],
+        limits: Dict[str, Any],
+        workdir: Path,
+        cgroup: Optional[Path],
+        layer: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """Run code under a sandbox profile's limits."""
+        lang_config = self.supported_languages[language]
+        # Write code into the run's own scratch directory
+        file_path = workdir / f"code{lang_config['extension']}"
+        file_path.write_text(code)
+        env = build_env(limits, env_vars, workdir)
+        sys_path = [str(layer)] if layer is not None else []
+
+        if language == "python" and self.python_pool is not None and on_output is None:
+            return await self.python_pool.run(
+                file_path,
+                workdir,
+                env,
+                timeout,
+                rlimits_for(limits),
+                cgroup,
+                sys_path
+            )
+
+        command = [*lang_config["command"], str(file_path)]
+        if language == "typescript":
+            compiled = await self._transpile(code)
+            if compiled is not None:
+                if compiled["errors"]:
+                    return {
+                        "success": False,
+                        "error": "\n".join(compiled["errors"]),
+                        "output": None
+                    }
+                file_path = workdir / "code.js"
+                file_path.write_text(compiled["output"])
+                command = [*self.supported_languages["javascript"]["command"], str(file_path)]
+
+        address_space = language == "python"
+        if sys_path:
+            env["PYTHONPATH"] = os.pathsep.join([*sys_path, *filter(None, [env.get("PYTHONPATH")])])
+        if not address_space:
+            # V8 reserves far more address space than it uses, so cap its heap
+            env["NODE_OPTIONS"] = (
+                f"{env.get('NODE_OPTIONS', '')} --max-old-space-size={limits['memory_mb']}"
+            ).strip()
 
-        except Exception as e:
+        rusage_path = workdir / ".rusage.json"
+        result = await self._run_process(
+            launcher_command(command, rlimits_for(limits, address_space), cgroup, rusage_path),
+            workdir,
+            env,
+            timeout,
+            on_output
+        )
+        if rusage_path.exists():
+            result["resources"] = json.loads(rusage_path.read_text())
+        return result
+
+    async def _transpile(self, code: str) -> Optional[Dict[str, Any]]:
+        """Transpile TypeScript, or return None to fall back to ts-node."""
+        if self.ts_compiler is None or self.ts_compiler.available is False:
+            return None
+        try:
+            return await self.ts_compiler.transpile(code)
+        except RuntimeError:
+            return None
+
+    async def _run_process(
+        self,
+        command: list,
+        workdir: Path,
+        env: Dict[str, str],
+        timeout: float,
+        on_output: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
+        """Run a command to completion, killing it on timeout or cancellation."""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(workdir),
+            env=env,
+            # Own process group, so children are killed along with the script
+            start_new_session=True
+        )
+        stdout = CappedOutput()
+        stderr = CappedOutput()
+
+        async def pump(stream: asyncio.StreamReader, buffer: CappedOutput, name: str) -> None:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while True:
+                chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buffer.append(chunk)
+                if on_output is not None:
+                    text = decoder.decode(chunk)
+                    if text:
+                        await on_output(name, text)
+
+        pumps = asyncio.gather(
+            pump(process.stdout, stdout, "stdout"),
+            pump(process.stderr, stderr, "stderr"),
+            process.wait()
+        )
+        # Mark the outcome retrieved when the run is abandoned midway
+        pumps.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            await asyncio.wait_for(pumps, timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
             return {
                 "success": False,
-                "error": str(e),
-                "output": None
+                "error": f"Execution timed out after {timeout} seconds",
+                "output": stdout.text() or None
             }
-        finally:
-            # Cleanup
-            if file_path.exists():
-                file_path.unlink()
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        stderr_text = stderr.text()
+        return {
+            "success": process.returncode == 0,
+            "error": stderr_text if stderr_text else None,
+            "output": stdout.text(),
+            "exit_code": process.returncode
+        }
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        """Kill a run's process group and reap it."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of running and allowed concurrent runs."""
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "python_pool": self.python_pool.get_stats() if self.python_pool else None,
+            "typescript": self.ts_compiler.get_stats() if self.ts_compiler else None,
+            "dependency_layers": self.layers.get_stats()
+        }
 
     def cleanup(self):
-        """Clean up temporary files."""
+        """Stop pooled workers and the compile server, and clean up temporary files."""
+        if self.python_pool is not None:
+            self.python_pool.close()
+        if self.ts_compiler is not None:
+            self.ts_compiler.close()
         try:
             shutil.rmtree(self.temp_dir)
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+
+execution_engine = ExecutionEngine()
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from ..models.file_context import FileContext
 from ..tools.filesystem import FileSystemTool
+from .retrieval import file_context_index
 
 class FileContextManager:
     """Manager class for file context operations."""
@@ -47,6 +48,7 @@ class FileContextManager:
             self.db.add(context)
             self.db.commit()
             self.db.refresh(context)
+            file_context_index.update_file(context.id, context.file_path, content)
             
             return context
         except Exception as e:
@@ -103,6 +105,9 @@ class FileContextManager:
             context.updated_at = datetime.utcnow()
             self.db.commit()
             self.db.refresh(context)
+            if content is not None:
+                # Only the chunks whose text changed are re-indexed
+                file_context_index.update_file(context.id, context.file_path, content)
             
             return context
         except Exception as e:
@@ -126,10 +131,19 @@ class FileContextManager:
             # Delete database record
             self.db.delete(context)
             self.db.commit()
+            file_context_index.remove_file(context_id)
         except Exception as e:
             self.db.rollback()
             raise ValueError(f"Failed to delete file context: {str(e)}")
 
+    async def search_contexts(self, query: str, top_k: int = 8) -> List[Dict[str, Any]]:
+        """Find the file chunks most relevant to a query."""
+        if not file_context_index.file_chunks:
+            # Index is per process; build it from the database on first use
+            for context in await self.list_contexts():
+                file_context_index.update_file(context.id, context.file_path, context.content or "")
+        return file_context_index.search(query, top_k)
+
     async def list_contexts(self, status: str = "active") -> List[FileContext]:
         """List all file contexts with given status."""
         query = self.db.query(FileContext)
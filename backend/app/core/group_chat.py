@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 
@@ -56,49 +57,241 @@ class GroupChatOrchestrator:
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[ChatMessage]:
         """Process a message in the group chat."""
-        chat_state = self.active_chats.get(session_id)
-        if not chat_state or chat_state["status"] != "active":
-            raise ValueError(f"Chat session {session_id} not found or inactive")
+        chat_state = self._get_active_chat(session_id)
+        participants = self._get_participants(chat_state, sender_id)
 
         try:
-            # Create user message
-            user_message = ChatMessage(
-                session_id=session_id,
-                content=content,
-                message_type="user",
-                metadata=metadata or {}
-            )
-            self.db.add(user_message)
-            
-            responses = []
             # Get responses from all agents
-            for agent_id, agent in chat_state["agents"].items():
-                if agent_id != sender_id:  # Don't let agent respond to itself
-                    response = await self.agent_manager.process_message(
-                        agent_id,
-                        content,
-                        context={
-                            "session_id": session_id,
-                            "chat_config": chat_state["config"]
-                        }
-                    )
-                    
-                    agent_message = ChatMessage(
-                        session_id=session_id,
-                        agent_id=agent_id,
-                        content=response,
-                        message_type="agent",
-                        metadata={"role": agent.role}
-                    )
-                    self.db.add(agent_message)
-                    responses.append(agent_message)
-            
-            self.db.commit()
-            return responses
+            results = await self._fan_out(
+                participants,
+                content,
+                self._agent_context(session_id, chat_state),
+                chat_state["config"]
+            )
+            return self._store_responses(
+                session_id,
+                content,
+                metadata,
+                participants,
+                results
+            )
+        except Exception as e:
+            self.db.rollback()
+            raise ValueError(f"Failed to process message: {str(e)}")
+
+    async def stream_message(
+        self,
+        session_id: int,
+        content: str,
+        sender_id: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process a message in the group chat, streaming agent tokens.
+
+        Yields ``token`` events tagged with the agent ID as deltas arrive,
+        then one ``message`` event per stored reply and a final ``done``.
+        Like ``process_message``, each agent gets ``agent_timeout`` seconds,
+        and a ``sequential`` group streams one agent at a time.
+        """
+        chat_state = self._get_active_chat(session_id)
+        participants = self._get_participants(chat_state, sender_id)
+        agent_context = self._agent_context(session_id, chat_state)
+        config = chat_state["config"]
+        timeout = config.get("agent_timeout")
+        if config.get("fan_out", "concurrent") == "sequential":
+            max_concurrency = 1
+        else:
+            max_concurrency = config.get("max_concurrency") or len(participants) or 1
+        # Tasks wait on the semaphore in creation order, so sequential
+        # replies come in participant order
+        semaphore = asyncio.Semaphore(max_concurrency)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump(agent_id: int) -> Tuple[Optional[str], Optional[str]]:
+            chunks = []
+
+            async def stream() -> None:
+                async for delta in self.agent_manager.stream_message(
+                    agent_id,
+                    content,
+                    context=agent_context
+                ):
+                    chunks.append(delta)
+                    await queue.put({
+                        "event": "token",
+                        "agent_id": agent_id,
+                        "delta": delta
+                    })
+
+            try:
+                async with semaphore:
+                    await asyncio.wait_for(stream(), timeout=timeout)
+                return "".join(chunks), None
+            except asyncio.TimeoutError:
+                return None, f"Timed out after {timeout} seconds"
+            except Exception as e:
+                return None, str(e)
+
+        tasks = [asyncio.create_task(pump(agent_id)) for agent_id, _ in participants]
+        gathered = asyncio.gather(*tasks)
+        gathered.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            results = gathered.result()
+        finally:
+            # Stop generating if the client went away mid-stream
+            for task in tasks:
+                task.cancel()
+
+        try:
+            responses = self._store_responses(
+                session_id,
+                content,
+                metadata,
+                participants,
+                results
+            )
         except Exception as e:
             self.db.rollback()
             raise ValueError(f"Failed to process message: {str(e)}")
 
+        for response in responses:
+            yield {
+                "event": "message",
+                "agent_id": response.agent_id,
+                "message_id": response.id,
+                "message_type": response.message_type,
+                "content": response.content
+            }
+        yield {"event": "done", "session_id": session_id}
+
+    def _get_active_chat(self, session_id: int) -> Dict[str, Any]:
+        """Get the state of an active chat session."""
+        chat_state = self.active_chats.get(session_id)
+        if not chat_state or chat_state["status"] != "active":
+            raise ValueError(f"Chat session {session_id} not found or inactive")
+        return chat_state
+
+    def _get_participants(
+        self,
+        chat_state: Dict[str, Any],
+        sender_id: Optional[int]
+    ) -> List[Tuple[int, Agent]]:
+        """Get the agents that should respond to a message."""
+        return [
+            (agent_id, agent)
+            for agent_id, agent in chat_state["agents"].items()
+            if agent_id != sender_id  # Don't let agent respond to itself
+        ]
+
+    def _agent_context(
+        self,
+        session_id: int,
+        chat_state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the context passed to each agent."""
+        return {
+            "session_id": session_id,
+            "chat_config": chat_state["config"]
+        }
+
+    def _store_responses(
+        self,
+        session_id: int,
+        content: str,
+        metadata: Optional[Dict[str, Any]],
+        participants: List[Tuple[int, Agent]],
+        results: List[Tuple[Optional[str], Optional[str]]]
+    ) -> List[ChatMessage]:
+        """Store the user message and one reply or failure per agent."""
+        # Create user message
+        user_message = ChatMessage(
+            session_id=session_id,
+            content=content,
+            message_type="user",
+            metadata=metadata or {}
+        )
+        self.db.add(user_message)
+
+        responses = []
+        for (agent_id, agent), (response, error) in zip(participants, results):
+            if error is None:
+                agent_message = ChatMessage(
+                    session_id=session_id,
+                    agent_id=agent_id,
+                    content=response,
+                    message_type="agent",
+                    metadata={"role": agent.role}
+                )
+            else:
+                # Record the failure for this agent only; replies from
+                # the other agents are still committed.
+                agent_message = ChatMessage(
+                    session_id=session_id,
+                    agent_id=agent_id,
+                    content=f"Agent {agent_id} failed to respond: {error}",
+                    message_type="system",
+                    metadata={
+                        "role": agent.role,
+                        "status": "failed",
+                        "error": error
+                    }
+                )
+            self.db.add(agent_message)
+            responses.append(agent_message)
+
+        self.db.commit()
+        return responses
+
+    async def _fan_out(
+        self,
+        participants: List[Tuple[int, Agent]],
+        content: str,
+        context: Dict[str, Any],
+        config: Dict[str, Any]
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Collect agent responses, concurrently unless configured otherwise.
+
+        Returns one ``(response, error)`` pair per participant, in the same
+        order as ``participants``.
+        """
+        timeout = config.get("agent_timeout")
+
+        async def respond(agent_id: int) -> Tuple[Optional[str], Optional[str]]:
+            try:
+                response = await asyncio.wait_for(
+                    self.agent_manager.process_message(
+                        agent_id,
+                        content,
+                        context=context
+                    ),
+                    timeout=timeout
+                )
+                return response, None
+            except asyncio.TimeoutError:
+                return None, f"Timed out after {timeout} seconds"
+            except Exception as e:
+                return None, str(e)
+
+        if config.get("fan_out", "concurrent") == "sequential":
+            return [await respond(agent_id) for agent_id, _ in participants]
+
+        max_concurrency = config.get("max_concurrency") or len(participants) or 1
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded_respond(agent_id: int) -> Tuple[Optional[str], Optional[str]]:
+            async with semaphore:
+                return await respond(agent_id)
+
+        return await asyncio.gather(
+            *(bounded_respond(agent_id) for agent_id, _ in participants)
+        )
+
     async def end_chat(self, session_id: int) -> None:
         """End a group chat session."""
         chat_state = self.active_chats.get(session_id)
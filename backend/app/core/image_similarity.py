@@ -0,0 +1,213 @@
+"""Vectorized SSIM and tiled image comparison."""
+
+from typing import Any, Dict
+import cv2
+import numpy as np
+from .config import settings
+
+# SSIM stabilizing constants for 8-bit images
+C1 = (0.01 * 255) ** 2
+C2 = (0.03 * 255) ** 2
+
+
+def ssim_map(image1: np.ndarray, image2: np.ndarray, window: int = settings.VISUAL_SSIM_WINDOW) -> np.ndarray:
+    """Get the per-pixel SSIM of two same-size grayscale images.
+
+    Local means, variances and covariance come from box filters, so the
+    whole map costs a few passes over the image whatever the window size.
+    """
+    size = (window, window)
+    a = image1.astype(np.float32)
+    b = image2.astype(np.float32)
+    mu_a = cv2.boxFilter(a, -1, size)
+    mu_b = cv2.boxFilter(b, -1, size)
+
+    # Second moments, reusing buffers to keep peak memory down
+    ab = cv2.boxFilter(cv2.multiply(a, b), -1, size)
+    a = cv2.boxFilter(cv2.multiply(a, a, dst=a), -1, size)
+    b = cv2.boxFilter(cv2.multiply(b, b, dst=b), -1, size)
+    mu_ab = mu_a * mu_b
+    mu_a *= mu_a
+    mu_b *= mu_b
+    ab -= mu_ab  # covariance
+    a += b
+    a -= mu_a
+    a -= mu_b  # sum of the variances
+
+    numerator = mu_ab
+    numerator *= 2
+    numerator += C1
+    ab *= 2
+    ab += C2
+    numerator *= ab
+    denominator = mu_a
+    denominator += mu_b
+    denominator += C1
+    a += C2
+    denominator *= a
+    numerator /= denominator
+    return numerator
+
+
+def _tile_sums(values: np.ndarray, size: int) -> np.ndarray:
+    """Sum an image over each square tile of a grid, the last ones partial."""
+    height, width = values.shape
+    rows, cols = -(-height // size), -(-width // size)
+    if (rows * size, cols * size) != (height, width):
+        values = np.pad(values, ((0, rows * size - height), (0, cols * size - width)))
+    return values.reshape(rows, size, cols, size).sum(axis=(1, 3), dtype=np.int64)
+
+
+class ImageComparator:
+    """Compares same-size grayscale images by mean SSIM.
+
+    SSIM is exactly 1 wherever a window covers identical pixels, so only
+    tiles near a changed pixel are scored, at full resolution. The
+    difference summed per tile, the images' gap on a coarse grid, orders
+    those tiles most-changed first, and scoring stops once the tiles left
+    cannot move the mean across the threshold: SSIM lies in [-1, 1], which
+    bounds what they can add. Unchanged images are accepted, and very
+    different ones rejected, after scoring few or no tiles.
+    """
+
+    def __init__(
+        self,
+        window: int = settings.VISUAL_SSIM_WINDOW,
+        tile_size: int = settings.VISUAL_TILE_SIZE
+    ):
+        """Initialize image comparator."""
+        self.window = window
+        self.tile_size = tile_size
+
+    def _tile_ssim(
+        self,
+        image: np.ndarray,
+        reference: np.ndarray,
+        y: int,
+        x: int,
+        height: int,
+        width: int
+    ) -> float:
+        """Get the SSIM sum over one tile, equal to that region of the full map."""
+        radius = self.window // 2
+        top, left = max(0, y - radius), max(0, x - radius)
+        bottom = min(image.shape[0], y + height + radius)
+        right = min(image.shape[1], x + width + radius)
+        scores = ssim_map(
+            image[top:bottom, left:right],
+            reference[top:bottom, left:right],
+            self.window
+        )
+        return float(scores[y - top:y - top + height, x - left:x - left + width].sum(dtype=np.float64))
+
+    def compare(
+        self,
+        image: np.ndarray,
+        reference: np.ndarray,
+        threshold: float,
+        diff_map: bool = False
+    ) -> Dict[str, Any]:
+        """Score an image against a reference of the same shape.
+
+        ``similarity`` is the exact mean SSIM when ``exact`` is true.
+        Otherwise the comparison was decided early and it is the bound
+        that decided it: a lower bound on acceptance, an upper bound on
+        rejection. A diff map needs every changed tile, so it always
+        gives an exact score.
+        """
+        if image.shape != reference.shape:
+            raise ValueError(f"Image shapes differ: {image.shape} and {reference.shape}")
+        if min(image.shape[:2]) < self.window:
+            raise ValueError(f"Images must be at least {self.window} pixels on each side")
+
+        height, width = image.shape
+        rows = np.arange(0, height, self.tile_size)
+        cols = np.arange(0, width, self.tile_size)
+        heights = np.diff(rows, append=height)
+        widths = np.diff(cols, append=width)
+        areas = np.outer(heights, widths)
+
+        differs = cv2.compare(image, reference, cv2.CMP_NE)
+        if not cv2.countNonZero(differs):
+            tiles = []
+        else:
+            # Pixels whose window holds a difference; SSIM is 1 everywhere else
+            kernel = np.ones((self.window, self.window), np.uint8)
+            affected_counts = _tile_sums(cv2.dilate(differs, kernel), self.tile_size) // 255
+            energy = _tile_sums(cv2.absdiff(image, reference), self.tile_size)
+            tiles = [
+                divmod(int(i), len(cols))
+                for i in np.argsort(-energy, axis=None, kind="stable")
+                if affected_counts.flat[i]
+            ]
+
+        total = height * width
+        pending_area = sum(int(areas[t]) for t in tiles)
+        pending_affected = sum(int(affected_counts[t]) for t in tiles)
+        score_sum = float(total - pending_area)  # unchanged tiles score exactly 1
+        means = np.ones(areas.shape)
+        scored = 0
+        for row, col in tiles:
+            lower = (score_sum + pending_area - 2 * pending_affected) / total
+            upper = (score_sum + pending_area) / total
+            if not diff_map and (lower >= threshold or upper < threshold):
+                break
+            tile_sum = self._tile_ssim(
+                image, reference, int(rows[row]), int(cols[col]),
+                int(heights[row]), int(widths[col])
+            )
+            means[row, col] = tile_sum / areas[row, col]
+            score_sum += tile_sum
+            pending_area -= int(areas[row, col])
+            pending_affected -= int(affected_counts[row, col])
+            scored += 1
+
+        exact = scored == len(tiles)
+        if exact:
+            similarity = score_sum / total
+        elif lower >= threshold:
+            similarity = lower
+        else:
+            similarity = upper
+        result = {
+            "success": similarity >= threshold,
+            "similarity": similarity,
+            "threshold": threshold,
+            "exact": exact,
+            "tiles_changed": len(tiles),
+            "tiles_scored": scored
+        }
+        if diff_map:
+            result["diff_map"] = self._diff_map(means, rows, cols, heights, widths, threshold)
+        return result
+
+    def _diff_map(
+        self,
+        means: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        heights: np.ndarray,
+        widths: np.ndarray,
+        threshold: float
+    ) -> Dict[str, Any]:
+        """Get the tiles whose mean SSIM falls below the threshold, least similar first."""
+        regions = [
+            {
+                "x": int(cols[col]),
+                "y": int(rows[row]),
+                "width": int(widths[col]),
+                "height": int(heights[row]),
+                "similarity": float(means[row, col])
+            }
+            for row, col in zip(*np.nonzero(means < threshold))
+        ]
+        regions.sort(key=lambda r: r["similarity"])
+        return {
+            "region_size": self.tile_size,
+            "rows": len(rows),
+            "columns": len(cols),
+            "regions": regions
+        }
+
+
+image_comparator = ImageComparator()
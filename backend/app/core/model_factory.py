@@ -4,10 +4,23 @@ from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
+from .model_router import RoutedChatModel
 
 class ModelFactory:
     @staticmethod
     def create_model(provider: str, config: Dict[str, Any]) -> BaseChatModel:
+        """Create a chat model, routed across equivalent endpoints if enabled.
+
+        Set ``routing`` in the config to pick the fastest healthy endpoint
+        per call, and ``hedge`` (with optional ``hedge_after`` seconds) to
+        race a second endpoint when the first one is slow.
+        """
+        if config.get("routing", False):
+            return RoutedChatModel(provider=provider, config=config)
+        return ModelFactory.create_provider_model(provider, config)
+
+    @staticmethod
+    def create_provider_model(provider: str, config: Dict[str, Any]) -> BaseChatModel:
         if provider.lower() == "openai":
             return ChatOpenAI(
                 model_name=config.get("model_name", "gpt-4"),
@@ -33,5 +46,12 @@ class ModelFactory:
                 api_key=config.get("api_key"),
                 base_url=config.get("base_url", "https://api.groq.com/v1")
             )
+        elif provider.lower() == "openrouter":
+            return ChatOpenAI(
+                model_name=config.get("model_name", "anthropic/claude-3-opus"),
+                temperature=config.get("temperature", 0.7),
+                api_key=config.get("api_key"),
+                base_url=config.get("base_url", "https://openrouter.ai/api/v1")
+            )
         else:
-            raise ValueError(f"Unsupported model provider: {provider}") 
\ No newline at end of file
+            raise ValueError(f"Unsupported model provider: {provider}")
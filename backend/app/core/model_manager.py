@@ -1,12 +1,15 @@
 """Model manager for handling different AI model providers."""
 
-from typing import Any, Dict, List, Optional
-import openai
-import anthropic
-from google.generativeai import GenerativeModel
-import groq
-from openai import OpenAI
-from ..core.config import settings
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from .circuit_breaker import CircuitOpenError, circuit_breakers
+from .provider_clients import provider_clients
+from .rate_limiter import estimate_tokens, rate_limiter
+from .response_cache import response_cache
+from .semantic_cache import semantic_cache
+
+SUPPORTED_PROVIDERS = ("openai", "anthropic", "gemini", "groq")
 
 class ModelManager:
     """Manager class for AI model operations."""
@@ -17,14 +20,24 @@ class ModelManager:
         self.setup_clients()
 
     def setup_clients(self):
-        """Setup API clients for different providers."""
+        """Setup async API clients for different providers.
+
+        Clients come from the shared provider pool, so all managers in the
+        process reuse the same HTTP connections.
+        """
         self.clients = {
-            "openai": OpenAI(api_key=settings.OPENAI_API_KEY),
-            "anthropic": anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None,
-            "gemini": GenerativeModel('gemini-pro') if settings.GOOGLE_API_KEY else None,
-            "groq": groq.Groq(api_key=settings.GROQ_API_KEY) if hasattr(settings, 'GROQ_API_KEY') else None
+            provider: provider_clients.get(provider)
+            for provider in SUPPORTED_PROVIDERS
         }
 
+    async def initialize(self) -> None:
+        """Warm up provider clients."""
+        self.setup_clients()
+
+    async def cleanup(self) -> None:
+        """Close pooled provider connections."""
+        await provider_clients.aclose()
+
     async def validate_config(self, config: Dict[str, Any]) -> bool:
         """Validate model configuration."""
         required_fields = ["provider", "model_name"]
@@ -37,7 +50,12 @@ class ModelManager:
 
         return True
 
-    async def initialize_model(self, agent_id: int, config: Dict[str, Any]) -> None:
+    async def initialize_model(
+        self,
+        agent_id: int,
+        config: Dict[str, Any],
+        role: Optional[str] = None
+    ) -> None:
         """Initialize a model for an agent."""
         if not await self.validate_config(config):
             raise ValueError("Invalid model configuration")
@@ -46,6 +64,7 @@ class ModelManager:
             "config": config,
             "provider": config["provider"],
             "model_name": config["model_name"],
+            "role": role or config.get("role"),
             "context": []
         }
 
@@ -62,34 +81,279 @@ class ModelManager:
 
         provider = model_info["provider"]
         model_name = model_info["model_name"]
+
+        cached = await self._get_cached_response(model_info, message, context)
+        if cached is not None:
+            return cached
         
         try:
-            if provider == "openai":
-                response = await self._generate_openai(model_name, message, context)
-            elif provider == "anthropic":
-                response = await self._generate_anthropic(model_name, message, context)
-            elif provider == "gemini":
-                response = await self._generate_gemini(message, context)
-            elif provider == "groq":
-                response = await self._generate_groq(model_name, message, context)
-            else:
-                raise ValueError(f"Unsupported provider: {provider}")
-
-            return response
+            response = await self._generate_with_breaker(
+                provider,
+                model_name,
+                message,
+                context,
+                model_info["config"].get("fallback")
+            )
         except Exception as e:
             raise ValueError(f"Failed to generate response: {str(e)}")
 
-    async def _generate_openai(
+        await self._cache_response(model_info, message, context, response)
+        return response
+
+    async def stream_response(
         self,
-        model: str,
+        agent_id: int,
         message: str,
         context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream a response as token deltas using the specified model."""
+        model_info = self.active_models.get(agent_id)
+        if not model_info:
+            raise ValueError(f"No active model found for agent {agent_id}")
+
+        provider = model_info["provider"]
+        model_name = model_info["model_name"]
+
+        cached = await self._get_cached_response(model_info, message, context)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        try:
+            async for delta in self._stream_with_breaker(
+                provider,
+                model_name,
+                message,
+                context,
+                model_info["config"].get("fallback")
+            ):
+                chunks.append(delta)
+                yield delta
+        except Exception as e:
+            raise ValueError(f"Failed to stream response: {str(e)}")
+
+        await self._cache_response(model_info, message, context, "".join(chunks))
+
+    async def _generate_with_breaker(
+        self,
+        provider: str,
+        model_name: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        fallback: Optional[Dict[str, str]] = None
     ) -> str:
-        """Generate response using OpenAI."""
+        """Generate a response, failing fast or falling back while the circuit is open."""
+        breaker = circuit_breakers.get(provider, model_name)
+        if not breaker.allow_request():
+            if fallback:
+                return await self._generate_with_breaker(
+                    fallback["provider"],
+                    fallback["model_name"],
+                    message,
+                    context
+                )
+            raise CircuitOpenError(f"Circuit open for {provider}/{model_name}")
+
+        try:
+            async with rate_limiter.limit(
+                provider,
+                model_name,
+                self._estimate_prompt_tokens(message, context)
+            ):
+                started = time.monotonic()
+                if provider == "openai":
+                    response = await self._generate_openai(model_name, message, context)
+                elif provider == "anthropic":
+                    response = await self._generate_anthropic(model_name, message, context)
+                elif provider == "gemini":
+                    response = await self._generate_gemini(message, context)
+                elif provider == "groq":
+                    response = await self._generate_groq(model_name, message, context)
+                else:
+                    raise ValueError(f"Unsupported provider: {provider}")
+                latency = time.monotonic() - started
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure(e)
+            raise
+
+        breaker.record_success(latency)
+        await rate_limiter.record_tokens(
+            provider,
+            model_name,
+            estimate_tokens(response or "")
+        )
+        return response
+
+    async def _stream_with_breaker(
+        self,
+        provider: str,
+        model_name: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        fallback: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        """Stream a response, failing fast or falling back while the circuit is open.
+
+        Latency for the breaker is measured to the first token.
+        """
+        breaker = circuit_breakers.get(provider, model_name)
+        if not breaker.allow_request():
+            if fallback:
+                async for delta in self._stream_with_breaker(
+                    fallback["provider"],
+                    fallback["model_name"],
+                    message,
+                    context
+                ):
+                    yield delta
+                return
+            raise CircuitOpenError(f"Circuit open for {provider}/{model_name}")
+
+        if provider == "openai":
+            stream = self._stream_openai(model_name, message, context)
+        elif provider == "anthropic":
+            stream = self._stream_anthropic(model_name, message, context)
+        elif provider == "gemini":
+            stream = self._stream_gemini(message, context)
+        elif provider == "groq":
+            stream = self._stream_groq(model_name, message, context)
+        else:
+            breaker.release()
+            raise ValueError(f"Unsupported provider: {provider}")
+
+        chunks = []
+        latency = None
+        try:
+            async with rate_limiter.limit(
+                provider,
+                model_name,
+                self._estimate_prompt_tokens(message, context)
+            ):
+                started = time.monotonic()
+                async for delta in stream:
+                    if delta:
+                        if latency is None:
+                            latency = time.monotonic() - started
+                        chunks.append(delta)
+                        yield delta
+                if latency is None:
+                    latency = time.monotonic() - started
+        except (asyncio.CancelledError, GeneratorExit):
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure(e)
+            raise
+
+        breaker.record_success(latency)
+        await rate_limiter.record_tokens(
+            provider,
+            model_name,
+            estimate_tokens("".join(chunks))
+        )
+
+    async def _get_cached_response(
+        self,
+        model_info: Dict[str, Any],
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Look up a response in the exact-match and semantic caches."""
+        config = model_info["config"]
+        if not response_cache.is_cacheable(config):
+            response_cache.record_bypass()
+            return None
+
+        cached = await response_cache.get(
+            response_cache.make_key(
+                model_info["provider"],
+                model_info["model_name"],
+                message,
+                context
+            )
+        )
+        if cached is None and semantic_cache.is_enabled(config):
+            cached = semantic_cache.lookup(
+                semantic_cache.make_namespace(
+                    model_info["role"],
+                    model_info["provider"],
+                    model_info["model_name"],
+                    context
+                ),
+                message,
+                config.get("semantic_threshold")
+            )
+        return cached
+
+    async def _cache_response(
+        self,
+        model_info: Dict[str, Any],
+        message: str,
+        context: Optional[Dict[str, Any]],
+        response: str
+    ) -> None:
+        """Store a generated response in the enabled caches."""
+        config = model_info["config"]
+        if not response_cache.is_cacheable(config):
+            return
+
+        await response_cache.set(
+            response_cache.make_key(
+                model_info["provider"],
+                model_info["model_name"],
+                message,
+                context
+            ),
+            response,
+            response_cache.ttl_for(config)
+        )
+        if semantic_cache.is_enabled(config):
+            semantic_cache.store(
+                semantic_cache.make_namespace(
+                    model_info["role"],
+                    model_info["provider"],
+                    model_info["model_name"],
+                    context
+                ),
+                message,
+                response
+            )
+
+    def _estimate_prompt_tokens(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Estimate the prompt size of a request for rate limiting."""
+        messages = self._build_messages(message, context)
+        if context and context.get("system_prompt"):
+            messages.append({"content": context["system_prompt"]})
+        return sum(estimate_tokens(m.get("content") or "") for m in messages)
+
+    def _build_messages(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat message list from history and the new message."""
         messages = []
         if context and "chat_history" in context:
             messages.extend(context["chat_history"])
         messages.append({"role": "user", "content": message})
+        return messages
+
+    async def _generate_openai(
+        self,
+        model: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Generate response using OpenAI."""
+        messages = self._build_messages(message, context)
 
         response = await self.clients["openai"].chat.completions.create(
             model=model,
@@ -104,10 +368,7 @@ class ModelManager:
         context: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate response using Anthropic."""
-        messages = []
-        if context and "chat_history" in context:
-            messages.extend(context["chat_history"])
-        messages.append({"role": "user", "content": message})
+        messages = self._build_messages(message, context)
 
         response = await self.clients["anthropic"].messages.create(
             model=model,
@@ -121,7 +382,7 @@ class ModelManager:
         context: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate response using Google's Gemini."""
-        response = await self.clients["gemini"].generate_content(message)
+        response = await self.clients["gemini"].generate_content_async(message)
         return response.text
 
     async def _generate_groq(
@@ -131,10 +392,7 @@ class ModelManager:
         context: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate response using Groq."""
-        messages = []
-        if context and "chat_history" in context:
-            messages.extend(context["chat_history"])
-        messages.append({"role": "user", "content": message})
+        messages = self._build_messages(message, context)
 
         response = await self.clients["groq"].chat.completions.create(
             model=model,
@@ -142,7 +400,69 @@ class ModelManager:
         )
         return response.choices[0].message.content
 
+    async def _stream_openai(
+        self,
+        model: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream response deltas using OpenAI."""
+        stream = await self.clients["openai"].chat.completions.create(
+            model=model,
+            messages=self._build_messages(message, context),
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
+
+    async def _stream_anthropic(
+        self,
+        model: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream response deltas using Anthropic."""
+        async with self.clients["anthropic"].messages.stream(
+            model=model,
+            messages=self._build_messages(message, context)
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def _stream_gemini(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream response deltas using Google's Gemini."""
+        response = await self.clients["gemini"].generate_content_async(
+            message,
+            stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
+
+    async def _stream_groq(
+        self,
+        model: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream response deltas using Groq."""
+        stream = await self.clients["groq"].chat.completions.create(
+            model=model,
+            messages=self._build_messages(message, context),
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
+
     async def cleanup_model(self, agent_id: int) -> None:
         """Cleanup model resources for an agent."""
         if agent_id in self.active_models:
-            del self.active_models[agent_id] 
\ No newline at end of file
+            del self.active_models[agent_id]
+
+
+model_manager = ModelManager()
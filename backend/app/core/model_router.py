@@ -0,0 +1,325 @@
+"""Latency-aware routing between equivalent model endpoints."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from .config import settings
+
+Endpoint = Tuple[str, str]  # (provider, model name)
+
+# Groups of endpoints serving the same underlying model
+EQUIVALENT_MODELS: Dict[str, List[Endpoint]] = {
+    "claude-3-opus": [
+        ("anthropic", "claude-3-opus"),
+        ("openrouter", "anthropic/claude-3-opus")
+    ],
+    "gemini-pro": [
+        ("google", "gemini-pro"),
+        ("openrouter", "google/gemini-pro")
+    ],
+    "mixtral-8x7b": [
+        ("groq", "mixtral-8x7b-32768"),
+        ("openrouter", "mistral/mixtral-8x7b")
+    ],
+    "llama-2-70b": [
+        ("groq", "llama2-70b-4096"),
+        ("openrouter", "meta-llama/llama-2-70b")
+    ]
+}
+
+PROVIDER_API_KEYS = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "google": "GOOGLE_API_KEY",
+    "groq": "GROQ_API_KEY",
+    "openrouter": "OPENROUTER_API_KEY"
+}
+
+
+class EndpointStats:
+    """Rolling latency and error statistics for one endpoint."""
+
+    def __init__(self, window: int = settings.ROUTING_WINDOW):
+        """Initialize endpoint stats."""
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        # Hedged calls cancelled before finishing
+        self.cancelled = 0
+
+    def record(self, latency: float, success: bool) -> None:
+        """Record the outcome of one call."""
+        self.outcomes.append(success)
+        if success:
+            self.latencies.append(latency)
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """Record a hedged call cancelled after ``elapsed`` seconds.
+
+        The call lost to one that finished first, so its latency is at
+        least ``elapsed``; that lower bound is kept as a sample, so an
+        endpoint that always loses still ranks behind the one beating it.
+        It is neither a success nor a failure.
+        """
+        self.cancelled += 1
+        self.latencies.append(elapsed)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Get a latency percentile over successful and cancelled calls."""
+        if not self.latencies:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), q))
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of failed calls in the window."""
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the endpoint is healthy enough to route to."""
+        if len(self.outcomes) < settings.ROUTING_MIN_SAMPLES:
+            return True
+        return self.error_rate <= settings.ROUTING_MAX_ERROR_RATE
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the stats."""
+        return {
+            "samples": len(self.outcomes),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "error_rate": self.error_rate,
+            "cancelled": self.cancelled,
+            "healthy": self.healthy
+        }
+
+
+class ModelRouter:
+    """Routes requests to the fastest healthy equivalent endpoint.
+
+    With hedging enabled, a second endpoint is started when the first one
+    has not answered within the hedge deadline, and the first successful
+    answer wins.
+    """
+
+    def __init__(self):
+        """Initialize model router."""
+        self.stats: Dict[Endpoint, EndpointStats] = {}
+        self._models: Dict[Tuple[Any, ...], BaseChatModel] = {}
+
+    def get_stats(self, endpoint: Endpoint) -> EndpointStats:
+        """Get the stats for an endpoint."""
+        if endpoint not in self.stats:
+            self.stats[endpoint] = EndpointStats()
+        return self.stats[endpoint]
+
+    def record(self, endpoint: Endpoint, latency: float, success: bool) -> None:
+        """Record the outcome of one call to an endpoint."""
+        self.get_stats(endpoint).record(latency, success)
+
+    def candidates(self, provider: str, config: Dict[str, Any]) -> List[Endpoint]:
+        """List usable endpoints equivalent to the requested one, requested first."""
+        requested = (provider.lower(), config.get("model_name"))
+        endpoints = [requested]
+        for group in EQUIVALENT_MODELS.values():
+            if requested in group:
+                endpoints.extend(e for e in group if e != requested)
+                break
+        return [
+            e for e in endpoints
+            if e == requested or self._api_key(e[0], requested[0], config)
+        ]
+
+    def rank(self, endpoints: List[Endpoint]) -> List[Endpoint]:
+        """Order endpoints by health, then by median latency.
+
+        Endpoints without samples rank as fast so they get explored; ties
+        keep the requested endpoint first.
+        """
+        def score(endpoint: Endpoint) -> Tuple[bool, float]:
+            stats = self.get_stats(endpoint)
+            return (not stats.healthy, stats.percentile(50) or 0.0)
+
+        return sorted(endpoints, key=score)
+
+    async def agenerate(
+        self,
+        provider: str,
+        config: Dict[str, Any],
+        messages: List[BaseMessage],
+        **kwargs: Any
+    ) -> ChatResult:
+        """Generate a chat result through the best available endpoint."""
+        ranked = self.rank(self.candidates(provider, config))
+        if not config.get("hedge", False) or len(ranked) < 2:
+            return await self._call_with_fallback(ranked, provider, config, messages, **kwargs)
+
+        primary, secondary = ranked[0], ranked[1]
+        hedge_after = config.get("hedge_after") or self.get_stats(primary).percentile(95)
+        if hedge_after is None:
+            hedge_after = settings.ROUTING_HEDGE_AFTER
+
+        pending = {
+            asyncio.create_task(self._call(primary, provider, config, messages, **kwargs))
+        }
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if not done or next(iter(done)).exception() is not None:
+                pending.add(
+                    asyncio.create_task(self._call(secondary, provider, config, messages, **kwargs))
+                )
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let the losers record their cancellation before the next ranking
+            await asyncio.gather(*pending, return_exceptions=True)
+        raise error
+
+    async def _call_with_fallback(
+        self,
+        endpoints: List[Endpoint],
+        provider: str,
+        config: Dict[str, Any],
+        messages: List[BaseMessage],
+        **kwargs: Any
+    ) -> ChatResult:
+        """Try endpoints in order until one succeeds."""
+        error: Optional[Exception] = None
+        for endpoint in endpoints:
+            try:
+                return await self._call(endpoint, provider, config, messages, **kwargs)
+            except Exception as e:
+                error = e
+        raise error
+
+    async def _call(
+        self,
+        endpoint: Endpoint,
+        provider: str,
+        config: Dict[str, Any],
+        messages: List[BaseMessage],
+        **kwargs: Any
+    ) -> ChatResult:
+        """Call one endpoint and record its latency and outcome."""
+        model = self._get_model(endpoint, provider, config)
+        started = time.monotonic()
+        try:
+            result = await model._agenerate(messages, **kwargs)
+        except asyncio.CancelledError:
+            self.get_stats(endpoint).record_cancelled(time.monotonic() - started)
+            raise
+        except Exception:
+            self.record(endpoint, time.monotonic() - started, False)
+            raise
+        self.record(endpoint, time.monotonic() - started, True)
+        return result
+
+    def _get_model(
+        self,
+        endpoint: Endpoint,
+        provider: str,
+        config: Dict[str, Any]
+    ) -> BaseChatModel:
+        """Get or create the LangChain model for an endpoint."""
+        from .model_factory import ModelFactory
+
+        endpoint_provider, model_name = endpoint
+        api_key = self._api_key(endpoint_provider, provider.lower(), config)
+        temperature = config.get("temperature", 0.7)
+        cache_key = (endpoint_provider, model_name, temperature, api_key)
+        if cache_key not in self._models:
+            endpoint_config = {
+                "model_name": model_name,
+                "temperature": temperature,
+                "api_key": api_key
+            }
+            if endpoint_provider == provider.lower() and config.get("base_url"):
+                endpoint_config["base_url"] = config["base_url"]
+            self._models[cache_key] = ModelFactory.create_provider_model(
+                endpoint_provider,
+                endpoint_config
+            )
+        return self._models[cache_key]
+
+    @staticmethod
+    def _api_key(
+        endpoint_provider: str,
+        requested_provider: str,
+        config: Dict[str, Any]
+    ) -> Optional[str]:
+        """Find the API key for an endpoint's provider."""
+        api_keys = config.get("api_keys", {})
+        if endpoint_provider in api_keys:
+            return api_keys[endpoint_provider]
+        if endpoint_provider == requested_provider and config.get("api_key"):
+            return config["api_key"]
+        setting = PROVIDER_API_KEYS.get(endpoint_provider)
+        return getattr(settings, setting, None) if setting else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize stats for every endpoint seen so far."""
+        return {
+            f"{provider}/{model}": stats.to_dict()
+            for (provider, model), stats in self.stats.items()
+        }
+
+
+model_router = ModelRouter()
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that dispatches each call through the model router."""
+
+    provider: str
+    config: Dict[str, Any]
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        """Generate synchronously through the requested endpoint only."""
+        return model_router._get_model(
+            (self.provider.lower(), self.config.get("model_name")),
+            self.provider,
+            self.config
+        )._generate(messages, stop=stop, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        """Generate through the fastest healthy endpoint, hedging if enabled."""
+        return await model_router.agenerate(
+            self.provider,
+            self.config,
+            messages,
+            stop=stop,
+            **kwargs
+        )
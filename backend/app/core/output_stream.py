@@ -0,0 +1,146 @@
+"""Bounded capture and live streaming of code execution output."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict
+import redis.asyncio as aioredis
+from .config import settings
+
+CHANNEL_PREFIX = "execution-output:"
+LOG_PREFIX = "execution-output-log:"
+LOG_TTL = 3600  # seconds
+
+
+def truncation_marker(omitted: int) -> str:
+    """Marker inserted where output was dropped."""
+    return f"\n... [output truncated: {omitted} bytes omitted] ...\n"
+
+
+class CappedOutput:
+    """Output buffer that stores at most ``limit`` bytes.
+
+    The first and last halves of the limit are kept, so both the start of
+    a run and its final error survive; the middle is replaced by a
+    truncation marker.
+    """
+
+    def __init__(self, limit: int = settings.EXECUTION_OUTPUT_LIMIT):
+        """Initialize capped output."""
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def append(self, data: bytes) -> None:
+        """Add a chunk of output."""
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            # Trim lazily so appends stay amortized O(chunk)
+            if len(self.tail) > 2 * self.tail_limit:
+                del self.tail[:-self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        """Bytes dropped so far."""
+        return self.total - len(self.head) - min(len(self.tail), self.tail_limit)
+
+    def text(self) -> str:
+        """Decode the stored output, marking any truncation."""
+        tail = bytes(self.tail[-self.tail_limit:]) if self.tail_limit else b""
+        head = self.head.decode("utf-8", errors="replace")
+        if self.omitted:
+            return head + truncation_marker(self.omitted) + tail.decode("utf-8", errors="replace")
+        return head + tail.decode("utf-8", errors="replace")
+
+
+def read_capped(path: Path, limit: int = settings.EXECUTION_OUTPUT_LIMIT) -> str:
+    """Read an output file, keeping at most ``limit`` bytes as CappedOutput does.
+
+    A file the run never created reads as empty.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return ""
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= limit:
+            return f.read().decode("utf-8", errors="replace")
+        head_limit = limit // 2
+        tail_limit = limit - head_limit
+        head = f.read(head_limit)
+        f.seek(size - tail_limit)
+        tail = f.read()
+    return (
+        head.decode("utf-8", errors="replace")
+        + truncation_marker(size - head_limit - tail_limit)
+        + tail.decode("utf-8", errors="replace")
+    )
+
+
+class OutputPublisher:
+    """Publishes a job's output events to Redis.
+
+    Events go to a pub/sub channel for live subscribers and to a short
+    replay log, so clients that connect late still see the whole run.
+    """
+
+    def __init__(self, job_id: str):
+        """Initialize output publisher."""
+        self.job_id = job_id
+        self.redis = aioredis.from_url(settings.REDIS_URL)
+        self.seq = 0
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Publish one event."""
+        payload = json.dumps({**event, "seq": self.seq}, default=str)
+        self.seq += 1
+        log_key = LOG_PREFIX + self.job_id
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(log_key, payload)
+            pipe.ltrim(log_key, -settings.EXECUTION_STREAM_LOG_EVENTS, -1)
+            pipe.expire(log_key, LOG_TTL)
+            pipe.publish(CHANNEL_PREFIX + self.job_id, payload)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        await self.redis.aclose()
+
+
+async def subscribe_output(job_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """Stream a job's output events, replaying those already published."""
+    redis = aioredis.from_url(settings.REDIS_URL)
+    pubsub = redis.pubsub()
+    # Subscribe before reading the log so no event falls in between
+    await pubsub.subscribe(CHANNEL_PREFIX + job_id)
+    try:
+        last_seq = -1
+        for raw in await redis.lrange(LOG_PREFIX + job_id, 0, -1):
+            event = json.loads(raw)
+            last_seq = event["seq"]
+            yield event
+            if event["event"] == "done":
+                return
+
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            event = json.loads(message["data"])
+            if event["seq"] <= last_seq:
+                continue
+            last_seq = event["seq"]
+            yield event
+            if event["event"] == "done":
+                return
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await redis.aclose()
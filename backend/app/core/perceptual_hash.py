@@ -0,0 +1,56 @@
+"""Perceptual hashes for finding near-identical images."""
+
+import cv2
+import numpy as np
+
+
+def _pack(bits: np.ndarray) -> int:
+    """Pack 64 booleans into an integer, first bit most significant."""
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def _thumbnail(gray: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Shrink an image by area averaging.
+
+    Shrinking by a whole factor first takes OpenCV's fast path, which is
+    several times quicker on screenshots than one arbitrary-ratio resize.
+    """
+    factor = min(gray.shape[0] // (2 * height), gray.shape[1] // (2 * width))
+    if factor > 1:
+        rows = gray.shape[0] - gray.shape[0] % factor
+        cols = gray.shape[1] - gray.shape[1] % factor
+        gray = cv2.resize(
+            gray[:rows, :cols],
+            (cols // factor, rows // factor),
+            interpolation=cv2.INTER_AREA
+        )
+    return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def dhash(gray: np.ndarray) -> int:
+    """Get the 64-bit difference hash of a grayscale image.
+
+    Each bit says whether a pixel of a 9x8 thumbnail is brighter than its
+    right neighbour, which follows the layout of the image.
+    """
+    thumbnail = _thumbnail(gray, 9, 8)
+    return _pack(thumbnail[:, 1:] > thumbnail[:, :-1])
+
+
+def phash(gray: np.ndarray) -> int:
+    """Get the 64-bit DCT hash of a grayscale image.
+
+    Each bit says whether one of the 8x8 lowest frequencies of a 32x32
+    thumbnail is above their median, which survives rescaling and small
+    brightness changes.
+    """
+    thumbnail = _thumbnail(gray, 32, 32).astype(np.float32)
+    low = cv2.dct(thumbnail)[:8, :8]
+    # The DC term only carries overall brightness
+    return _pack(low > np.median(low.ravel()[1:]))
+
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    """Get the bit distance from ``value`` to each of an array of 64-bit hashes."""
+    different = np.ascontiguousarray(np.bitwise_xor(hashes, np.uint64(value)))
+    return np.unpackbits(different.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
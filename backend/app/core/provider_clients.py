@@ -0,0 +1,121 @@
+"""Shared async clients for AI model providers."""
+
+from typing import Any, Dict, Optional
+import anthropic
+import groq
+import openai
+from google.generativeai import GenerativeModel
+from .config import settings
+
+# Connection pool defaults per provider. Values can be overridden through
+# settings.PROVIDER_POOL_LIMITS.
+DEFAULT_POOL_LIMITS: Dict[str, Dict[str, float]] = {
+    "openai": {
+        "max_connections": 100,
+        "max_keepalive_connections": 20,
+        "keepalive_expiry": 30.0,
+        "connect_timeout": 10.0,
+        "timeout": 120.0
+    },
+    "anthropic": {
+        "max_connections": 100,
+        "max_keepalive_connections": 20,
+        "keepalive_expiry": 30.0,
+        "connect_timeout": 10.0,
+        "timeout": 180.0
+    },
+    "groq": {
+        "max_connections": 50,
+        "max_keepalive_connections": 10,
+        "keepalive_expiry": 15.0,
+        "connect_timeout": 5.0,
+        "timeout": 60.0
+    }
+}
+
+
+class ProviderClientPool:
+    """Builds async provider clients on top of shared, pooled HTTP clients.
+
+    One async HTTP client is kept per provider so that every
+    ``ModelManager`` in the process reuses the same keep-alive connections.
+    """
+
+    def __init__(self):
+        """Initialize provider client pool."""
+        self._http_clients: Dict[str, Any] = {}
+        self._clients: Dict[str, Any] = {}
+
+    def pool_limits(self, provider: str) -> Dict[str, float]:
+        """Get the connection pool limits for a provider."""
+        limits = dict(DEFAULT_POOL_LIMITS.get(provider, DEFAULT_POOL_LIMITS["openai"]))
+        limits.update(settings.PROVIDER_POOL_LIMITS.get(provider, {}))
+        return limits
+
+    def _http_client(self, provider: str, sdk: Any) -> Any:
+        """Get or create the pooled HTTP client for a provider.
+
+        The client is built from the SDK's own httpx types, since SDK
+        releases may pin a different httpx distribution.
+        """
+        client = self._http_clients.get(provider)
+        if client is None or client.is_closed:
+            limits = self.pool_limits(provider)
+            client = sdk.DefaultAsyncHttpxClient(
+                limits=type(sdk.DEFAULT_CONNECTION_LIMITS)(
+                    max_connections=int(limits["max_connections"]),
+                    max_keepalive_connections=int(limits["max_keepalive_connections"]),
+                    keepalive_expiry=limits["keepalive_expiry"]
+                ),
+                timeout=sdk.Timeout(
+                    limits["timeout"],
+                    connect=limits["connect_timeout"]
+                )
+            )
+            self._http_clients[provider] = client
+        return client
+
+    def get(self, provider: str) -> Optional[Any]:
+        """Get the async client for a provider, or None if not configured."""
+        client = self._clients.get(provider)
+        http_client = self._http_clients.get(provider)
+        if client is not None and (http_client is None or not http_client.is_closed):
+            return client
+
+        client = self._build(provider)
+        if client is not None:
+            self._clients[provider] = client
+        return client
+
+    def _build(self, provider: str) -> Optional[Any]:
+        """Build an async client for a provider."""
+        if provider == "openai":
+            return openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=self._http_client(provider, openai)
+            )
+        elif provider == "anthropic" and settings.ANTHROPIC_API_KEY:
+            return anthropic.AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                http_client=self._http_client(provider, anthropic)
+            )
+        elif provider == "gemini" and settings.GOOGLE_API_KEY:
+            # Gemini uses its own gRPC transport and exposes async methods
+            # directly on the model.
+            return GenerativeModel('gemini-pro')
+        elif provider == "groq" and settings.GROQ_API_KEY:
+            return groq.AsyncGroq(
+                api_key=settings.GROQ_API_KEY,
+                http_client=self._http_client(provider, groq)
+            )
+        return None
+
+    async def aclose(self) -> None:
+        """Close all pooled HTTP connections."""
+        for client in self._http_clients.values():
+            await client.aclose()
+        self._http_clients.clear()
+        self._clients.clear()
+
+
+provider_clients = ProviderClientPool()
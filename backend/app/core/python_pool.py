@@ -0,0 +1,273 @@
+"""Pool of warm, pre-imported Python workers for code execution."""
+
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .config import settings
+from .output_stream import read_capped
+from .sandbox import PASSTHROUGH_ENV_VARS
+
+WORKER_SCRIPT = Path(__file__).with_name("python_pool_worker.py")
+
+
+class PythonWorker:
+    """One warm worker process that forks a child per snippet.
+
+    The worker's pipes are read with blocking calls from a thread, so a
+    worker can be used from any event loop.
+    """
+
+    def __init__(self, command: List[str], preload: List[str]):
+        """Initialize Python worker."""
+        self.process = subprocess.Popen(
+            [*command, str(WORKER_SCRIPT), *preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # Children get each run's own environment; keep server secrets out
+            env={k: os.environ[k] for k in PASSTHROUGH_ENV_VARS if k in os.environ},
+            text=True,
+            bufsize=1
+        )
+        self.ready = False
+        self.runs = 0
+        self._lock = threading.Lock()
+        self._child_pid: Optional[int] = None
+        self._kill_requested = False
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running."""
+        return self.process.poll() is None
+
+    def run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one snippet and return its exit code and resource usage. Blocks."""
+        if not self.ready:
+            self._read()  # startup handshake once the preloads are imported
+            self.ready = True
+        self.runs += 1
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+
+        pid = self._read()["pid"]
+        with self._lock:
+            self._child_pid = pid
+            if self._kill_requested:
+                self._kill_child(pid)
+        try:
+            return self._read()
+        finally:
+            with self._lock:
+                self._child_pid = None
+                self._kill_requested = False
+
+    def kill_run(self) -> None:
+        """Kill the snippet currently running, or the next one to start."""
+        with self._lock:
+            self._kill_requested = True
+            if self._child_pid is not None:
+                self._kill_child(self._child_pid)
+
+    def _read(self) -> Dict[str, Any]:
+        """Read one protocol message from the worker."""
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Python worker exited unexpectedly")
+        return json.loads(line)
+
+    @staticmethod
+    def _kill_child(pid: int) -> None:
+        # Children start their own session, so this also kills subprocesses
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        self.process.kill()
+        self.process.wait()
+
+
+class PythonWorkerPool:
+    """Pool of warm Python workers.
+
+    Each worker imports the preload modules once and then forks a fresh
+    child per snippet, so a run costs a fork instead of an interpreter
+    start. Workers are replaced after ``max_runs`` snippets or if they die.
+    """
+
+    def __init__(
+        self,
+        command: List[str],
+        size: int = settings.PYTHON_POOL_SIZE,
+        max_runs: int = settings.PYTHON_POOL_MAX_RUNS,
+        preload: List[str] = settings.PYTHON_POOL_PRELOAD
+    ):
+        """Initialize Python worker pool."""
+        self.command = command
+        self.size = size
+        self.max_runs = max_runs
+        self.preload = preload
+        self._lock = threading.Lock()
+        self._idle: List[PythonWorker] = []
+        self._workers = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="python-pool")
+        self.recycled = 0
+
+    async def acquire(self) -> PythonWorker:
+        """Check out an idle worker, starting one or waiting if needed."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                self._workers -= 1
+            if self._workers < self.size:
+                self._workers += 1
+                spawn = True
+            else:
+                spawn = False
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+
+        if spawn:
+            try:
+                return PythonWorker(self.command, self.preload)
+            except Exception:
+                with self._lock:
+                    self._workers -= 1
+                raise
+        return await future
+
+    def release(self, worker: PythonWorker, healthy: bool = True) -> None:
+        """Return a worker to the pool, replacing it if worn out or broken."""
+        if not healthy or not worker.alive or worker.runs >= self.max_runs:
+            worker.close()
+            self.recycled += 1
+            try:
+                worker = PythonWorker(self.command, self.preload)
+            except Exception:
+                with self._lock:
+                    self._workers -= 1
+                return
+
+        with self._lock:
+            if not self._waiters:
+                self._idle.append(worker)
+                return
+            loop, future = self._waiters.popleft()
+
+        def deliver() -> None:
+            if future.done():
+                # The waiter was cancelled in the meantime
+                self.release(worker)
+            else:
+                future.set_result(worker)
+
+        try:
+            loop.call_soon_threadsafe(deliver)
+        except RuntimeError:
+            # The waiter's loop is closed
+            self.release(worker)
+
+    async def run(
+        self,
+        path: Path,
+        workdir: Path,
+        env: Dict[str, str],
+        timeout: float,
+        rlimits: Optional[Dict[str, int]] = None,
+        cgroup: Optional[Path] = None,
+        sys_path: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Run a Python file on a warm worker.
+
+        ``sys_path`` entries, such as dependency layers, are put ahead of
+        the worker's own packages.
+        """
+        request = {
+            "path": str(path),
+            "workdir": str(workdir),
+            "env": env,
+            "rlimits": rlimits or {},
+            "cgroup": str(cgroup) if cgroup else None,
+            "sys_path": sys_path or []
+        }
+        worker = await self.acquire()
+        loop = asyncio.get_running_loop()
+        pending = loop.run_in_executor(self._executor, worker.run, request)
+        try:
+            status = await asyncio.wait_for(asyncio.shield(pending), timeout)
+        except asyncio.TimeoutError:
+            worker.kill_run()
+            await self._finish(pending, worker)
+            return {
+                "success": False,
+                "error": f"Execution timed out after {timeout} seconds",
+                "output": read_capped(workdir / ".stdout") or None
+            }
+        except asyncio.CancelledError:
+            worker.kill_run()
+            pending.add_done_callback(
+                lambda f: self.release(worker, healthy=f.exception() is None)
+            )
+            raise
+        except Exception:
+            self.release(worker, healthy=False)
+            raise
+        self.release(worker)
+
+        stderr = read_capped(workdir / ".stderr")
+        return {
+            "success": status["exit_code"] == 0,
+            "error": stderr if stderr else None,
+            "output": read_capped(workdir / ".stdout"),
+            "exit_code": status["exit_code"],
+            "resources": {
+                "max_rss_kb": status["max_rss_kb"],
+                "cpu_seconds": status["cpu_seconds"]
+            }
+        }
+
+    async def _finish(self, pending: asyncio.Future, worker: PythonWorker) -> None:
+        """Wait for a killed run to be reaped, then release its worker."""
+        try:
+            await pending
+        except Exception:
+            self.release(worker, healthy=False)
+        else:
+            self.release(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size and usage."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "workers": self._workers,
+                "idle": len(self._idle),
+                "waiting": len(self._waiters),
+                "recycled": self.recycled
+            }
+
+    def close(self) -> None:
+        """Stop all idle workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._workers -= len(idle)
+        for worker in idle:
+            worker.close()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,105 @@
+"""Warm Python worker for the execution engine's interpreter pool.
+
+Run as a standalone script, not imported. The worker imports the modules
+named on its command line once, then serves JSON-line requests on stdin.
+Each request forks a fresh child that runs one snippet under the request's
+sandbox limits, with its output redirected to files in the run's directory.
+The worker writes the child's pid as soon as it has forked, so the parent
+can kill it, and then the exit code and resource usage once it has been
+reaped.
+"""
+
+import importlib
+import json
+import os
+import sys
+import traceback
+
+from sandbox_launcher import apply_rlimits
+
+
+def run_child(request):
+    """Run one snippet in the forked child; never returns."""
+    workdir = request["workdir"]
+    exit_code = 0
+    try:
+        os.setsid()
+        if request.get("cgroup"):
+            try:
+                with open(os.path.join(request["cgroup"], "cgroup.procs"), "w") as f:
+                    f.write(str(os.getpid()))
+            except OSError:
+                pass
+        apply_rlimits(request.get("rlimits") or {})
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        stdout = os.open(os.path.join(workdir, ".stdout"), os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        stderr = os.open(os.path.join(workdir, ".stderr"), os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        os.dup2(devnull, 0)
+        os.dup2(stdout, 1)
+        os.dup2(stderr, 2)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", closefd=False)
+
+        os.chdir(workdir)
+        os.environ.clear()
+        os.environ.update(request.get("env") or {})
+        sys.argv = [request["path"]]
+        sys.path[0:1] = [workdir, *request.get("sys_path", [])]
+
+        with open(request["path"]) as f:
+            source = f.read()
+        code = compile(source, request["path"], "exec")
+        exec(code, {"__name__": "__main__", "__file__": request["path"], "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        # Skip this function's frame so the traceback starts at the snippet
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def send(message):
+    """Write one protocol message to the parent."""
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    """Preload modules, then serve requests until stdin closes."""
+    for module in sys.argv[1:]:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    send({"ready": True})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            run_child(request)
+        send({"pid": pid})
+        _, status, rusage = os.wait4(pid, 0)
+        send({
+            "exit_code": os.waitstatus_to_exitcode(status),
+            "max_rss_kb": rusage.ru_maxrss,
+            "cpu_seconds": round(rusage.ru_utime + rusage.ru_stime, 6)
+        })
+
+
+if __name__ == "__main__":
+    main()
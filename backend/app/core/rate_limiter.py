@@ -0,0 +1,233 @@
+"""Per-provider rate limiting for model requests."""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import redis.asyncio as aioredis
+from .config import settings
+
+# Default limits per provider. Override through settings.RATE_LIMITS using a
+# "provider" or "provider:model" key.
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+    "openai": {"rpm": 500, "tpm": 200000, "max_concurrency": 50},
+    "anthropic": {"rpm": 50, "tpm": 40000, "max_concurrency": 20},
+    "gemini": {"rpm": 60, "tpm": 120000, "max_concurrency": 20},
+    "groq": {"rpm": 30, "tpm": 30000, "max_concurrency": 10}
+}
+
+KEY_PREFIX = "rate-limit:"
+
+# Atomically refills every bucket in KEYS and takes the requested amount from
+# all of them, or from none. ARGV holds (capacity, refill per second, amount)
+# triples. Returns the seconds to wait before retrying, 0 when acquired.
+TAKE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local amount = tonumber(ARGV[(i - 1) * 3 + 3])
+    local state = redis.call('HMGET', key, 'level', 'updated')
+    local level = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    level = math.min(capacity, level + (now - updated) * rate)
+    levels[i] = level
+    if level < amount then
+        wait = math.max(wait, (amount - level) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    if wait == 0 then
+        levels[i] = levels[i] - tonumber(ARGV[(i - 1) * 3 + 3])
+    end
+    redis.call('HSET', key, 'level', levels[i], 'updated', now)
+    redis.call('EXPIRE', key, 120)
+end
+return tostring(wait)
+"""
+
+Bucket = Tuple[str, float, float, float]  # (key, capacity, refill per second, amount)
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text."""
+    return max(1, len(text) // 4)
+
+
+class MemoryBucketStore:
+    """Token buckets held in process memory."""
+
+    def __init__(self):
+        """Initialize memory bucket store."""
+        self._levels: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, buckets: List[Bucket]) -> float:
+        """Take from all buckets or none; return seconds to wait if short."""
+        now = time.monotonic()
+        levels = []
+        wait = 0.0
+        for key, capacity, rate, amount in buckets:
+            level, updated = self._levels.get(key, (capacity, now))
+            level = min(capacity, level + (now - updated) * rate)
+            levels.append(level)
+            if level < amount:
+                wait = max(wait, (amount - level) / rate)
+
+        for (key, _, _, amount), level in zip(buckets, levels):
+            self._levels[key] = (level - amount if wait == 0 else level, now)
+        return wait
+
+    async def debit(self, key: str, amount: float) -> None:
+        """Remove extra tokens from a bucket, allowing it to go negative."""
+        if key in self._levels:
+            level, updated = self._levels[key]
+            self._levels[key] = (level - amount, updated)
+
+
+class RedisBucketStore:
+    """Token buckets shared across workers through Redis."""
+
+    def __init__(self, redis_url: str = settings.REDIS_URL):
+        """Initialize Redis bucket store."""
+        self.redis = aioredis.from_url(redis_url)
+        self._take = self.redis.register_script(TAKE_SCRIPT)
+
+    async def take(self, buckets: List[Bucket]) -> float:
+        """Take from all buckets or none; return seconds to wait if short."""
+        args = []
+        for _, capacity, rate, amount in buckets:
+            args.extend([capacity, rate, amount])
+        wait = await self._take(
+            keys=[KEY_PREFIX + key for key, _, _, _ in buckets],
+            args=args
+        )
+        return float(wait)
+
+    async def debit(self, key: str, amount: float) -> None:
+        """Remove extra tokens from a bucket, allowing it to go negative."""
+        await self.redis.hincrbyfloat(KEY_PREFIX + key, "level", -amount)
+
+
+class _ProviderLimiter:
+    """Queue and concurrency state for one provider/model pair."""
+
+    def __init__(self, limits: Dict[str, int]):
+        """Initialize provider limiter."""
+        self.limits = limits
+        # Locks and semaphores bind to the event loop they are first used
+        # on, and Celery workers run each task in a fresh loop.
+        self._primitives = weakref.WeakKeyDictionary()
+        self.waiting = 0
+        self.in_flight = 0
+        self.total_wait = 0.0
+
+    def primitives(self) -> Tuple[asyncio.Lock, asyncio.Semaphore]:
+        """Get the queue lock and concurrency semaphore for the running loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._primitives:
+            # asyncio.Lock wakes waiters in arrival order, so callers are
+            # admitted first-come first-served.
+            self._primitives[loop] = (
+                asyncio.Lock(),
+                asyncio.Semaphore(self.limits["max_concurrency"])
+            )
+        return self._primitives[loop]
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter for model calls.
+
+    Callers that exceed a limit wait in a FIFO queue until the buckets
+    refill instead of failing. With the Redis backend the buckets are
+    shared by every API and Celery worker.
+    """
+
+    def __init__(self, backend: str = settings.RATE_LIMIT_BACKEND):
+        """Initialize rate limiter."""
+        self.store = RedisBucketStore() if backend == "redis" else MemoryBucketStore()
+        self._limiters: Dict[str, _ProviderLimiter] = {}
+
+    def limits_for(self, provider: str, model_name: str) -> Dict[str, int]:
+        """Get the effective limits for a provider and model."""
+        limits = dict(DEFAULT_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMITS["openai"]))
+        limits.update(settings.RATE_LIMITS.get(provider, {}))
+        limits.update(settings.RATE_LIMITS.get(f"{provider}:{model_name}", {}))
+        return limits
+
+    def _get_limiter(self, provider: str, model_name: str) -> _ProviderLimiter:
+        """Get or create the limiter for a provider and model."""
+        key = f"{provider}:{model_name}"
+        if key not in self._limiters:
+            self._limiters[key] = _ProviderLimiter(self.limits_for(provider, model_name))
+        return self._limiters[key]
+
+    def _buckets(
+        self,
+        key: str,
+        limits: Dict[str, int],
+        tokens: int
+    ) -> List[Bucket]:
+        """Build the request and token buckets for one call."""
+        # A request larger than the whole minute budget would never fit
+        tokens = min(tokens, limits["tpm"])
+        return [
+            (f"{key}:rpm", limits["rpm"], limits["rpm"] / 60.0, 1),
+            (f"{key}:tpm", limits["tpm"], limits["tpm"] / 60.0, tokens)
+        ]
+
+    @asynccontextmanager
+    async def limit(
+        self,
+        provider: str,
+        model_name: str,
+        estimated_tokens: int = 1
+    ) -> AsyncIterator[None]:
+        """Wait for capacity, then hold a concurrency slot for the call."""
+        key = f"{provider}:{model_name}"
+        limiter = self._get_limiter(provider, model_name)
+        buckets = self._buckets(key, limiter.limits, estimated_tokens)
+        queue_lock, semaphore = limiter.primitives()
+
+        started = time.monotonic()
+        limiter.waiting += 1
+        try:
+            async with queue_lock:
+                while True:
+                    wait = await self.store.take(buckets)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            limiter.waiting -= 1
+
+        async with semaphore:
+            limiter.total_wait += time.monotonic() - started
+            limiter.in_flight += 1
+            try:
+                yield
+            finally:
+                limiter.in_flight -= 1
+
+    async def record_tokens(self, provider: str, model_name: str, tokens: int) -> None:
+        """Charge tokens used beyond the estimate, e.g. for the completion."""
+        if tokens > 0:
+            await self.store.debit(f"{provider}:{model_name}:tpm", tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait time per provider/model."""
+        return {
+            key: {
+                "limits": limiter.limits,
+                "waiting": limiter.waiting,
+                "in_flight": limiter.in_flight,
+                "total_wait_seconds": round(limiter.total_wait, 3)
+            }
+            for key, limiter in self._limiters.items()
+        }
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,182 @@
+"""Baseline screenshots for visual regression."""
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from .config import settings
+from .decoded_frame import DecodedFrame, ImageInput
+from .perceptual_hash import dhash, hamming_distances, phash
+
+INDEX_FILE = "index.json"
+
+
+class ReferenceStore:
+    """Baseline images stored decoded and memory-mapped on use.
+
+    Each baseline is saved once as a grayscale ``.npy`` array named by its
+    content, so a comparison never decodes the baseline again, and every
+    process mapping the same file shares its pages through the OS cache.
+    The index records each baseline's dHash and pHash, so the baseline of
+    a screenshot can be looked up by nearest hash when it is not named.
+    Several processes may use one store; each reloads the index when it
+    changes on disk.
+    """
+
+    def __init__(
+        self,
+        root: str = settings.VISUAL_REFERENCE_DIR,
+        max_distance: int = settings.VISUAL_HASH_MAX_DISTANCE
+    ):
+        """Initialize reference store."""
+        self.root = Path(root).resolve()
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, int]] = None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._names: List[str] = []
+        self._hashes = np.zeros((0, 2), np.uint64)
+        # Memory maps by file name
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the store lock across threads and processes."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def refresh(self) -> None:
+        """Reload the index if it changed on disk."""
+        try:
+            stat = (self.root / INDEX_FILE).stat()
+            version = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            version = None
+        if version == self._version:
+            return
+        entries = json.loads((self.root / INDEX_FILE).read_text()) if version else {}
+        self._load(entries)
+        self._version = version
+
+    def _load(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the in-memory index."""
+        self.entries = entries
+        self._names = list(entries)
+        self._hashes = np.array(
+            [[int(e["dhash"], 16), int(e["phash"], 16)] for e in entries.values()],
+            dtype=np.uint64
+        ).reshape(-1, 2)
+        files = {e["file"] for e in entries.values()}
+        self._arrays = {f: a for f, a in self._arrays.items() if f in files}
+
+    def _write_index(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically replace the index file."""
+        staging = self.root / f"{INDEX_FILE}.{os.getpid()}"
+        staging.write_text(json.dumps(entries))
+        os.replace(staging, self.root / INDEX_FILE)
+        self._load(entries)
+        stat = (self.root / INDEX_FILE).stat()
+        self._version = (stat.st_ino, stat.st_mtime_ns)
+
+    def _discard(self, file: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Delete an array file no entry uses; open memory maps stay valid."""
+        if all(e["file"] != file for e in entries.values()):
+            (self.root / file).unlink(missing_ok=True)
+
+    def add(self, name: str, image: ImageInput) -> Dict[str, Any]:
+        """Store an image as the baseline called ``name``, replacing any earlier one."""
+        gray = DecodedFrame.load(image).gray
+        digest = hashlib.sha1(f"{gray.shape}".encode("utf-8"))
+        digest.update(gray)
+        file = f"{digest.hexdigest()}.npy"
+        entry = {
+            "file": file,
+            "width": gray.shape[1],
+            "height": gray.shape[0],
+            "dhash": f"{dhash(gray):016x}",
+            "phash": f"{phash(gray):016x}",
+            "created_at": datetime.utcnow().isoformat()
+        }
+
+        with self._locked():
+            self.refresh()
+            path = self.root / file
+            if not path.exists():
+                staging = self.root / f"{file}.{os.getpid()}"
+                with open(staging, "wb") as f:
+                    np.save(f, gray)
+                os.replace(staging, path)
+            previous = self.entries.get(name)
+            entries = {**self.entries, name: entry}
+            self._write_index(entries)
+            if previous and previous["file"] != file:
+                self._discard(previous["file"], entries)
+        return {"name": name, **entry}
+
+    def remove(self, name: str) -> bool:
+        """Delete a baseline. Returns False if there was none."""
+        with self._locked():
+            self.refresh()
+            if name not in self.entries:
+                return False
+            entries = dict(self.entries)
+            previous = entries.pop(name)
+            self._write_index(entries)
+            self._discard(previous["file"], entries)
+        return True
+
+    def get(self, name: str) -> np.ndarray:
+        """Get a baseline as a read-only memory-mapped gray array."""
+        self.refresh()
+        if name not in self.entries:
+            raise ValueError(f"Reference image not found: {name}")
+        file = self.entries[name]["file"]
+        if file not in self._arrays:
+            self._arrays[file] = np.load(self.root / file, mmap_mode="r")
+        return self._arrays[file]
+
+    def match(self, gray: np.ndarray) -> Optional[Tuple[str, int]]:
+        """Find the baseline nearest to an image by combined hash distance.
+
+        Returns the name and the distance in bits, or None if no baseline
+        is within ``max_distance``.
+        """
+        self.refresh()
+        if not self._names:
+            return None
+        distances = (
+            hamming_distances(self._hashes[:, 0], dhash(gray))
+            + hamming_distances(self._hashes[:, 1], phash(gray))
+        )
+        best = int(np.argmin(distances))
+        if distances[best] > self.max_distance:
+            return None
+        return self._names[best], int(distances[best])
+
+    def list_references(self) -> List[Dict[str, Any]]:
+        """Get every baseline's metadata."""
+        self.refresh()
+        return [{"name": name, **entry} for name, entry in self.entries.items()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store size and location."""
+        self.refresh()
+        return {
+            "references": len(self.entries),
+            "mapped": len(self._arrays),
+            "root": str(self.root)
+        }
+
+
+reference_store = ReferenceStore()
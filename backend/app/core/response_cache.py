@@ -0,0 +1,191 @@
+"""Two-tier LRU/Redis cache and the exact-match cache for model responses."""
+
+import asyncio
+import hashlib
+import json
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import redis.asyncio as aioredis
+from .config import settings
+
+KEY_PREFIX = "response-cache:"
+
+
+class TwoTierCache:
+    """Two-tier cache: an in-process LRU and an optional Redis tier.
+
+    Subclasses set ``key_prefix`` and, for values that are not strings,
+    ``encode``/``decode``; they also build their own keys. Both tiers hold
+    encoded values, so a caller changing a result it got cannot change
+    the cached one.
+    """
+
+    key_prefix = ""
+
+    def __init__(self, max_entries: int, default_ttl: int, use_redis: bool):
+        """Initialize cache."""
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # A redis.asyncio client is bound to the loop that created it, and
+        # Celery tasks each run on a fresh loop
+        self._redis = weakref.WeakKeyDictionary()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bypassed": 0,
+            "redis_errors": 0
+        }
+
+    def encode(self, value: Any) -> str:
+        """Serialize a value for storage."""
+        return value
+
+    def decode(self, raw: str) -> Any:
+        """Deserialize a stored value."""
+        return raw
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Look up a cached value."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, raw = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["local_hits"] += 1
+                return self.decode(raw)
+            del self._entries[key]
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(self.key_prefix + key)
+                ttl = await redis.ttl(self.key_prefix + key) if raw is not None else 0
+            except Exception:
+                self.stats["redis_errors"] += 1
+                raw = None
+            if raw is not None:
+                raw = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+                self._set_local(key, raw, ttl if ttl > 0 else self.default_ttl)
+                self.stats["hits"] += 1
+                self.stats["redis_hits"] += 1
+                return self.decode(raw)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store a value in every cache tier."""
+        ttl = ttl or self.default_ttl
+        raw = self.encode(value)
+        self._set_local(key, raw, ttl)
+        self.stats["stores"] += 1
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self.key_prefix + key, raw, ex=ttl)
+            except Exception:
+                self.stats["redis_errors"] += 1
+
+    def record_bypass(self) -> None:
+        """Count a lookup that skipped the cache."""
+        self.stats["bypassed"] += 1
+
+    async def clear(self) -> None:
+        """Drop all locally cached values."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current cache size."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "redis_enabled": self.use_redis
+        }
+
+    def _set_local(self, key: str, raw: str, ttl: int) -> None:
+        """Store an encoded entry in the in-process LRU tier."""
+        self._entries[key] = (time.monotonic() + ttl, raw)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _get_redis(self):
+        """Get the Redis client for the running loop, creating it on first use."""
+        if not self.use_redis:
+            return None
+        loop = asyncio.get_running_loop()
+        if loop not in self._redis:
+            self._redis[loop] = aioredis.from_url(settings.REDIS_URL)
+        return self._redis[loop]
+
+
+class ResponseCache(TwoTierCache):
+    """Exact-match cache of model responses.
+
+    Entries are keyed by a canonical hash of everything sent to the
+    provider, so identical requests from different agents or workers
+    share one cached answer.
+    """
+
+    key_prefix = KEY_PREFIX
+
+    def __init__(
+        self,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        default_ttl: int = settings.RESPONSE_CACHE_TTL,
+        use_redis: bool = settings.RESPONSE_CACHE_USE_REDIS
+    ):
+        """Initialize response cache."""
+        super().__init__(max_entries, default_ttl, use_redis)
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_name: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build a canonical cache key for a model request."""
+        context = context or {}
+        payload = {
+            "provider": provider,
+            "model": model_name,
+            "system_prompt": context.get("system_prompt"),
+            "history": context.get("chat_history", []),
+            "message": message
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, config: Dict[str, Any]) -> bool:
+        """Check whether responses for a model config may be cached."""
+        if not settings.RESPONSE_CACHE_ENABLED or not config.get("cache", True):
+            return False
+        if (
+            settings.RESPONSE_CACHE_SKIP_NONZERO_TEMPERATURE
+            and config.get("temperature", 0) != 0
+            and not config.get("cache_nonzero_temperature", False)
+        ):
+            return False
+        return True
+
+    def ttl_for(self, config: Dict[str, Any]) -> int:
+        """Get the TTL for a model config, honouring per-agent overrides."""
+        return int(config.get("cache_ttl", self.default_ttl))
+
+
+response_cache = ResponseCache()
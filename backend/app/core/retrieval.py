@@ -0,0 +1,306 @@
+"""Chunking and retrieval over file contexts."""
+
+import ast
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .config import settings
+from .context_budget import count_tokens
+from .semantic_cache import HashingEmbedder
+
+WINDOW_LINES = 40
+WINDOW_OVERLAP = 10
+MAX_PYTHON_CHUNK_LINES = 80
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking up snake_case and camelCase."""
+    terms = []
+    for identifier in IDENTIFIER_PATTERN.findall(text):
+        lowered = identifier.lower()
+        terms.append(lowered)
+        parts = [p.lower() for part in identifier.split("_") for p in CAMEL_PATTERN.findall(part)]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def _line_chunks(
+    lines: List[str],
+    first_line: int = 1,
+    last_line: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """Split a line range into overlapping windows, 1-based and inclusive."""
+    last_line = last_line or len(lines)
+    spans = []
+    start = first_line
+    while start <= last_line:
+        end = min(start + WINDOW_LINES - 1, last_line)
+        spans.append((start, end))
+        if end == last_line:
+            break
+        start = end - WINDOW_OVERLAP + 1
+    return spans
+
+
+def _python_chunks(content: str, lines: List[str]) -> List[Tuple[int, int, Optional[str]]]:
+    """Split Python source along top-level definitions."""
+    tree = ast.parse(content)
+    spans: List[Tuple[int, int, Optional[str]]] = []
+    pending_start: Optional[int] = None
+
+    def flush(end: int) -> None:
+        nonlocal pending_start
+        if pending_start is not None and end >= pending_start:
+            spans.extend((s, e, None) for s, e in _line_chunks(lines, pending_start, end))
+        pending_start = None
+
+    for node in tree.body:
+        start = min(
+            [node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]
+        )
+        end = node.end_lineno or node.lineno
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if pending_start is None:
+                pending_start = start
+            continue
+
+        flush(start - 1)
+        if isinstance(node, ast.ClassDef) and end - start + 1 > MAX_PYTHON_CHUNK_LINES:
+            # Split large classes into the class header, one chunk per member
+            # and one per run of other class-level statements between members
+            members = [
+                n for n in node.body
+                if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            header_end = end
+            if members:
+                header_end = min(
+                    [members[0].lineno]
+                    + [d.lineno for d in members[0].decorator_list]
+                ) - 1
+            spans.append((start, header_end, node.name))
+            run: Optional[Tuple[int, int]] = None
+            for child in node.body:
+                child_start = min(
+                    [child.lineno]
+                    + [d.lineno for d in getattr(child, "decorator_list", [])]
+                )
+                if child_start <= header_end:
+                    continue
+                if child in members:
+                    if run is not None:
+                        spans.extend((s, e, node.name) for s, e in _line_chunks(lines, *run))
+                        run = None
+                    spans.append((child_start, child.end_lineno, f"{node.name}.{child.name}"))
+                else:
+                    run = (run[0] if run else child_start, child.end_lineno)
+            if run is not None:
+                spans.extend((s, e, node.name) for s, e in _line_chunks(lines, *run))
+        elif end - start + 1 > MAX_PYTHON_CHUNK_LINES:
+            spans.extend((s, e, node.name) for s, e in _line_chunks(lines, start, end))
+        else:
+            spans.append((start, end, node.name))
+    flush(len(lines))
+    return spans
+
+
+def chunk_file(name: str, content: str) -> List[Dict[str, Any]]:
+    """Split a file into retrievable chunks.
+
+    Python files are split along top-level functions and classes; other
+    files, and Python that does not parse, use overlapping line windows.
+    """
+    lines = content.splitlines()
+    spans: List[Tuple[int, int, Optional[str]]]
+    if name.endswith(".py"):
+        try:
+            spans = _python_chunks(content, lines)
+        except SyntaxError:
+            spans = [(s, e, None) for s, e in _line_chunks(lines)]
+    else:
+        spans = [(s, e, None) for s, e in _line_chunks(lines)]
+
+    chunks = []
+    for start, end, symbol in spans:
+        text = "\n".join(lines[start - 1:end])
+        if not text.strip():
+            continue
+        chunks.append({
+            "file": name,
+            "start_line": start,
+            "end_line": end,
+            "symbol": symbol,
+            "text": text,
+            "hash": hashlib.sha1(text.encode("utf-8")).hexdigest()
+        })
+    return chunks
+
+
+class BM25Index:
+    """Incrementally updatable BM25 index."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize BM25 index."""
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Counter] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def add(self, doc_id: str, terms: List[str]) -> None:
+        """Index a document."""
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+        counts = Counter(terms)
+        self.doc_terms[doc_id] = counts
+        self.doc_lengths[doc_id] = len(terms)
+        self.total_length += len(terms)
+        for term, tf in counts.items():
+            self.postings[term][doc_id] = tf
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index."""
+        counts = self.doc_terms.pop(doc_id, None)
+        if counts is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in counts:
+            docs = self.postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def search(self, terms: List[str], limit: int) -> List[Tuple[str, float]]:
+        """Score documents against query terms."""
+        n_docs = len(self.doc_terms)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class FileContextIndex:
+    """Retrieval index over file contexts.
+
+    Chunks are ranked with BM25 and, when vectors are enabled, fused with
+    cosine similarity from a local embedder via reciprocal rank fusion.
+    Updating a file only re-indexes the chunks whose text changed.
+    """
+
+    def __init__(self, use_vectors: bool = settings.FILE_CONTEXT_VECTORS):
+        """Initialize file context index."""
+        self.bm25 = BM25Index()
+        self.embedder = HashingEmbedder() if use_vectors else None
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.file_chunks: Dict[Any, List[str]] = {}
+        self.file_hashes: Dict[Any, str] = {}
+
+    def update_file(self, file_id: Any, name: str, content: str) -> None:
+        """Index a file, re-indexing only chunks that changed."""
+        content_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        if self.file_hashes.get(file_id) == content_hash:
+            return
+
+        old_ids = set(self.file_chunks.get(file_id, []))
+        new_ids = []
+        for chunk in chunk_file(name, content):
+            chunk_id = f"{file_id}:{chunk['hash']}"
+            new_ids.append(chunk_id)
+            if chunk_id in self.chunks:
+                # Unchanged text; only its position may have moved
+                self.chunks[chunk_id].update(chunk)
+                continue
+            self.chunks[chunk_id] = chunk
+            self.bm25.add(chunk_id, tokenize(f"{name} {chunk['symbol'] or ''} {chunk['text']}"))
+            if self.embedder is not None:
+                self.vectors[chunk_id] = self.embedder.embed(chunk["text"])
+
+        for chunk_id in old_ids - set(new_ids):
+            self._drop_chunk(chunk_id)
+        self.file_chunks[file_id] = new_ids
+        self.file_hashes[file_id] = content_hash
+
+    def remove_file(self, file_id: Any) -> None:
+        """Remove a file from the index."""
+        for chunk_id in self.file_chunks.pop(file_id, []):
+            self._drop_chunk(chunk_id)
+        self.file_hashes.pop(file_id, None)
+
+    def sync_files(self, files: List[Dict[str, Any]]) -> None:
+        """Make the index match a list of ``{"name", "content"}`` file dicts."""
+        current = set()
+        for file in files:
+            file_id = file.get("id", file["name"])
+            current.add(file_id)
+            self.update_file(file_id, file["name"], file["content"])
+        for file_id in set(self.file_chunks) - current:
+            self.remove_file(file_id)
+
+    def search(self, query: str, top_k: int = 8) -> List[Dict[str, Any]]:
+        """Find the chunks most relevant to a query."""
+        candidates = max(top_k * 4, 20)
+        rankings = [[doc_id for doc_id, _ in self.bm25.search(tokenize(query), candidates)]]
+
+        if self.embedder is not None and self.vectors:
+            ids = list(self.vectors)
+            scores = np.stack([self.vectors[i] for i in ids]) @ self.embedder.embed(query)
+            order = np.argsort(-scores)[:candidates]
+            rankings.append([ids[i] for i in order if scores[i] > 0])
+
+        # Reciprocal rank fusion
+        fused: Dict[str, float] = defaultdict(float)
+        for ranking in rankings:
+            for rank, doc_id in enumerate(ranking):
+                fused[doc_id] += 1.0 / (60 + rank)
+        best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [{**self.chunks[doc_id], "score": score} for doc_id, score in best]
+
+    def build_context(
+        self,
+        query: str,
+        token_budget: int,
+        top_k: int = 8,
+        model_name: str = "gpt-4"
+    ) -> str:
+        """Render the most relevant chunks for a query within a token budget."""
+        sections = []
+        used = 0
+        for chunk in self.search(query, top_k):
+            section = (
+                f"\nFile: {chunk['file']} (lines {chunk['start_line']}-{chunk['end_line']})\n"
+                f"{chunk['text']}\n"
+            )
+            cost = count_tokens(section, model_name)
+            if used + cost > token_budget:
+                continue
+            sections.append(section)
+            used += cost
+        if not sections:
+            return ""
+        return "Relevant file context:\n" + "".join(sections)
+
+    def _drop_chunk(self, chunk_id: str) -> None:
+        self.chunks.pop(chunk_id, None)
+        self.vectors.pop(chunk_id, None)
+        self.bm25.remove(chunk_id)
+
+
+file_context_index = FileContextIndex()
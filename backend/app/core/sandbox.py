@@ -0,0 +1,222 @@
+"""Resource-limited sandbox profiles for code execution."""
+
+import json
+import os
+import signal
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .config import settings
+
+# Limits per profile. Override or add profiles through settings.SANDBOX_PROFILES.
+SANDBOX_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "cpu_seconds": 30,
+        "memory_mb": 512,
+        "open_files": 256,
+        # RLIMIT_NPROC counts every process of the user, not just the run's;
+        # the cgroup pids limit is the per-run one.
+        "processes": 512,
+        "file_size_mb": 64,
+        "inherit_env": False
+    },
+    "strict": {
+        "cpu_seconds": 10,
+        "memory_mb": 256,
+        "open_files": 64,
+        "processes": 256,
+        "file_size_mb": 8,
+        "inherit_env": False
+    },
+    "relaxed": {
+        "cpu_seconds": 120,
+        "memory_mb": 2048,
+        "open_files": 1024,
+        "processes": 1024,
+        "file_size_mb": 512,
+        "inherit_env": False
+    }
+}
+
+# Server variables passed to runs that do not inherit the environment.
+# Everything else, including API keys, stays out of user code.
+PASSTHROUGH_ENV_VARS = ["PATH", "LANG", "LC_ALL", "TZ", "NODE_PATH"]
+
+LIMIT_SIGNALS = {
+    signal.SIGXCPU: "CPU time limit exceeded",
+    signal.SIGXFSZ: "File size limit exceeded"
+}
+
+
+def profile_for(name: Optional[str] = None) -> Dict[str, Any]:
+    """Get the limits of a sandbox profile."""
+    name = name or settings.SANDBOX_DEFAULT_PROFILE
+    profiles = {**SANDBOX_PROFILES, **settings.SANDBOX_PROFILES}
+    if name not in profiles:
+        raise ValueError(f"Unknown sandbox profile: {name}")
+    profile = {**SANDBOX_PROFILES["default"], **profiles[name]}
+    profile["name"] = name
+    return profile
+
+
+def rlimits_for(profile: Dict[str, Any], address_space: bool = True) -> Dict[str, int]:
+    """Map a profile to ``resource`` limit names and values.
+
+    ``address_space`` is off for runtimes such as Node that reserve far
+    more virtual memory than they use; their memory is capped by other means.
+    """
+    limits = {
+        "RLIMIT_CPU": int(profile["cpu_seconds"]),
+        "RLIMIT_NOFILE": int(profile["open_files"]),
+        "RLIMIT_NPROC": int(profile["processes"]),
+        "RLIMIT_FSIZE": int(profile["file_size_mb"]) * 1024 * 1024,
+        "RLIMIT_CORE": 0
+    }
+    if address_space:
+        limits["RLIMIT_AS"] = int(profile["memory_mb"]) * 1024 * 1024
+    return limits
+
+
+def build_env(
+    profile: Dict[str, Any],
+    env_vars: Optional[Dict[str, str]],
+    workdir: Path
+) -> Dict[str, str]:
+    """Build the environment for a run."""
+    if profile.get("inherit_env"):
+        env = os.environ.copy()
+    else:
+        env = {k: os.environ[k] for k in PASSTHROUGH_ENV_VARS if k in os.environ}
+        env["HOME"] = str(workdir)
+        env["TMPDIR"] = str(workdir)
+    if env_vars:
+        env.update(env_vars)
+    return env
+
+
+def describe_exit(exit_code: Optional[int]) -> Optional[str]:
+    """Explain an exit caused by hitting a resource limit."""
+    if exit_code is None or exit_code >= 0:
+        return None
+    return LIMIT_SIGNALS.get(-exit_code)
+
+
+class CgroupManager:
+    """Places runs in their own cgroup v2 group when the host allows it.
+
+    ``root`` must be a cgroup v2 directory the server can write, delegated
+    with the memory, pids and cpu controllers. Without one, runs are
+    limited by rlimits alone.
+    """
+
+    CONTROLLERS = ["memory", "pids", "cpu"]
+
+    def __init__(self, root: Optional[str] = settings.SANDBOX_CGROUP_ROOT):
+        """Initialize cgroup manager."""
+        self.root = Path(root) if root else None
+        self.available = self._setup()
+
+    def _setup(self) -> bool:
+        """Check for a usable cgroup v2 root and enable its controllers."""
+        if self.root is None or not (self.root / "cgroup.controllers").exists():
+            return False
+        if not os.access(self.root, os.W_OK):
+            return False
+        try:
+            available = (self.root / "cgroup.controllers").read_text().split()
+            enabled = (self.root / "cgroup.subtree_control").read_text().split()
+            missing = [c for c in self.CONTROLLERS if c in available and c not in enabled]
+            if missing:
+                (self.root / "cgroup.subtree_control").write_text(
+                    " ".join(f"+{c}" for c in missing)
+                )
+            enabled = (self.root / "cgroup.subtree_control").read_text().split()
+        except OSError:
+            return False
+        return "memory" in enabled and "pids" in enabled
+
+    def create(self, profile: Dict[str, Any]) -> Optional[Path]:
+        """Create a cgroup for one run, or return None if unavailable."""
+        if not self.available:
+            return None
+        path = self.root / f"run-{uuid.uuid4().hex}"
+        try:
+            path.mkdir()
+            self._write(path, "memory.max", str(int(profile["memory_mb"]) * 1024 * 1024))
+            self._write(path, "memory.swap.max", "0")
+            self._write(path, "pids.max", str(int(profile["processes"])))
+            if profile.get("cpu_quota"):
+                # Fraction of one CPU, e.g. 0.5
+                self._write(path, "cpu.max", f"{int(float(profile['cpu_quota']) * 100000)} 100000")
+        except OSError:
+            self.remove(path)
+            return None
+        return path
+
+    def stats(self, path: Optional[Path]) -> Dict[str, Any]:
+        """Read a run's peak memory, CPU time and OOM kills."""
+        if path is None:
+            return {}
+        stats: Dict[str, Any] = {}
+        try:
+            peak = path / "memory.peak"
+            if peak.exists():
+                stats["max_rss_kb"] = int(peak.read_text()) // 1024
+            for line in (path / "cpu.stat").read_text().splitlines():
+                key, value = line.split()
+                if key == "usage_usec":
+                    stats["cpu_seconds"] = int(value) / 1e6
+            for line in (path / "memory.events").read_text().splitlines():
+                key, value = line.split()
+                if key == "oom_kill":
+                    stats["oom_killed"] = int(value) > 0
+        except (OSError, ValueError):
+            pass
+        return stats
+
+    def remove(self, path: Optional[Path]) -> None:
+        """Kill anything left in a run's cgroup and delete it."""
+        if path is None:
+            return
+        try:
+            if (path / "cgroup.kill").exists():
+                (path / "cgroup.kill").write_text("1")
+        except OSError:
+            pass
+        # Killed processes take a moment to leave the group
+        for _ in range(10):
+            try:
+                path.rmdir()
+                return
+            except OSError:
+                time.sleep(0.01)
+
+    @staticmethod
+    def _write(path: Path, name: str, value: str) -> None:
+        if (path / name).exists():
+            (path / name).write_text(value)
+
+
+def launcher_command(
+    command: List[str],
+    rlimits: Dict[str, int],
+    cgroup: Optional[Path],
+    rusage_path: Path
+) -> List[str]:
+    """Wrap a command in the sandbox launcher."""
+    config = {
+        "rlimits": rlimits,
+        "cgroup": str(cgroup) if cgroup else None,
+        "rusage_path": str(rusage_path)
+    }
+    return [
+        sys.executable, "-I", "-S",
+        str(Path(__file__).with_name("sandbox_launcher.py")),
+        json.dumps(config),
+        *command
+    ]
+
+
+cgroups = CgroupManager()
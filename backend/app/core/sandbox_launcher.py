@@ -0,0 +1,83 @@
+"""Sandbox launcher for the execution engine.
+
+Run as a standalone script, not imported:
+
+    python -I -S sandbox_launcher.py '<config json>' command [args...]
+
+Joins the run's cgroup, applies the rlimits, then forks and execs the
+command. It waits for the command with wait4 to write its peak RSS and CPU
+time to ``rusage_path``, and exits the way the command did.
+"""
+
+import json
+import os
+import resource
+import signal
+import sys
+
+
+def apply_rlimits(rlimits):
+    """Apply limits, clamped to the hard limits this process may raise to."""
+    for name, value in rlimits.items():
+        limit = getattr(resource, name, None)
+        if limit is None:
+            continue
+        _, hard = resource.getrlimit(limit)
+        # A second of headroom lets SIGXCPU arrive before the SIGKILL
+        new_hard = value + 1 if name == "RLIMIT_CPU" else value
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+            new_hard = min(new_hard, hard)
+        try:
+            resource.setrlimit(limit, (value, new_hard))
+        except (ValueError, OSError):
+            pass
+
+
+def main():
+    config = json.loads(sys.argv[1])
+    command = sys.argv[2:]
+
+    if config.get("cgroup"):
+        try:
+            with open(os.path.join(config["cgroup"], "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+        except OSError:
+            pass
+    apply_rlimits(config.get("rlimits", {}))
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.execvp(command[0], command)
+        except OSError as e:
+            os.write(2, f"{command[0]}: {e.strerror}\n".encode())
+            os._exit(127)
+
+    # Termination requests go to the child; the launcher exits after it
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, lambda signum, frame: os.kill(pid, signum))
+
+    while True:
+        try:
+            _, status, rusage = os.wait4(pid, 0)
+            break
+        except InterruptedError:
+            continue
+
+    with open(config["rusage_path"], "w") as f:
+        json.dump({
+            "max_rss_kb": rusage.ru_maxrss,
+            "cpu_seconds": round(rusage.ru_utime + rusage.ru_stime, 6)
+        }, f)
+
+    if os.WIFSIGNALED(status):
+        sig = os.WTERMSIG(status)
+        signal.signal(sig, signal.SIG_DFL)
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        os.kill(os.getpid(), sig)
+    sys.exit(os.waitstatus_to_exitcode(status))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""AST-based security analysis for Python code."""
+
+import ast
+import builtins
+import importlib
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, List, Optional
+from .config import settings
+
+# Extra check run on a matching call; returns the message to report, or
+# None to drop the finding.
+RuleCheck = Callable[[ast.Call, str, str], Optional[str]]
+
+
+class SecurityRule:
+    """Flags calls to functions matching any of ``calls``.
+
+    Names are fully qualified after import aliases are resolved, e.g.
+    ``os.system`` or ``builtins.eval``, and may use shell-style wildcards
+    such as ``subprocess.*``.
+    """
+
+    def __init__(
+        self,
+        rule_id: str,
+        message: str,
+        calls: List[str],
+        severity: str = "high",
+        check: Optional[RuleCheck] = None
+    ):
+        """Initialize security rule."""
+        self.rule_id = rule_id
+        self.message = message
+        self.calls = calls
+        self.severity = severity
+        self.check = check
+
+    def evaluate(self, node: ast.Call, name: str) -> Optional[str]:
+        """Get the message for a matching call, or None to skip it."""
+        if self.check is None:
+            return self.message
+        return self.check(node, name, self.message)
+
+
+def _keyword(node: ast.Call, name: str) -> Optional[ast.expr]:
+    """Get a keyword argument of a call."""
+    for keyword in node.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _check_shell(node: ast.Call, name: str, message: str) -> Optional[str]:
+    """Call out subprocess calls that go through the shell."""
+    shell = _keyword(node, "shell")
+    if isinstance(shell, ast.Constant) and shell.value is True:
+        return f"{message} with shell=True"
+    return message
+
+
+def _check_yaml_loader(node: ast.Call, name: str, message: str) -> Optional[str]:
+    """Allow yaml.load with one of the safe loaders."""
+    loader = _keyword(node, "Loader")
+    if loader is None and len(node.args) > 1:
+        loader = node.args[1]
+    if isinstance(loader, ast.Attribute):
+        loader_name = loader.attr
+    elif isinstance(loader, ast.Name):
+        loader_name = loader.id
+    else:
+        loader_name = None
+    if name == "yaml.load" and loader_name in ("SafeLoader", "CSafeLoader", "BaseLoader"):
+        return None
+    return message
+
+
+DEFAULT_RULES: List[SecurityRule] = [
+    SecurityRule("S101", "Use of eval", ["builtins.eval"]),
+    SecurityRule("S102", "Use of exec", ["builtins.exec"]),
+    SecurityRule(
+        "S103", "Dynamic import",
+        ["builtins.__import__", "importlib.import_module", "importlib.__import__"],
+        severity="medium"
+    ),
+    SecurityRule("S104", "Compilation of dynamic code", ["builtins.compile"], severity="medium"),
+    SecurityRule("S105", "Reads from standard input", ["builtins.input"], severity="low"),
+    SecurityRule(
+        "S201", "Runs a shell command or program",
+        [
+            "os.system", "os.popen", "os.exec*", "os.spawn*", "os.posix_spawn*",
+            "os.startfile", "pty.spawn", "commands.*"
+        ]
+    ),
+    SecurityRule("S202", "Starts a subprocess", ["subprocess.*"], check=_check_shell),
+    SecurityRule(
+        "S301", "Deserializes untrusted data",
+        [
+            "pickle.load", "pickle.loads", "pickle.Unpickler", "_pickle.*", "cPickle.*",
+            "dill.load", "dill.loads", "marshal.load", "marshal.loads", "shelve.open",
+            "jsonpickle.decode"
+        ]
+    ),
+    SecurityRule(
+        "S302", "Loads YAML without a safe loader",
+        ["yaml.load", "yaml.load_all", "yaml.unsafe_load", "yaml.unsafe_load_all", "yaml.full_load"],
+        check=_check_yaml_loader
+    )
+]
+
+
+class _CallVisitor(ast.NodeVisitor):
+    """One walk over a module that resolves aliases and matches calls."""
+
+    def __init__(
+        self,
+        analyzer: "SecurityAnalyzer",
+        module_imports: Optional[Dict[str, str]] = None
+    ):
+        self.analyzer = analyzer
+        self.aliases: Dict[str, str] = {}
+        # Functions run after the whole module has, so their bodies also
+        # see imports placed below them
+        self.module_imports = module_imports or {}
+        self.findings: List[Dict[str, Any]] = []
+        self.depth = 0
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                # "import os.path" binds "os"
+                top = alias.name.split(".")[0]
+                self.aliases[top] = top
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.level or not node.module:
+            return  # relative imports cannot reach the standard library
+        for alias in node.names:
+            if alias.name != "*":
+                self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def _shadow(self, name: str) -> None:
+        """Record a module-level name rebound to something other than an import.
+
+        Bindings inside functions and classes are ignored, so a local
+        variable cannot hide a dangerous call elsewhere in the module.
+        """
+        if self.depth == 0:
+            self.aliases[name] = ""
+
+    def _visit_scope(self, node: ast.AST) -> None:
+        outer = self.aliases
+        if self.depth == 0:
+            self.aliases = {**outer, **self.module_imports}
+        self.depth += 1
+        self.generic_visit(node)
+        self.depth -= 1
+        if self.depth == 0:
+            self.aliases = outer
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Store):
+            self._shadow(node.id)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._shadow(node.name)
+        self._visit_scope(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_ClassDef = visit_FunctionDef
+    visit_Lambda = _visit_scope
+
+    def resolve(self, node: ast.expr) -> Optional[str]:
+        """Get the qualified name an expression refers to, if known."""
+        if isinstance(node, ast.Name):
+            if node.id in self.aliases:
+                return self.aliases[node.id] or None
+            if node.id == "__builtins__":
+                return "builtins"
+            if hasattr(builtins, node.id):
+                return f"builtins.{node.id}"
+            return None
+        if isinstance(node, ast.Attribute):
+            base = self.resolve(node.value)
+            return f"{base}.{node.attr}" if base else None
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id == "getattr"
+            and "getattr" not in self.aliases
+            and len(node.args) >= 2
+            and isinstance(node.args[1], ast.Constant)
+            and isinstance(node.args[1].value, str)
+        ):
+            # getattr(os, "system") is os.system
+            base = self.resolve(node.args[0])
+            return f"{base}.{node.args[1].value}" if base else None
+        return None
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = self.resolve(node.func)
+        if name is not None:
+            for rule in self.analyzer.rules_for(name):
+                message = rule.evaluate(node, name)
+                if message is not None:
+                    self.findings.append({
+                        "rule": rule.rule_id,
+                        "severity": rule.severity,
+                        "message": message,
+                        "call": name,
+                        "line": node.lineno,
+                        "column": node.col_offset
+                    })
+        self.generic_visit(node)
+
+
+class _ImportVisitor(_CallVisitor):
+    """First pass: the aliases imports bind at module level, in any order."""
+
+    def _shadow(self, name: str) -> None:
+        pass
+
+    def _visit_scope(self, node: ast.AST) -> None:
+        pass
+
+    visit_Lambda = _visit_scope
+
+    def visit_Name(self, node: ast.Name) -> None:
+        pass
+
+    def visit_Call(self, node: ast.Call) -> None:
+        self.generic_visit(node)
+
+
+class SecurityAnalyzer:
+    """Finds dangerous calls in Python code with two AST walks.
+
+    Import aliases (``from os import system as run``), including those a
+    function uses before the module imports them, ``getattr`` with a
+    constant name and ``builtins`` access are resolved, while strings and
+    comments are never matched. Rules are pluggable: pass them in, add them
+    with ``add_rule``, or list modules exposing a ``RULES`` list in
+    SECURITY_RULE_MODULES. SECURITY_DISABLED_RULES turns rules off by id.
+    """
+
+    def __init__(self, rules: Optional[List[SecurityRule]] = None):
+        """Initialize security analyzer."""
+        self.rules: List[SecurityRule] = []
+        self._exact: Dict[str, List[SecurityRule]] = {}
+        self._patterns: List[tuple] = []
+        # Matched rules per call name; names repeat heavily within a module
+        self._matches: Dict[str, List[SecurityRule]] = {}
+        if rules is None:
+            rules = list(DEFAULT_RULES)
+            for module in settings.SECURITY_RULE_MODULES:
+                rules.extend(importlib.import_module(module).RULES)
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: SecurityRule) -> None:
+        """Register a rule."""
+        if rule.rule_id in settings.SECURITY_DISABLED_RULES:
+            return
+        self.rules.append(rule)
+        self._matches.clear()
+        for call in rule.calls:
+            if any(c in call for c in "*?["):
+                self._patterns.append((call, rule))
+            else:
+                self._exact.setdefault(call, []).append(rule)
+
+    def rules_for(self, name: str) -> List[SecurityRule]:
+        """Get the rules that apply to a call of ``name``."""
+        if name not in self._matches:
+            matched = list(self._exact.get(name, ()))
+            for pattern, rule in self._patterns:
+                if rule not in matched and fnmatchcase(name, pattern):
+                    matched.append(rule)
+            self._matches[name] = matched
+        return self._matches[name]
+
+    def analyze(self, code: str) -> List[Dict[str, Any]]:
+        """Get the security findings of a module, in source order.
+
+        Raises SyntaxError if the code does not parse.
+        """
+        tree = ast.parse(code)
+        imports = _ImportVisitor(self)
+        imports.visit(tree)
+        visitor = _CallVisitor(self, imports.aliases)
+        visitor.visit(tree)
+        return sorted(visitor.findings, key=lambda f: (f["line"], f["column"]))
+
+
+security_analyzer = SecurityAnalyzer()
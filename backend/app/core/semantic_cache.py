@@ -0,0 +1,220 @@
+"""Semantic response cache backed by a local embedding index."""
+
+import hashlib
+import json
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .config import settings
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class BaseEmbedder(ABC):
+    """Interface for local text embedders used by the semantic cache."""
+
+    dim: int
+
+    @abstractmethod
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a text as an L2-normalized float32 vector of length ``dim``."""
+        pass
+
+
+class HashingEmbedder(BaseEmbedder):
+    """Offline embedder using the hashing trick over words and word bigrams."""
+
+    def __init__(self, dim: int = settings.SEMANTIC_CACHE_DIM):
+        """Initialize hashing embedder."""
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a text as a signed, normalized feature-hash vector."""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not features:
+            return vector
+
+        digests = [
+            int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little")
+            for f in features
+        ]
+        hashes = np.array(digests, dtype=np.uint64)
+        indices = (hashes % np.uint64(self.dim)).astype(np.int64)
+        signs = np.where((hashes >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, indices, signs)
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticIndex:
+    """Bounded cosine-similarity index with least-recently-used eviction.
+
+    Storage starts small and doubles as entries are added, up to
+    ``capacity``, so the many short-lived indexes cost little memory.
+    """
+
+    INITIAL_SLOTS = 8
+
+    def __init__(self, dim: int, capacity: int):
+        """Initialize semantic index."""
+        self.capacity = capacity
+        slots = min(capacity, self.INITIAL_SLOTS)
+        self.vectors = np.zeros((slots, dim), dtype=np.float32)
+        self.last_used = np.zeros(slots, dtype=np.int64)
+        self.responses: List[Optional[str]] = [None] * slots
+        self.size = 0
+        self._clock = 0
+
+    def _grow(self) -> None:
+        """Double the storage, up to capacity."""
+        slots = min(self.capacity, 2 * len(self.vectors))
+        extra = slots - len(self.vectors)
+        self.vectors = np.concatenate(
+            [self.vectors, np.zeros((extra, self.vectors.shape[1]), dtype=np.float32)]
+        )
+        self.last_used = np.concatenate([self.last_used, np.zeros(extra, dtype=np.int64)])
+        self.responses.extend([None] * extra)
+
+    def search(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        """Find the most similar cached response and its cosine similarity."""
+        if self.size == 0:
+            return None, 0.0
+        scores = self.vectors[:self.size] @ vector
+        best = int(np.argmax(scores))
+        self._clock += 1
+        self.last_used[best] = self._clock
+        return self.responses[best], float(scores[best])
+
+    def add(self, vector: np.ndarray, response: str) -> bool:
+        """Add a vector, evicting the least recently used entry when full.
+
+        Returns True if an entry was evicted.
+        """
+        evicted = self.size >= self.capacity
+        if evicted:
+            slot = int(np.argmin(self.last_used))
+        else:
+            if self.size == len(self.vectors):
+                self._grow()
+            slot = self.size
+            self.size += 1
+        self._clock += 1
+        self.vectors[slot] = vector
+        self.responses[slot] = response
+        self.last_used[slot] = self._clock
+        return evicted
+
+
+class SemanticCache:
+    """Near-duplicate response cache with one index per agent role.
+
+    Indexes are further split by provider, model, system prompt and history
+    so that a cached answer is only reused for an equivalent conversation.
+    Since the history changes every turn, indexes come and go quickly; at
+    most ``max_indexes`` are kept, the least recently used dropped first.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[BaseEmbedder] = None,
+        threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        max_indexes: int = settings.SEMANTIC_CACHE_MAX_INDEXES
+    ):
+        """Initialize semantic cache."""
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_indexes = max_indexes
+        self.indexes: "OrderedDict[str, SemanticIndex]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "index_evictions": 0
+        }
+
+    def set_embedder(self, embedder: BaseEmbedder) -> None:
+        """Swap the embedder, dropping indexes built with the old one."""
+        self.embedder = embedder
+        self.indexes.clear()
+
+    def is_enabled(self, config: Dict[str, Any]) -> bool:
+        """Check whether semantic caching applies to a model config."""
+        return bool(config.get("semantic_cache", settings.SEMANTIC_CACHE_ENABLED))
+
+    @staticmethod
+    def make_namespace(
+        role: Optional[str],
+        provider: str,
+        model_name: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build the index namespace for a request."""
+        context = context or {}
+        scope = json.dumps(
+            {
+                "system_prompt": context.get("system_prompt"),
+                "history": context.get("chat_history", [])
+            },
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16]
+        return f"{role or 'default'}:{provider}:{model_name}:{digest}"
+
+    def lookup(
+        self,
+        namespace: str,
+        message: str,
+        threshold: Optional[float] = None
+    ) -> Optional[str]:
+        """Return a cached response for a similar message, if any."""
+        index = self.indexes.get(namespace)
+        if index is not None:
+            self.indexes.move_to_end(namespace)
+            response, score = index.search(self.embedder.embed(message))
+            if response is not None and score >= (threshold or self.threshold):
+                self.stats["hits"] += 1
+                return response
+        self.stats["misses"] += 1
+        return None
+
+    def store(self, namespace: str, message: str, response: str) -> None:
+        """Index a message and its response."""
+        index = self.indexes.get(namespace)
+        if index is None:
+            index = SemanticIndex(self.embedder.dim, self.max_entries)
+            self.indexes[namespace] = index
+            while len(self.indexes) > self.max_indexes:
+                self.indexes.popitem(last=False)
+                self.stats["index_evictions"] += 1
+        else:
+            self.indexes.move_to_end(namespace)
+        if index.add(self.embedder.embed(message), response):
+            self.stats["evictions"] += 1
+        self.stats["stores"] += 1
+
+    def clear(self) -> None:
+        """Drop every index."""
+        self.indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and index sizes."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "threshold": self.threshold,
+            "indexes": {name: index.size for name, index in self.indexes.items()}
+        }
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,49 @@
+"""Helpers for streaming events over Server-Sent Events and WebSockets."""
+
+import json
+from typing import Any, AsyncIterator, Dict
+from fastapi import WebSocket
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens flush
+}
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Format an event dict as a Server-Sent Event frame."""
+    frame = ""
+    if "event" in event:
+        frame += f"event: {event['event']}\n"
+    return frame + f"data: {json.dumps(event, default=str)}\n\n"
+
+
+async def sse_stream(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Format an event stream as SSE, reporting failures as an error event."""
+    try:
+        async for event in events:
+            yield format_sse(event)
+    except ValueError as e:
+        yield format_sse({"event": "error", "error": str(e)})
+
+
+def sse_response(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Build a streaming HTTP response from an event stream."""
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+async def send_events(
+    websocket: WebSocket,
+    events: AsyncIterator[Dict[str, Any]]
+) -> None:
+    """Send an event stream over a WebSocket, reporting failures as an error event."""
+    try:
+        async for event in events:
+            await websocket.send_json(event)
+    except ValueError as e:
+        await websocket.send_json({"event": "error", "error": str(e)})
@@ -2,7 +2,10 @@
 
 from typing import Dict, Any, Optional, List
 from celery.result import AsyncResult
+import redis.asyncio as aioredis
 from .celery_app import celery_app
+from .batch_progress import batch_key
+from .config import settings
 
 class TaskMonitor:
     """Monitor and manage background tasks."""
@@ -26,6 +29,35 @@ class TaskMonitor:
             for task_id in task_ids
         ]
 
+    @staticmethod
+    async def get_batch_progress(batch_id: str) -> Dict[str, Any]:
+        """Get block counts for a batch started with tasks.batch_execute.
+
+        Blocks skipped after a fail-fast abort count towards ``percent``,
+        so ``done`` turns true once every block has finished or been
+        skipped.
+        """
+        redis = aioredis.from_url(settings.REDIS_URL)
+        try:
+            progress = await redis.hgetall(batch_key(batch_id))
+        finally:
+            await redis.aclose()
+        if not progress:
+            raise ValueError(f"Batch {batch_id} not found")
+
+        counts = {k.decode(): int(v) for k, v in progress.items()}
+        finished = counts["completed"] + counts.get("skipped", 0)
+        return {
+            "batch_id": batch_id,
+            "total": counts["total"],
+            "completed": counts["completed"],
+            "failed": counts["failed"],
+            "skipped": counts.get("skipped", 0),
+            "aborted": bool(counts["aborted"]),
+            "done": finished >= counts["total"],
+            "percent": 100.0 * finished / counts["total"] if counts["total"] else 100.0
+        }
+
     @staticmethod
     async def revoke_task(task_id: str, terminate: bool = False) -> Dict[str, Any]:
         """Revoke a running task."""
@@ -0,0 +1,65 @@
+// Long-lived TypeScript compile server for the execution engine.
+//
+// Loads the TypeScript compiler once, then reads JSON-line requests
+// ({"source": "..."}) on stdin and answers each with the transpiled
+// JavaScript and any syntax diagnostics. Type checking is skipped, as with
+// `ts-node --transpile-only`.
+
+const path = require("path");
+const readline = require("readline");
+const { execSync } = require("child_process");
+
+function loadTypeScript() {
+  try {
+    return require("typescript");
+  } catch (err) {
+    // Fall back to a global install, where ts-node usually finds it
+    const globalRoot = execSync("npm root -g").toString().trim();
+    return require(path.join(globalRoot, "typescript"));
+  }
+}
+
+let ts;
+try {
+  ts = loadTypeScript();
+} catch (err) {
+  process.stdout.write(JSON.stringify({ ready: false, error: String(err) }) + "\n");
+  process.exit(1);
+}
+
+const compilerOptions = {
+  module: ts.ModuleKind.CommonJS,
+  target: ts.ScriptTarget.ES2020,
+  esModuleInterop: true,
+  sourceMap: false
+};
+
+process.stdout.write(JSON.stringify({ ready: true, version: ts.version }) + "\n");
+
+const lines = readline.createInterface({ input: process.stdin });
+lines.on("line", (line) => {
+  let reply;
+  try {
+    const request = JSON.parse(line);
+    const result = ts.transpileModule(request.source, {
+      compilerOptions,
+      fileName: "code.ts",
+      reportDiagnostics: true
+    });
+    const errors = (result.diagnostics || [])
+      .filter((d) => d.category === ts.DiagnosticCategory.Error)
+      .map((d) => {
+        const message = ts.flattenDiagnosticMessageText(d.messageText, "\n");
+        if (d.file && d.start !== undefined) {
+          const pos = d.file.getLineAndCharacterOfPosition(d.start);
+          return `code.ts(${pos.line + 1},${pos.character + 1}): error TS${d.code}: ${message}`;
+        }
+        return `error TS${d.code}: ${message}`;
+      });
+    reply = { output: result.outputText, errors };
+  } catch (err) {
+    reply = { output: null, errors: [String(err)] };
+  }
+  process.stdout.write(JSON.stringify(reply) + "\n");
+});
+lines.on("close", () => process.exit(0));
@@ -0,0 +1,129 @@
+"""Persistent TypeScript compile server client."""
+
+import asyncio
+import hashlib
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .config import settings
+
+SERVER_SCRIPT = Path(__file__).with_name("ts_compile_server.js")
+
+
+class TypeScriptCompiler:
+    """Transpiles TypeScript through a long-lived Node compiler process.
+
+    The compiler is loaded once instead of on every run, and transpiled
+    output is cached by source hash. If the server cannot start (Node or
+    the typescript package is missing), ``available`` turns False and
+    callers should fall back to ts-node.
+    """
+
+    def __init__(
+        self,
+        command: List[str],
+        cache_size: int = settings.TYPESCRIPT_TRANSPILE_CACHE_SIZE
+    ):
+        """Initialize TypeScript compiler."""
+        self.command = command
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.available: Optional[bool] = None
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    async def transpile(self, source: str) -> Dict[str, Any]:
+        """Transpile TypeScript to JavaScript.
+
+        Returns ``{"output": str, "errors": [str]}``; ``errors`` holds
+        syntax errors, in which case ``output`` should not be run.
+        """
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, self._transpile, source)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def _transpile(self, source: str) -> Dict[str, Any]:
+        """Send one source to the server and wait for the reply. Blocks."""
+        with self._lock:
+            process = self._ensure_process()
+            try:
+                process.stdin.write(json.dumps({"source": source}) + "\n")
+                process.stdin.flush()
+                line = process.stdout.readline()
+                if not line:
+                    raise RuntimeError("TypeScript compile server exited unexpectedly")
+            except (OSError, RuntimeError):
+                # Restart on the next call
+                self._stop()
+                raise
+            return json.loads(line)
+
+    def _ensure_process(self) -> subprocess.Popen:
+        """Start the server if it is not running."""
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        if self.available is False:
+            raise RuntimeError("TypeScript compile server is unavailable")
+
+        try:
+            process = subprocess.Popen(
+                [*self.command, str(SERVER_SCRIPT)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1
+            )
+        except OSError as e:
+            self.available = False
+            raise RuntimeError(f"Failed to start TypeScript compile server: {str(e)}")
+
+        line = process.stdout.readline()
+        status = json.loads(line) if line else {"ready": False}
+        if not status.get("ready"):
+            process.wait()
+            self.available = False
+            raise RuntimeError(
+                f"TypeScript compile server failed to start: {status.get('error', 'no output')}"
+            )
+        self.available = True
+        self.version = status.get("version")
+        self._process = process
+        return process
+
+    def _stop(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get server status and transpile cache counters."""
+        return {
+            "available": self.available,
+            "version": self.version,
+            "cache_entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self) -> None:
+        """Stop the compile server."""
+        with self._lock:
+            self._stop()
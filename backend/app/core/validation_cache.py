@@ -0,0 +1,402 @@
+"""Validation result cache with incremental re-linting of changed definitions."""
+
+import ast
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .config import settings
+
+SegmentKey = Tuple[str, str, str]
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Findings about the module as a whole; always taken from the latest run
+MODULE_MESSAGES = {
+    "missing-module-docstring",
+    "too-many-lines",
+    "wrong-import-order",
+    "wrong-import-position",
+    "ungrouped-imports",
+    "duplicate-code",
+    "cyclic-import"
+}
+
+
+class Segment:
+    """A region of a module whose lint findings are cached as a unit.
+
+    Top-level functions and the methods of top-level classes are
+    ``function`` segments. A class's own lines (header, class attributes)
+    form a ``class`` segment, and every other top-level statement is a
+    ``module`` segment, which is always re-checked.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        lines: List[int],
+        source: str,
+        binds: Set[str],
+        uses: Set[str],
+        attrs: Set[str]
+    ):
+        """Initialize segment."""
+        self.kind = kind
+        self.name = name
+        # Line numbers the segment owns, in order
+        self.lines = lines
+        self.key: SegmentKey = (kind, name, hashlib.sha1(source.encode("utf-8")).hexdigest())
+        self.binds = binds  # module-level names it assigns
+        self.uses = uses  # names it reads from the module
+        self.attrs = attrs  # attribute names it reads, e.g. "run" in x.run()
+        # For function segments that can be stubbed out
+        self.body_start: Optional[int] = None
+        self.stub = ""
+
+
+def _span(node: ast.stmt) -> Tuple[int, int]:
+    """Get the first and last line of a statement, decorators included."""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno, *(d.lineno for d in decorators)]), node.end_lineno
+
+
+def _names(nodes: List[ast.AST]) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Get the names read, the names bound and the attributes read in nodes."""
+    loaded, bound, attrs = set(), set(), set()
+    for root in nodes:
+        for child in ast.walk(root):
+            if isinstance(child, ast.Name):
+                (loaded if isinstance(child.ctx, ast.Load) else bound).add(child.id)
+            elif isinstance(child, ast.Attribute) and isinstance(child.ctx, ast.Load):
+                attrs.add(child.attr)
+            elif isinstance(child, ast.arg):
+                bound.add(child.arg)
+            elif isinstance(child, (ast.Import, ast.ImportFrom)):
+                for alias in child.names:
+                    bound.add(alias.asname or alias.name.split(".")[0])
+            elif isinstance(child, (*FUNCTION_NODES, ast.ClassDef)):
+                bound.add(child.name)
+    return loaded, bound, attrs
+
+
+def _globals(node: ast.AST) -> Set[str]:
+    """Get the names a function declares global, which it may rebind."""
+    return {
+        name
+        for child in ast.walk(node) if isinstance(child, ast.Global)
+        for name in child.names
+    }
+
+
+def _function_segment(node: ast.stmt, name: str, source_lines: List[str]) -> Segment:
+    """Build the segment of a function or method."""
+    start, end = _span(node)
+    loaded, bound, attrs = _names([node])
+    binds = _globals(node)
+    if "." not in name:
+        # A top-level function binds its own name; methods are found by attribute
+        binds |= {name}
+    segment = Segment(
+        "function",
+        name,
+        list(range(start, end + 1)),
+        "".join(source_lines[start - 1:end]),
+        binds,
+        loaded - bound,
+        attrs
+    )
+    if node.body[0].lineno > node.lineno:
+        segment.body_start = node.body[0].lineno
+        indent = " " * node.body[0].col_offset
+        # Reads the same names, infers as unknown and keeps self.x attributes
+        stub = f"{indent}return __stub__({', '.join(sorted(segment.uses))})"
+        args = node.args.posonlyargs + node.args.args
+        if args:
+            owner = args[0].arg
+            stored = sorted({
+                child.attr for child in ast.walk(node)
+                if isinstance(child, ast.Attribute)
+                and isinstance(child.ctx, ast.Store)
+                and isinstance(child.value, ast.Name)
+                and child.value.id == owner
+            })
+            if stored:
+                stub += "; " + " = ".join(f"{owner}.{attr}" for attr in stored) + " = __stub__"
+        segment.stub = stub + "\n"
+    return segment
+
+
+class ModuleSegments:
+    """A module split into segments, with a line-to-segment index."""
+
+    def __init__(self, code: str):
+        """Split code into segments. Raises SyntaxError."""
+        tree = ast.parse(code)
+        source_lines = code.splitlines(keepends=True)
+        self.segments: List[Segment] = []
+
+        for node in tree.body:
+            start, end = _span(node)
+            if isinstance(node, FUNCTION_NODES):
+                self.segments.append(_function_segment(node, node.name, source_lines))
+            elif isinstance(node, ast.ClassDef):
+                methods = [n for n in node.body if isinstance(n, FUNCTION_NODES)]
+                method_lines = set()
+                for method in methods:
+                    segment = _function_segment(method, f"{node.name}.{method.name}", source_lines)
+                    method_lines.update(segment.lines)
+                    self.segments.append(segment)
+
+                rest = [n for n in node.body if not isinstance(n, FUNCTION_NODES)]
+                loaded, bound, attrs = _names(
+                    [*node.bases, *node.keywords, *node.decorator_list, *rest]
+                )
+                lines = [n for n in range(start, end + 1) if n not in method_lines]
+                self.segments.append(Segment(
+                    "class",
+                    node.name,
+                    lines,
+                    "".join(source_lines[n - 1] for n in lines),
+                    {node.name} | _globals(node),
+                    loaded - bound,
+                    attrs
+                ))
+            else:
+                loaded, bound, attrs = _names([node])
+                self.segments.append(Segment(
+                    "module",
+                    "",
+                    list(range(start, end + 1)),
+                    "".join(source_lines[start - 1:end]),
+                    bound,
+                    loaded,
+                    attrs
+                ))
+
+        self.owner: Dict[int, int] = {}
+        for index, segment in enumerate(self.segments):
+            for line in segment.lines:
+                self.owner[line] = index
+
+
+def _closure(start: Set[int], edges: Dict[int, Set[int]]) -> Set[int]:
+    """Get every segment reachable from ``start``."""
+    seen, stack = set(start), list(start)
+    while stack:
+        for target in edges.get(stack.pop(), ()):
+            if target not in seen:
+                seen.add(target)
+                stack.append(target)
+    return seen
+
+
+def segment_findings(
+    module: ModuleSegments,
+    messages: List[Dict[str, Any]]
+) -> Dict[SegmentKey, List[Dict[str, Any]]]:
+    """Group findings by segment, with lines as offsets into the segment."""
+    findings = {s.key: [] for s in module.segments if s.kind != "module"}
+    for message in messages:
+        index = module.owner.get(message["line"])
+        if index is None or message["symbol"] in MODULE_MESSAGES:
+            continue
+        segment = module.segments[index]
+        if segment.kind != "module":
+            offset = segment.lines.index(message["line"])
+            findings[segment.key].append({**message, "line": offset})
+    return findings
+
+
+class FileState:
+    """The last validated version of a file and its per-segment findings."""
+
+    def __init__(self, module: ModuleSegments, findings: Dict[SegmentKey, List[Dict[str, Any]]]):
+        """Initialize file state."""
+        self.module = module
+        self.findings = findings
+
+
+class LintPlan:
+    """A partial lint run: which segments to re-check and the source to lint.
+
+    Segments that changed, or that read a name or attribute whose
+    definition changed, are re-checked along with everything depending on
+    them; module-level statements always are. The other functions and
+    methods keep their signature but get a one-line body, padded so every
+    line keeps its number, that reads the same names and returns an
+    unknown value. Pylint then finds nothing new to say about the code
+    being re-checked, and the other segments reuse their cached findings.
+    """
+
+    def __init__(self, code: str, module: ModuleSegments, previous: FileState):
+        """Initialize lint plan."""
+        self.module = module
+        self.previous = previous
+        segments = module.segments
+
+        old_keys = {s.key for s in previous.module.segments}
+        new_keys = {s.key for s in segments}
+        changed = {
+            i for i, s in enumerate(segments)
+            if s.key not in old_keys or (s.kind != "module" and s.key not in previous.findings)
+        }
+        removed = [s for s in previous.module.segments if s.key not in new_keys]
+        changed_names = set()
+        for s in [*(segments[i] for i in changed), *removed]:
+            changed_names |= s.binds
+        # A changed method may break callers anywhere, found by attribute name
+        changed_attrs = {
+            s.name.split(".")[-1]
+            for s in [*(segments[i] for i in changed), *removed]
+            if s.kind == "function"
+        }
+        changed_methods = [
+            s.name.split(".")
+            for s in [*(segments[i] for i in changed), *removed]
+            if s.kind == "function" and "." in s.name
+        ]
+        changed_classes = {cls for cls, _ in changed_methods}
+        # Special methods such as __init__ shape checks of the whole class
+        whole_classes = {
+            cls for cls, method in changed_methods
+            if method.startswith("__") and method.endswith("__")
+        }
+
+        binders: Dict[str, Set[int]] = {}
+        for i, s in enumerate(segments):
+            for name in s.binds:
+                binders.setdefault(name, set()).add(i)
+        used_by: Dict[int, Set[int]] = {}
+        for i, s in enumerate(segments):
+            for name in s.uses:
+                for j in binders.get(name, ()):
+                    if j != i:
+                        used_by.setdefault(j, set()).add(i)
+
+        affected = changed | {
+            i for i, s in enumerate(segments)
+            if (s.uses | s.binds) & changed_names
+            or s.attrs & changed_attrs
+            or (s.kind == "class" and s.name in changed_classes)
+            or s.name.split(".")[0] in whole_classes
+        }
+        self.rechecked = _closure(affected, used_by) | {
+            i for i, s in enumerate(segments) if s.kind == "module"
+        }
+
+        lines = code.splitlines(keepends=True)
+        for i, s in enumerate(segments):
+            if i in self.rechecked or s.body_start is None:
+                continue
+            end = s.lines[-1]
+            lines[s.body_start - 1:end] = [s.stub] + ["\n"] * (end - s.body_start)
+        self.source = "".join(lines)
+
+    @property
+    def real_fraction(self) -> float:
+        """Share of the module's lines that are linted for real."""
+        segments = self.module.segments
+        total = sum(len(s.lines) for s in segments) or 1
+        real = sum(
+            len(s.lines)
+            for i, s in enumerate(segments)
+            if i in self.rechecked or s.body_start is None
+        )
+        return real / total
+
+    def merge(self, fresh: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Combine fresh findings of re-checked code with cached ones."""
+        merged = []
+        for message in fresh:
+            owner = self.module.owner.get(message["line"])
+            if owner is None or owner in self.rechecked or message["symbol"] in MODULE_MESSAGES:
+                merged.append(message)
+        for i, s in enumerate(self.module.segments):
+            if i not in self.rechecked:
+                for message in self.previous.findings[s.key]:
+                    merged.append({**message, "line": s.lines[message["line"]]})
+        return sorted(merged, key=lambda m: (m["line"], m["column"]))
+
+
+class ValidationCache:
+    """Caches validation check results by code hash and check type.
+
+    For pylint it also keeps the last validated version of each file path,
+    so a new version can be re-linted incrementally (see ``LintPlan``).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.VALIDATION_CACHE_MAX_ENTRIES,
+        max_files: int = settings.VALIDATION_CACHE_MAX_FILES
+    ):
+        """Initialize validation cache."""
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._files: "OrderedDict[str, FileState]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "incremental_runs": 0,
+            "full_runs": 0
+        }
+
+    @staticmethod
+    def make_key(check: str, language: str, code: str) -> str:
+        """Build a cache key for a check of some code."""
+        digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        return f"{check}:{language}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached check result."""
+        result = self._results.get(key)
+        if result is None:
+            self.stats["misses"] += 1
+            return None
+        self._results.move_to_end(key)
+        self.stats["hits"] += 1
+        return result
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a check result."""
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def plan(self, path: Optional[str], module: ModuleSegments, code: str) -> Optional[LintPlan]:
+        """Plan an incremental lint of a file's new version, if worthwhile."""
+        previous = self._files.get(path) if path else None
+        if previous is None:
+            return None
+        plan = LintPlan(code, module, previous)
+        if plan.real_fraction > settings.VALIDATION_INCREMENTAL_MAX_FRACTION:
+            return None
+        return plan
+
+    def remember(self, path: Optional[str], module: ModuleSegments, messages: List[Dict[str, Any]]) -> None:
+        """Record a file's validated version and its findings."""
+        if not path:
+            return
+        self._files[path] = FileState(module, segment_findings(module, messages))
+        self._files.move_to_end(path)
+        while len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results and file versions."""
+        self._results.clear()
+        self._files.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and cache sizes."""
+        return {
+            **self.stats,
+            "entries": len(self._results),
+            "files": len(self._files)
+        }
+
+
+validation_cache = ValidationCache()
@@ -0,0 +1,113 @@
+"""Process pool for CPU-heavy code validation checks."""
+
+import asyncio
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+from .config import settings
+
+
+def _warm_up(preload: List[str]) -> None:
+    """Import the preload modules in a new pool worker."""
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+
+
+class ValidationPool:
+    """Runs validation checks in worker processes, off the event loop.
+
+    Workers come from a fork server that has already imported the preload
+    modules, such as black and pylint, so a check starts warm. Workers are
+    replaced after ``max_tasks`` checks to bound caches that grow with use,
+    and the whole pool is restarted if a worker dies.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.VALIDATION_POOL_SIZE,
+        max_tasks: int = settings.VALIDATION_POOL_MAX_TASKS,
+        preload: List[str] = settings.VALIDATION_POOL_PRELOAD
+    ):
+        """Initialize validation pool."""
+        self.size = size
+        self.max_tasks = max_tasks
+        self.preload = preload
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats: Dict[str, int] = {
+            "tasks": 0,
+            "failures": 0,
+            "restarts": 0
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the process pool, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                if context.get_start_method() == "forkserver":
+                    context.set_forkserver_preload(self.preload)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=context,
+                    initializer=_warm_up,
+                    initargs=(self.preload,),
+                    max_tasks_per_child=self.max_tasks
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool whose worker died."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.stats["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, check: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+        """Run a check in a worker process.
+
+        ``check`` must be a module-level function so it can be pickled.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self.stats["tasks"] += 1
+        try:
+            return await loop.run_in_executor(executor, check, *args)
+        except BrokenProcessPool:
+            self.stats["failures"] += 1
+            self._restart(executor)
+            return {
+                "success": False,
+                "error": "Validation worker crashed",
+                "crashed": True
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size and task counters."""
+        return {
+            **self.stats,
+            "size": self.size,
+            "started": self._executor is not None
+        }
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+validation_pool = ValidationPool()
+# Batch image comparisons; workers keep baselines memory-mapped between tasks
+visual_pool = ValidationPool(size=settings.VISUAL_POOL_SIZE, preload=["numpy", "cv2"])
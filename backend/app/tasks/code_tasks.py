@@ -1,12 +1,15 @@
 """Background tasks for code operations."""
 
-from typing import Dict, Any, Optional, List
-from celery import shared_task
-from ..core.execution_engine import ExecutionEngine
+import asyncio
+from typing import Dict, Any, Optional, List, Set
+from celery import chord, group, shared_task
+import redis.asyncio as aioredis
+from ..core.batch_progress import init_progress, is_aborted, record_progress
+from ..core.config import settings
+from ..core.execution_engine import execution_engine
+from ..core.output_stream import OutputPublisher
 from ..core.celery_app import celery_app
 
-execution_engine = ExecutionEngine()
-
 @shared_task(bind=True, name="tasks.execute_code")
 def execute_code(
     self,
@@ -16,8 +19,7 @@ def execute_code(
 ) -> Dict[str, Any]:
     """Execute code in background."""
     try:
-        result = execution_engine.execute_code(code, language, env_vars)
-        return result
+        return asyncio.run(execution_engine.execute_code(code, language, env_vars))
     except Exception as e:
         return {
             "success": False,
@@ -25,29 +27,199 @@ def execute_code(
             "output": None
         }
 
+@shared_task(bind=True, name="tasks.stream_execute")
+def stream_execute(
+    self,
+    code: str,
+    language: str,
+    env_vars: Optional[Dict[str, str]] = None,
+    profile: Optional[str] = None,
+    requirements: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Execute code in background, publishing its output as it is produced.
+
+    Output events go to Redis under this task's id; read them with
+    ``output_stream.subscribe_output``.
+    """
+    return asyncio.run(_publish_run(
+        self.request.id, code, language, env_vars, profile, requirements
+    ))
+
+async def _publish_run(
+    job_id: str,
+    code: str,
+    language: str,
+    env_vars: Optional[Dict[str, str]],
+    profile: Optional[str] = None,
+    requirements: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Stream a run's events to Redis and return its result."""
+    publisher = OutputPublisher(job_id)
+    result: Dict[str, Any] = {}
+    try:
+        async for event in execution_engine.stream_code(
+            code, language, env_vars, profile=profile, requirements=requirements
+        ):
+            await publisher.publish(event)
+            if event["event"] == "done":
+                result = event["result"]
+    finally:
+        await publisher.close()
+    return result
+
 @shared_task(bind=True, name="tasks.batch_execute")
 def batch_execute(
     self,
-    code_blocks: List[Dict[str, Any]]
+    code_blocks: List[Dict[str, Any]],
+    fail_fast: bool = False,
+    chunk_size: Optional[int] = None
 ) -> Dict[str, Any]:
-    """Execute multiple code blocks in background."""
-    results = []
-    for block in code_blocks:
+    """Execute multiple code blocks in background.
+
+    Blocks are split into chunks that run as a Celery group across workers,
+    and the chunk results are merged in block order by a chord callback.
+    Blocks within a chunk run concurrently on the worker's execution
+    engine; a batch that fits in one chunk runs inline. With ``fail_fast``
+    the first failing block aborts the blocks that have not finished.
+    Progress is readable with ``TaskMonitor.get_batch_progress`` using this
+    task's id.
+    """
+    batch_id = self.request.id
+    chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+    items = [[index, block] for index, block in enumerate(code_blocks)]
+    asyncio.run(_init_progress(batch_id, len(items)))
+
+    if len(items) <= chunk_size:
+        results = asyncio.run(_run_chunk(batch_id, items, fail_fast))
+        return merge_batch_results([results], batch_id)
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    # The chord inherits this task's id, so its merged result is this task's result
+    return self.replace(chord(
+        group(execute_chunk.s(batch_id, chunk, fail_fast) for chunk in chunks),
+        merge_batch_results.s(batch_id)
+    ))
+
+@shared_task(bind=True, name="tasks.execute_chunk")
+def execute_chunk(
+    self,
+    batch_id: str,
+    items: List[List[Any]],
+    fail_fast: bool = False
+) -> List[Dict[str, Any]]:
+    """Execute one chunk of a batch."""
+    return asyncio.run(_run_chunk(batch_id, items, fail_fast))
+
+@shared_task(name="tasks.merge_batch_results")
+def merge_batch_results(
+    chunk_results: List[List[Dict[str, Any]]],
+    batch_id: str
+) -> Dict[str, Any]:
+    """Merge chunk results into one batch result, in block order."""
+    results = sorted(
+        (entry for chunk in chunk_results for entry in chunk),
+        key=lambda entry: entry["index"]
+    )
+    return {
+        "batch_id": batch_id,
+        "results": results,
+        "total": len(results),
+        "failed": sum(1 for r in results if not r.get("skipped") and _block_failed(r)),
+        "skipped": sum(1 for r in results if r.get("skipped")),
+        "aborted": any(r.get("skipped") for r in results)
+    }
+
+def _block_failed(entry: Dict[str, Any]) -> bool:
+    """Check whether a block raised or its code failed."""
+    return not entry["success"] or not entry["result"]["success"]
+
+async def _init_progress(batch_id: str, total: int) -> None:
+    """Create the progress record for a batch."""
+    redis = aioredis.from_url(settings.REDIS_URL)
+    try:
+        await init_progress(redis, batch_id, total)
+    finally:
+        await redis.aclose()
+
+async def _run_chunk(
+    batch_id: str,
+    items: List[List[Any]],
+    fail_fast: bool
+) -> List[Dict[str, Any]]:
+    """Run a chunk's blocks concurrently, recording progress per block.
+
+    Every block is counted exactly once, as completed or skipped, even if
+    it was cancelled while running or while recording its own progress.
+    """
+    redis = aioredis.from_url(settings.REDIS_URL)
+    results: Dict[int, Dict[str, Any]] = {}
+    counted: Set[int] = set()
+
+    async def run_block(index: int, block: Dict[str, Any]) -> bool:
         try:
-            result = execution_engine.execute_code(
+            result = await execution_engine.execute_code(
                 code=block["code"],
                 language=block["language"],
-                env_vars=block.get("env_vars")
+                env_vars=block.get("env_vars"),
+                cache=block.get("cache"),
+                profile=block.get("profile"),
+                requirements=block.get("requirements")
             )
-            results.append({
-                "success": True,
-                "block": block,
-                "result": result
-            })
+            entry = {"index": index, "success": True, "block": block, "result": result}
         except Exception as e:
-            results.append({
-                "success": False,
-                "block": block,
-                "error": str(e)
-            })
-    return {"results": results} 
\ No newline at end of file
+            entry = {"index": index, "success": False, "block": block, "error": str(e)}
+        failed = _block_failed(entry)
+        results[index] = entry
+        await record_progress(
+            redis, batch_id, completed=1, failed=int(failed), abort=failed and fail_fast
+        )
+        counted.add(index)
+        return failed
+
+    try:
+        if not (fail_fast and await is_aborted(redis, batch_id)):
+            pending = {asyncio.create_task(run_block(index, block)) for index, block in items}
+            try:
+                if not fail_fast:
+                    await asyncio.gather(*pending)
+                    pending = set()
+                while pending:
+                    # Stop at the first failure here or in another chunk
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=0.5,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if any(task.result() for task in done) or await is_aborted(redis, batch_id):
+                        break
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        try:
+            for index, block in items:
+                if index not in results:
+                    results[index] = {
+                        "index": index,
+                        "success": False,
+                        "skipped": True,
+                        "block": block,
+                        "error": "Skipped after an earlier block failed"
+                    }
+            # Blocks cancelled before or while recording their progress
+            uncounted = [results[index] for index, _ in items if index not in counted]
+            finished = [r for r in uncounted if not r.get("skipped")]
+            if uncounted:
+                await record_progress(
+                    redis,
+                    batch_id,
+                    completed=len(finished),
+                    failed=sum(1 for r in finished if _block_failed(r)),
+                    skipped=len(uncounted) - len(finished),
+                    abort=fail_fast and any(_block_failed(r) for r in finished)
+                )
+        finally:
+            await redis.aclose()
+
+    return [results[index] for index, _ in items]
@@ -1,32 +1,157 @@
 """Validation tools for code and output inspection."""
 
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 import ast
-import re
-from pylint import epylint
-import black
+import asyncio
+import os
+import tempfile
+from ..core.security_analyzer import security_analyzer
+from ..core.validation_cache import ModuleSegments, validation_cache
+from ..core.validation_pool import validation_pool
+
+# Checks below run in validation pool workers, which import black and
+# pylint once at startup; they must stay module-level functions.
+
+def check_syntax(code: str, language: str) -> Dict[str, Any]:
+    """Validate code syntax."""
+    if language == "python":
+        try:
+            ast.parse(code)
+            return {
+                "success": True,
+                "message": "Syntax is valid"
+            }
+        except SyntaxError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    # Add support for other languages here
+    return {
+        "success": False,
+        "error": f"Syntax validation not supported for {language}"
+    }
+
+def check_black(code: str) -> Dict[str, Any]:
+    """Check that code matches Black formatting."""
+    import black
+
+    try:
+        formatted_code = black.format_str(code, mode=black.FileMode())
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    return {
+        "success": True,
+        "formatted": formatted_code == code
+    }
+
+def check_pylint(code: str) -> Dict[str, Any]:
+    """Run pylint on code in-process."""
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    reporter = CollectingReporter()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "snippet.py")
+            with open(path, "w") as f:
+                f.write(code)
+            Run([path, "--persistent=n", "--score=n"], reporter=reporter, exit=False)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    messages = [
+        {
+            "line": m.line,
+            "column": m.column,
+            "msg_id": m.msg_id,
+            "symbol": m.symbol,
+            "message": m.msg
+        }
+        for m in reporter.messages
+    ]
+    return {
+        "success": True,
+        "messages": messages,
+        "output": format_pylint_output(messages)
+    }
+
+def format_pylint_output(messages: List[Dict[str, Any]]) -> str:
+    """Render pylint messages as text."""
+    if not messages:
+        return ""
+    lines = ["************* Module snippet"]
+    for m in messages:
+        lines.append(f"{m['line']}:{m['column']}: {m['msg_id']} ({m['symbol']}) {m['message']}")
+    return "\n".join(lines) + "\n"
+
+def check_security(code: str, language: str) -> Dict[str, Any]:
+    """Validate code security."""
+    if language != "python":
+        return {
+            "success": False,
+            "error": f"Security validation not supported for {language}"
+        }
+
+    try:
+        findings = security_analyzer.analyze(code)
+    except SyntaxError as e:
+        return {
+            "success": False,
+            "error": f"Security analysis failed: {str(e)}"
+        }
+
+    issues = [
+        f"Line {f['line']}, column {f['column']}: {f['message']} ({f['call']}, {f['rule']})"
+        for f in findings
+    ]
+    return {
+        "success": len(issues) == 0,
+        "issues": issues,
+        "findings": findings
+    }
 
 class CodeValidationTool:
-    """Tool for validating code quality and structure."""
+    """Tool for validating code quality and structure.
+
+    Checks run in the validation process pool, so black and pylint never
+    block the event loop, and the checks of a file run in parallel. Results
+    are cached by code hash, and when a ``path`` is given pylint re-checks
+    only what changed since that file was last validated.
+    """
+
+    def __init__(self):
+        """Initialize code validation tool."""
+        self.pool = validation_pool
+        self.cache = validation_cache
 
     async def execute(
         self,
         code: str,
         language: str,
-        validation_types: List[str] = None
+        validation_types: List[str] = None,
+        path: Optional[str] = None
     ) -> Dict[str, Any]:
         """Execute code validation."""
         if not validation_types:
             validation_types = ["syntax", "style", "security"]
 
-        results = {}
+        validators = {
+            "syntax": self._validate_syntax,
+            "style": self._validate_style,
+            "security": self._validate_security
+        }
+        selected = [t for t in validators if t in validation_types]
         try:
-            if "syntax" in validation_types:
-                results["syntax"] = await self._validate_syntax(code, language)
-            if "style" in validation_types:
-                results["style"] = await self._validate_style(code, language)
-            if "security" in validation_types:
-                results["security"] = await self._validate_security(code, language)
+            outcomes = await asyncio.gather(
+                *(validators[t](code, language, path) for t in selected)
+            )
+            results = dict(zip(selected, outcomes))
 
             success = all(r.get("success", False) for r in results.values())
             return {
@@ -39,83 +164,119 @@ class CodeValidationTool:
                 "error": str(e)
             }
 
-    async def _validate_syntax(self, code: str, language: str) -> Dict[str, Any]:
-        """Validate code syntax."""
-        if language == "python":
-            try:
-                ast.parse(code)
-                return {
-                    "success": True,
-                    "message": "Syntax is valid"
-                }
-            except SyntaxError as e:
-                return {
-                    "success": False,
-                    "error": str(e)
-                }
-        # Add support for other languages here
-        return {
-            "success": False,
-            "error": f"Syntax validation not supported for {language}"
-        }
+    async def execute_batch(
+        self,
+        files: List[Dict[str, Any]],
+        validation_types: List[str] = None
+    ) -> Dict[str, Any]:
+        """Validate many files in one call.
 
-    async def _validate_style(self, code: str, language: str) -> Dict[str, Any]:
-        """Validate code style."""
-        if language == "python":
-            try:
-                # Use black to check formatting
-                formatted_code = black.format_str(code, mode=black.FileMode())
-                style_issues = []
-                
-                if formatted_code != code:
-                    style_issues.append("Code formatting does not match Black style")
-
-                # Use pylint for additional style checks
-                (pylint_stdout, pylint_stderr) = epylint.py_run(
-                    code,
-                    return_std=True
+        Each file is a dict with ``code``, ``language`` and an optional
+        ``path`` that is echoed back. Every check of every file is queued
+        on the pool at once, so they share its workers.
+        """
+        reports = await asyncio.gather(
+            *(
+                self.execute(
+                    f.get("code", ""),
+                    f.get("language", "python"),
+                    validation_types,
+                    f.get("path")
                 )
-                
-                return {
-                    "success": len(style_issues) == 0,
-                    "issues": style_issues,
-                    "pylint_output": pylint_stdout.getvalue()
-                }
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": str(e)
-                }
+                for f in files
+            )
+        )
+        results = [
+            {"path": f.get("path"), **report}
+            for f, report in zip(files, reports)
+        ]
         return {
-            "success": False,
-            "error": f"Style validation not supported for {language}"
+            "success": all(r["success"] for r in results),
+            "results": results
         }
 
-    async def _validate_security(self, code: str, language: str) -> Dict[str, Any]:
-        """Validate code security."""
-        security_patterns = {
-            "python": [
-                r"eval\s*\(",
-                r"exec\s*\(",
-                r"os\.system\s*\(",
-                r"subprocess\.call\s*\(",
-                r"input\s*\(",
-                r"__import__\s*\("
-            ]
-        }
+    async def _cached(
+        self,
+        name: str,
+        language: str,
+        code: str,
+        check: Callable[..., Dict[str, Any]],
+        *args: Any
+    ) -> Dict[str, Any]:
+        """Run a check in the pool unless its result for this code is cached."""
+        key = self.cache.make_key(name, language, code)
+        result = self.cache.get(key)
+        if result is None:
+            result = await self.pool.run(check, *args)
+            if not result.get("crashed"):
+                self.cache.set(key, result)
+        return result
+
+    async def _lint(self, code: str, path: Optional[str]) -> Dict[str, Any]:
+        """Run pylint, incrementally if an earlier version of the file is known."""
+        try:
+            module = ModuleSegments(code)
+        except SyntaxError:
+            module = None
+
+        key = self.cache.make_key("pylint", "python", code)
+        result = self.cache.get(key)
+        if result is None:
+            plan = self.cache.plan(path, module, code) if module else None
+            if plan is None:
+                self.cache.stats["full_runs"] += 1
+                result = await self.pool.run(check_pylint, code)
+            else:
+                self.cache.stats["incremental_runs"] += 1
+                result = await self.pool.run(check_pylint, plan.source)
+                if result["success"]:
+                    messages = plan.merge(result["messages"])
+                    result = {
+                        "success": True,
+                        "messages": messages,
+                        "output": format_pylint_output(messages),
+                        "rechecked": sorted(
+                            s.name for i, s in enumerate(module.segments)
+                            if i in plan.rechecked and s.kind != "module"
+                        )
+                    }
+            if result["success"]:
+                self.cache.set(key, result)
 
-        if language not in security_patterns:
+        if module and result["success"]:
+            self.cache.remember(path, module, result["messages"])
+        return result
+
+    async def _validate_syntax(self, code: str, language: str, path: Optional[str] = None) -> Dict[str, Any]:
+        """Validate code syntax."""
+        return await self._cached("syntax", language, code, check_syntax, code, language)
+
+    async def _validate_style(self, code: str, language: str, path: Optional[str] = None) -> Dict[str, Any]:
+        """Validate code style."""
+        if language != "python":
             return {
                 "success": False,
-                "error": f"Security validation not supported for {language}"
+                "error": f"Style validation not supported for {language}"
             }
 
-        issues = []
-        for pattern in security_patterns[language]:
-            if re.search(pattern, code):
-                issues.append(f"Potentially unsafe pattern found: {pattern}")
+        # Black and pylint run side by side in separate workers
+        formatting, pylint = await asyncio.gather(
+            self._cached("black", language, code, check_black, code),
+            self._lint(code, path)
+        )
+        if not formatting["success"]:
+            return formatting
 
+        style_issues = []
+        if not formatting["formatted"]:
+            style_issues.append("Code formatting does not match Black style")
         return {
-            "success": len(issues) == 0,
-            "issues": issues
-        } 
\ No newline at end of file
+            "success": len(style_issues) == 0,
+            "issues": style_issues,
+            "pylint_output": pylint.get("output", pylint.get("error", "")),
+            "pylint_messages": pylint.get("messages", [])
+        }
+
+    async def _validate_security(self, code: str, language: str, path: Optional[str] = None) -> Dict[str, Any]:
+        """Validate code security."""
+        return await self._cached("security", language, code, check_security, code, language)
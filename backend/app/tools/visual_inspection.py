@@ -1,30 +1,103 @@
 """Visual inspection tool for UI validation."""
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+import asyncio
 import cv2
 import numpy as np
-from PIL import Image
-import io
-import base64
-from pathlib import Path
-import tempfile
+from ..core.decoded_frame import DecodedFrame, ImageInput
+from ..core.image_similarity import image_comparator
+from ..core.reference_store import reference_store
+from ..core.validation_pool import visual_pool
+
+# Functions below run in visual pool workers and must stay module-level.
+
+def resize_to(image: np.ndarray, shape: tuple) -> np.ndarray:
+    """Resize an image to a (height, width) shape."""
+    height, width = shape[:2]
+    # Area averaging avoids aliasing when shrinking
+    shrinking = width * height < image.shape[0] * image.shape[1]
+    return cv2.resize(
+        image,
+        (width, height),
+        interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+    )
+
+def add_reference(name: str, image_data: ImageInput) -> Dict[str, Any]:
+    """Store an image as a named baseline."""
+    try:
+        return {
+            "success": True,
+            "reference": reference_store.add(name, image_data)
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+def compare_to_reference(
+    image_data: ImageInput,
+    reference: Optional[str],
+    threshold: float,
+    diff_map: bool = False
+) -> Dict[str, Any]:
+    """Compare an image to a stored baseline, found by hash unless named."""
+    try:
+        image = DecodedFrame.load(image_data).gray
+        distance = None
+        if reference is None:
+            match = reference_store.match(image)
+            if match is None:
+                return {
+                    "success": False,
+                    "error": "No matching reference image"
+                }
+            reference, distance = match
+
+        baseline = reference_store.get(reference)
+        if image.shape != baseline.shape:
+            image = resize_to(image, baseline.shape)
+        return {
+            "reference": reference,
+            "hash_distance": distance,
+            **image_comparator.compare(image, baseline, threshold, diff_map)
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
 
 class VisualInspectionTool:
-    """Tool for visual inspection and validation."""
+    """Tool for visual inspection and validation.
+
+    Images may be base64 text, raw encoded bytes or a ``DecodedFrame``.
+    Each image is decoded once and every check reads the frame's cached
+    gray or color buffer. Comparisons score SSIM with the shared image
+    comparator. Batch regression checks compare screenshots to baselines
+    in the reference store, across the visual process pool.
+    """
+
+    def __init__(self):
+        """Initialize visual inspection tool."""
+        self.comparator = image_comparator
+        self.references = reference_store
+        self.pool = visual_pool
 
     async def execute(
         self,
-        image_data: str,
+        image_data: ImageInput,
         validation_type: str = "screenshot",
-        reference_image: str = None,
-        threshold: float = 0.8
+        reference_image: ImageInput = None,
+        threshold: float = 0.8,
+        diff_map: bool = False
     ) -> Dict[str, Any]:
         """Execute visual inspection."""
         try:
             if validation_type == "screenshot":
                 return await self._validate_screenshot(image_data)
             elif validation_type == "comparison":
-                return await self._compare_images(image_data, reference_image, threshold)
+                return await self._compare_images(image_data, reference_image, threshold, diff_map)
             else:
                 return {
                     "success": False,
@@ -36,12 +109,49 @@ class VisualInspectionTool:
                 "error": str(e)
             }
 
-    async def _validate_screenshot(self, image_data: str) -> Dict[str, Any]:
+    async def add_reference(self, name: str, image_data: ImageInput) -> Dict[str, Any]:
+        """Store an image as the baseline called ``name``."""
+        return await self.pool.run(add_reference, name, image_data)
+
+    async def execute_batch(
+        self,
+        items: List[Dict[str, Any]],
+        threshold: float = 0.8,
+        diff_map: bool = False
+    ) -> Dict[str, Any]:
+        """Compare many screenshots to their baselines in one call.
+
+        Each item is a dict with ``image_data``, an optional ``reference``
+        baseline name (found by perceptual hash when missing), an optional
+        ``threshold`` and an optional ``name`` that is echoed back. All
+        comparisons are queued on the pool at once.
+        """
+        reports = await asyncio.gather(
+            *(
+                self.pool.run(
+                    compare_to_reference,
+                    item.get("image_data"),
+                    item.get("reference"),
+                    item.get("threshold", threshold),
+                    diff_map
+                )
+                for item in items
+            )
+        )
+        results = [
+            {"name": item.get("name"), **report}
+            for item, report in zip(items, reports)
+        ]
+        return {
+            "success": all(r["success"] for r in results),
+            "results": results
+        }
+
+    async def _validate_screenshot(self, image_data: ImageInput) -> Dict[str, Any]:
         """Validate screenshot quality and content."""
         try:
-            # Convert base64 to image
-            image = self._base64_to_image(image_data)
-            
+            image = DecodedFrame.load(image_data)
+
             # Basic image quality checks
             checks = {
                 "resolution": self._check_resolution(image),
@@ -62,44 +172,30 @@ class VisualInspectionTool:
 
     async def _compare_images(
         self,
-        image_data: str,
-        reference_data: str,
-        threshold: float
+        image_data: ImageInput,
+        reference_data: ImageInput,
+        threshold: float,
+        diff_map: bool = False
     ) -> Dict[str, Any]:
         """Compare two images for similarity."""
         try:
-            # Convert base64 to images
-            image = self._base64_to_image(image_data)
-            reference = self._base64_to_image(reference_data)
-            
+            if reference_data is None:
+                raise ValueError("Comparison requires a reference image")
+            image = DecodedFrame.load(image_data).gray
+            reference = DecodedFrame.load(reference_data).gray
+
             # Ensure same size
-            if image.size != reference.size:
-                image = image.resize(reference.size)
-            
-            # Convert to numpy arrays
-            img_array = np.array(image)
-            ref_array = np.array(reference)
-            
-            # Calculate similarity
-            similarity = self._calculate_similarity(img_array, ref_array)
-            
-            return {
-                "success": similarity >= threshold,
-                "similarity": similarity,
-                "threshold": threshold
-            }
+            if image.shape != reference.shape:
+                image = resize_to(image, reference.shape)
+
+            return self.comparator.compare(image, reference, threshold, diff_map)
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
 
-    def _base64_to_image(self, base64_str: str) -> Image.Image:
-        """Convert base64 string to PIL Image."""
-        image_data = base64.b64decode(base64_str)
-        return Image.open(io.BytesIO(image_data))
-
-    def _check_resolution(self, image: Image.Image) -> Dict[str, Any]:
+    def _check_resolution(self, image: DecodedFrame) -> Dict[str, Any]:
         """Check image resolution."""
         width, height = image.size
         min_width = 800
@@ -112,14 +208,13 @@ class VisualInspectionTool:
             "message": f"Resolution: {width}x{height}"
         }
 
-    def _check_blur(self, image: Image.Image) -> Dict[str, Any]:
+    def _check_blur(self, image: DecodedFrame) -> Dict[str, Any]:
         """Check image blur level."""
-        # Convert to OpenCV format
-        cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
-        
-        # Calculate Laplacian variance
-        blur_value = cv2.Laplacian(gray, cv2.CV_64F).var()
+        # Calculate Laplacian variance; 16-bit output holds every 8-bit
+        # Laplacian value at a quarter of the memory of float64
+        laplacian = cv2.Laplacian(image.gray, cv2.CV_16S)
+        _, std = cv2.meanStdDev(laplacian)
+        blur_value = float(std[0][0]) ** 2
         threshold = 100
         
         return {
@@ -129,13 +224,10 @@ class VisualInspectionTool:
             "message": f"Blur value: {blur_value}"
         }
 
-    def _check_contrast(self, image: Image.Image) -> Dict[str, Any]:
+    def _check_contrast(self, image: DecodedFrame) -> Dict[str, Any]:
         """Check image contrast."""
-        # Convert to grayscale numpy array
-        gray = np.array(image.convert('L'))
-        
-        # Calculate contrast
-        contrast = gray.std()
+        _, std = cv2.meanStdDev(image.gray)
+        contrast = float(std[0][0])
         threshold = 30
         
         return {
@@ -144,17 +236,3 @@ class VisualInspectionTool:
             "threshold": threshold,
             "message": f"Contrast value: {contrast}"
         }
-
-    def _calculate_similarity(
-        self,
-        image1: np.ndarray,
-        image2: np.ndarray
-    ) -> float:
-        """Calculate similarity between two images."""
-        # Convert to grayscale
-        gray1 = cv2.cvtColor(image1, cv2.COLOR_RGB2GRAY)
-        gray2 = cv2.cvtColor(image2, cv2.COLOR_RGB2GRAY)
-        
-        # Calculate SSIM (Structural Similarity Index)
-        score = cv2.matchTemplate(gray1, gray2, cv2.TM_CCOEFF_NORMED)[0][0]
-        return float(score) 
\ No newline at end of file
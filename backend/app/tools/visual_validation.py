@@ -1,25 +1,65 @@
 import cv2
 import numpy as np
-import base64
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from .base import BaseTool
+from ..core.decoded_frame import DecodedFrame, ImageInput
+
+DEFAULT_GUI_CONFIG = {
+    "max_side": 1600,  # longest side of the working image; None keeps full resolution
+    "min_size": 20,  # elements must be wider and taller than this, in image pixels
+    "nms_threshold": 0.5,  # overlap (IoU) above which the smaller box is dropped
+    "tile_size": None,  # detect in tiles of this many working pixels; None for one pass
+    "tile_overlap": 32
+}
+
+def bounding_boxes(contours: List[np.ndarray]) -> np.ndarray:
+    # Same as cv2.boundingRect per contour, as one (x, y, w, h) array
+    if not contours:
+        return np.zeros((0, 4), np.int32)
+    lengths = np.fromiter((len(c) for c in contours), np.intp, len(contours))
+    points = np.concatenate(contours).reshape(-1, 2)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    low = np.minimum.reduceat(points, starts)
+    high = np.maximum.reduceat(points, starts)
+    return np.hstack([low, high - low + 1]).astype(np.int32)
+
+def suppress_overlaps(boxes: np.ndarray, threshold: float) -> np.ndarray:
+    # Greedy non-maximum suppression, largest boxes first
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2].astype(np.int64) * boxes[:, 3]
+    order = np.argsort(-areas, kind="stable")
+    keep = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        width = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        height = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        overlap = width.astype(np.int64) * height
+        order = rest[overlap <= threshold * (areas[i] + areas[rest] - overlap)]
+    return boxes[np.sort(keep)]
+
+def tiles(height: int, width: int, size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    # (y, x, height, width) windows covering the image, overlapping by `overlap`
+    step = max(1, size - overlap)
+    rows = range(0, max(1, height - overlap), step)
+    cols = range(0, max(1, width - overlap), step)
+    return [(y, x, min(size, height - y), min(size, width - x)) for y in rows for x in cols]
 
 class VisualValidationTool(BaseTool):
-    def __init__(self):
+    def __init__(self, config: Dict[str, Any] = None):
         super().__init__(
             name="visual_validation",
-            description="Visual validation using OpenCV"
+            description="Visual validation using OpenCV",
+            config={**DEFAULT_GUI_CONFIG, **(config or {})}
         )
         
     async def execute(self, 
-                     image_data: str,
+                     image_data: ImageInput,
                      validation_type: str = "gui",
                      **kwargs) -> Dict[str, Any]:
         try:
-            # Convert base64 image to OpenCV format
-            img_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(img_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            image = DecodedFrame.load(image_data)
             
             if validation_type == "gui":
                 return await self._validate_gui(image, **kwargs)
@@ -29,24 +69,47 @@ class VisualValidationTool(BaseTool):
         except Exception as e:
             return {"success": False, "error": str(e)}
             
-    async def _validate_gui(self, image: np.ndarray, **kwargs) -> Dict[str, Any]:
-        # Perform basic GUI element detection
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        elements = []
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            if w > 20 and h > 20:  # Filter out small noise
-                elements.append({
-                    "type": "unknown",
-                    "position": {"x": int(x), "y": int(y)},
-                    "size": {"width": int(w), "height": int(h)}
-                })
-        
+    async def _validate_gui(self, image: DecodedFrame, **kwargs) -> Dict[str, Any]:
+        # Perform basic GUI element detection on a downscaled working image
+        options = {**self.config, **kwargs}
+        gray = image.gray
+        height, width = gray.shape
+        scale = 1.0
+        if options["max_side"] and max(height, width) > options["max_side"]:
+            scale = options["max_side"] / max(height, width)
+            gray = cv2.resize(
+                gray,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+
+        if options["tile_size"]:
+            windows = tiles(*gray.shape, options["tile_size"], options["tile_overlap"])
+        else:
+            windows = [(0, 0, *gray.shape)]
+        found = []
+        for y, x, h, w in windows:
+            edges = cv2.Canny(gray[y:y + h, x:x + w], 50, 150)
+            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            boxes = bounding_boxes(contours)
+            boxes[:, :2] += (x, y)
+            found.append(boxes)
+        boxes = np.concatenate(found)
+
+        # Back to image pixels, then filter out small noise in bulk
+        if scale != 1.0:
+            boxes = np.round(boxes / scale).astype(np.int32)
+        min_size = options["min_size"]
+        boxes = boxes[(boxes[:, 2] > min_size) & (boxes[:, 3] > min_size)]
+        if options["nms_threshold"] is not None and len(boxes):
+            boxes = suppress_overlaps(boxes, options["nms_threshold"])
+        # Reading order: top to bottom, then left to right
+        boxes = boxes[np.lexsort((boxes[:, 0], boxes[:, 1]))]
+
         return {
             "success": True,
-            "elements": elements,
-            "total_elements": len(elements)
-        }
\ No newline at end of file
+            "boxes": boxes.tolist(),
+            "box_format": ["x", "y", "width", "height"],
+            "total_elements": len(boxes),
+            "scale": scale
+        }